@@ -0,0 +1,32 @@
+"""make fuelprice(date, station, fuel_type) unique"""
+
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the first stored price of each day like ``get_price`` did.
+    op.execute(
+        "DELETE FROM fuelprice WHERE id NOT IN ("
+        "SELECT MIN(id) FROM fuelprice GROUP BY date, station, fuel_type)"
+    )
+    op.drop_index("ix_fuelprice_date_station_fuel_type", table_name="fuelprice")
+    op.create_index(
+        "ix_fuelprice_date_station_fuel_type",
+        "fuelprice",
+        ["date", "station", "fuel_type"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fuelprice_date_station_fuel_type", table_name="fuelprice")
+    op.create_index(
+        "ix_fuelprice_date_station_fuel_type",
+        "fuelprice",
+        ["date", "station", "fuel_type"],
+    )
@@ -0,0 +1,114 @@
+"""add monthly_agg table maintained by fuelentry triggers"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the definitions in ``src.services.monthly_agg`` at this
+# revision.
+_COLUMNS = {
+    "fills": "1",
+    "distance": "COALESCE({r}.odo_after - {r}.odo_before, 0)",
+    "liters": "COALESCE({r}.liters, 0)",
+    "amount": "COALESCE({r}.amount_spent, 0)",
+    "closed_liters": (
+        "CASE WHEN {r}.odo_after IS NOT NULL THEN COALESCE({r}.liters, 0) ELSE 0 END"
+    ),
+    "closed_amount": (
+        "CASE WHEN {r}.odo_after IS NOT NULL "
+        "THEN COALESCE({r}.amount_spent, 0) ELSE 0 END"
+    ),
+    "full_fills": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters IS NOT NULL "
+        "THEN 1 ELSE 0 END"
+    ),
+    "full_distance": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters IS NOT NULL "
+        "THEN {r}.odo_after - {r}.odo_before ELSE 0 END"
+    ),
+    "full_liters": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters IS NOT NULL "
+        "THEN {r}.liters ELSE 0 END"
+    ),
+    "full_amount": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters IS NOT NULL "
+        "THEN COALESCE({r}.amount_spent, 0) ELSE 0 END"
+    ),
+}
+_COUNTS = {"fills", "full_fills"}
+_KEY = {
+    "vehicle_id": "{r}.vehicle_id",
+    "month": "strftime('%Y-%m', {r}.entry_date)",
+    "fuel_type": "COALESCE({r}.fuel_type, '')",
+}
+_NAMES = ", ".join([*_KEY, *_COLUMNS])
+
+
+def _round(expr: str, column: str) -> str:
+    return expr if column in _COUNTS else f"ROUND({expr}, 6)"
+
+
+def _add(row: str) -> str:
+    values = ", ".join(
+        [k.format(r=row) for k in _KEY.values()]
+        + [expr.format(r=row) for expr in _COLUMNS.values()]
+    )
+    updates = ", ".join(f"{c} = {_round(f'{c} + excluded.{c}', c)}" for c in _COLUMNS)
+    return (
+        f"INSERT INTO monthly_agg ({_NAMES}) VALUES ({values}) "
+        f"ON CONFLICT(vehicle_id, month, fuel_type) DO UPDATE SET {updates};"
+    )
+
+
+def _subtract(row: str) -> str:
+    updates = ", ".join(
+        f"{c} = {_round(f'{c} - ({expr.format(r=row)})', c)}"
+        for c, expr in _COLUMNS.items()
+    )
+    where = " AND ".join(f"{c} = {k.format(r=row)}" for c, k in _KEY.items())
+    return (
+        f"UPDATE monthly_agg SET {updates} WHERE {where};"
+        f"DELETE FROM monthly_agg WHERE fills <= 0 AND {where};"
+    )
+
+
+_TRIGGERS = {
+    "trg_monthly_agg_insert": ("AFTER INSERT", _add("NEW")),
+    "trg_monthly_agg_delete": ("AFTER DELETE", _subtract("OLD")),
+    "trg_monthly_agg_update": ("AFTER UPDATE", _subtract("OLD") + _add("NEW")),
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monthly_agg",
+        sa.Column("vehicle_id", sa.Integer, primary_key=True),
+        sa.Column("month", sa.String, primary_key=True),
+        sa.Column("fuel_type", sa.String, primary_key=True),
+        *(
+            sa.Column(c, sa.Integer if c in _COUNTS else sa.Float, nullable=False)
+            for c in _COLUMNS
+        ),
+    )
+    keys = [k.format(r="fuelentry") for k in _KEY.values()]
+    sums = [
+        _round(f"SUM({expr.format(r='fuelentry')})", c) for c, expr in _COLUMNS.items()
+    ]
+    op.execute(
+        f"INSERT INTO monthly_agg ({_NAMES}) "
+        f"SELECT {', '.join(keys + sums)} FROM fuelentry "
+        f"GROUP BY {', '.join(keys)}"
+    )
+    for name, (timing, body) in _TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {timing} ON fuelentry BEGIN {body} END")
+
+
+def downgrade() -> None:
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table("monthly_agg")
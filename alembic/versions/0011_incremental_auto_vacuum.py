@@ -0,0 +1,24 @@
+"""switch the database to incremental auto-vacuum"""
+
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def _set_auto_vacuum(mode: str) -> None:
+    # ``auto_vacuum`` only changes on an existing file through a full
+    # ``VACUUM``, which SQLite refuses inside a transaction.
+    with op.get_context().autocommit_block():
+        op.execute(f"PRAGMA auto_vacuum = {mode}")
+        op.execute("VACUUM")
+
+
+def upgrade() -> None:
+    _set_auto_vacuum("INCREMENTAL")
+
+
+def downgrade() -> None:
+    _set_auto_vacuum("NONE")
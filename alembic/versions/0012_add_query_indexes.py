@@ -0,0 +1,39 @@
+"""add composite, partial and covering indexes for the hot queries"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_fuelentry_vehicle_date_id",
+        "fuelentry",
+        ["vehicle_id", "entry_date", "id"],
+    )
+    op.create_index(
+        "ix_fuelentry_missing_liters",
+        "fuelentry",
+        ["entry_date"],
+        sqlite_where=sa.text("liters IS NULL AND amount_spent IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_fuelentry_fuel_type_liters", "fuelentry", ["fuel_type", "liters"]
+    )
+    op.create_index(
+        "ix_fuelprice_station_fuel_type_date",
+        "fuelprice",
+        ["station", "fuel_type", "date", "price"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fuelprice_station_fuel_type_date", table_name="fuelprice")
+    op.drop_index("ix_fuelentry_fuel_type_liters", table_name="fuelentry")
+    op.drop_index("ix_fuelentry_missing_liters", table_name="fuelentry")
+    op.drop_index("ix_fuelentry_vehicle_date_id", table_name="fuelentry")
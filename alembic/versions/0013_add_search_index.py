@@ -0,0 +1,48 @@
+"""add FTS5 search index over vehicles and maintenance tasks"""
+
+from alembic import op
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the definitions in ``src.services.search_index`` at this
+# revision.
+_TABLES = {
+    "vehicle_fts": ("vehicle", ("name", "license_plate", "vehicle_type")),
+    "maintenance_fts": ("maintenance", ("name", "note")),
+}
+
+
+def _triggers(fts: str, content: str, columns: tuple[str, ...]) -> dict[str, str]:
+    names = ", ".join(columns)
+    new = ", ".join(f"NEW.{c}" for c in columns)
+    old = ", ".join(f"OLD.{c}" for c in columns)
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (NEW.id, {new});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', OLD.id, {old});"
+    )
+    return {
+        f"trg_{fts}_insert": f"AFTER INSERT ON {content} BEGIN {insert} END",
+        f"trg_{fts}_delete": f"AFTER DELETE ON {content} BEGIN {delete} END",
+        f"trg_{fts}_update": f"AFTER UPDATE ON {content} BEGIN {delete}{insert} END",
+    }
+
+
+def upgrade() -> None:
+    for fts, (content, columns) in _TABLES.items():
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, "
+            f"content='{content}', content_rowid='id', tokenize='trigram')"
+        )
+        for name, body in _triggers(fts, content, columns).items():
+            op.execute(f"CREATE TRIGGER {name} {body}")
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    for fts, (content, columns) in _TABLES.items():
+        for name in _triggers(fts, content, columns):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
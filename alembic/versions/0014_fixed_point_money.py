@@ -0,0 +1,169 @@
+"""store money in satang and liters in centiliters as INTEGER columns"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+#: ``(table, REAL column, INTEGER column, nullable)``.
+_CONVERTED = (
+    ("fuelentry", "amount_spent", "amount_satang", True),
+    ("fuelentry", "liters", "liters_cl", True),
+    ("fuelprice", "price", "price_satang", False),
+)
+
+# Frozen copy of ``src.services.monthly_agg`` at this revision; with
+# ``exact`` the liters and amounts are integer sums that need no rounding.
+_COUNTS = {"fills", "full_fills"}
+_MONEY = {
+    "liters",
+    "amount",
+    "closed_liters",
+    "closed_amount",
+    "full_liters",
+    "full_amount",
+}
+_KEY = {
+    "vehicle_id": "{r}.vehicle_id",
+    "month": "strftime('%Y-%m', {r}.entry_date)",
+    "fuel_type": "COALESCE({r}.fuel_type, '')",
+}
+
+
+def _columns(liters: str, amount: str) -> dict[str, str]:
+    full = f"{{r}}.odo_after IS NOT NULL AND {{r}}.{liters} IS NOT NULL"
+    return {
+        "fills": "1",
+        "distance": "COALESCE({r}.odo_after - {r}.odo_before, 0)",
+        "liters": f"COALESCE({{r}}.{liters}, 0)",
+        "amount": f"COALESCE({{r}}.{amount}, 0)",
+        "closed_liters": (
+            f"CASE WHEN {{r}}.odo_after IS NOT NULL "
+            f"THEN COALESCE({{r}}.{liters}, 0) ELSE 0 END"
+        ),
+        "closed_amount": (
+            f"CASE WHEN {{r}}.odo_after IS NOT NULL "
+            f"THEN COALESCE({{r}}.{amount}, 0) ELSE 0 END"
+        ),
+        "full_fills": f"CASE WHEN {full} THEN 1 ELSE 0 END",
+        "full_distance": (
+            f"CASE WHEN {full} THEN {{r}}.odo_after - {{r}}.odo_before ELSE 0 END"
+        ),
+        "full_liters": f"CASE WHEN {full} THEN {{r}}.{liters} ELSE 0 END",
+        "full_amount": f"CASE WHEN {full} THEN COALESCE({{r}}.{amount}, 0) ELSE 0 END",
+    }
+
+
+def _monthly_agg(liters: str, amount: str, exact: bool) -> tuple[str, dict]:
+    columns = _columns(liters, amount)
+    integers = _COUNTS | _MONEY if exact else _COUNTS
+    names = ", ".join([*_KEY, *columns])
+
+    def rnd(expr: str, column: str) -> str:
+        return expr if column in integers else f"ROUND({expr}, 6)"
+
+    def add(row: str) -> str:
+        values = ", ".join(
+            [k.format(r=row) for k in _KEY.values()]
+            + [expr.format(r=row) for expr in columns.values()]
+        )
+        updates = ", ".join(f"{c} = {rnd(f'{c} + excluded.{c}', c)}" for c in columns)
+        return (
+            f"INSERT INTO monthly_agg ({names}) VALUES ({values}) "
+            f"ON CONFLICT(vehicle_id, month, fuel_type) DO UPDATE SET {updates};"
+        )
+
+    def subtract(row: str) -> str:
+        updates = ", ".join(
+            f"{c} = {rnd(f'{c} - ({expr.format(r=row)})', c)}"
+            for c, expr in columns.items()
+        )
+        where = " AND ".join(f"{c} = {k.format(r=row)}" for c, k in _KEY.items())
+        return (
+            f"UPDATE monthly_agg SET {updates} WHERE {where};"
+            f"DELETE FROM monthly_agg WHERE fills <= 0 AND {where};"
+        )
+
+    keys = [k.format(r="fuelentry") for k in _KEY.values()]
+    sums = [rnd(f"SUM({expr.format(r='fuelentry')})", c) for c, expr in columns.items()]
+    fill = (
+        f"INSERT INTO monthly_agg ({names}) "
+        f"SELECT {', '.join(keys + sums)} FROM fuelentry "
+        f"GROUP BY {', '.join(keys)}"
+    )
+    triggers = {
+        "trg_monthly_agg_insert": ("AFTER INSERT", add("NEW")),
+        "trg_monthly_agg_delete": ("AFTER DELETE", subtract("OLD")),
+        "trg_monthly_agg_update": ("AFTER UPDATE", subtract("OLD") + add("NEW")),
+    }
+    return fill, triggers
+
+
+def _drop_derived() -> None:
+    for name in ("insert", "delete", "update"):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_monthly_agg_{name}")
+    op.execute("DROP TABLE IF EXISTS monthly_agg")
+    op.execute("DROP INDEX IF EXISTS ix_fuelentry_missing_liters")
+    op.execute("DROP INDEX IF EXISTS ix_fuelentry_fuel_type_liters")
+    op.execute("DROP INDEX IF EXISTS ix_fuelprice_station_fuel_type_date")
+
+
+def _create_derived(liters: str, amount: str, price: str, exact: bool) -> None:
+    op.create_index(
+        "ix_fuelentry_missing_liters",
+        "fuelentry",
+        ["entry_date"],
+        sqlite_where=sa.text(f"{liters} IS NULL AND {amount} IS NOT NULL"),
+    )
+    op.create_index("ix_fuelentry_fuel_type_liters", "fuelentry", ["fuel_type", liters])
+    op.create_index(
+        "ix_fuelprice_station_fuel_type_date",
+        "fuelprice",
+        ["station", "fuel_type", "date", price],
+    )
+    integers = _COUNTS | _MONEY if exact else _COUNTS
+    op.create_table(
+        "monthly_agg",
+        sa.Column("vehicle_id", sa.Integer, primary_key=True),
+        sa.Column("month", sa.String, primary_key=True),
+        sa.Column("fuel_type", sa.String, primary_key=True),
+        *(
+            sa.Column(c, sa.Integer if c in integers else sa.Float, nullable=False)
+            for c in _columns(liters, amount)
+        ),
+    )
+    fill, triggers = _monthly_agg(liters, amount, exact)
+    op.execute(fill)
+    for name, (timing, body) in triggers.items():
+        op.execute(f"CREATE TRIGGER {name} {timing} ON fuelentry BEGIN {body} END")
+
+
+def _convert(source: int, target: int, sql_type: str, scale: str) -> None:
+    for conversion in _CONVERTED:
+        table, nullable = conversion[0], conversion[3]
+        old, new = conversion[source], conversion[target]
+        ddl = f"{new} {sql_type}" + ("" if nullable else " NOT NULL DEFAULT 0")
+        op.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+        op.execute(f"UPDATE {table} SET {new} = {scale.format(old)}")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN {old}")
+
+
+def upgrade() -> None:
+    # Databases opened by the application since this revision were
+    # converted already.
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("fuelentry")}
+    if "amount_satang" in columns:
+        return
+    _drop_derived()
+    _convert(1, 2, "INTEGER", "CAST(ROUND({} * 100) AS INTEGER)")
+    _create_derived("liters_cl", "amount_satang", "price_satang", exact=True)
+
+
+def downgrade() -> None:
+    _drop_derived()
+    _convert(2, 1, "FLOAT", "{} / 100.0")
+    _create_derived("liters", "amount_spent", "price", exact=False)
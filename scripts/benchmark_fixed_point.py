@@ -0,0 +1,132 @@
+"""Compare fixed-point integer money and volumes with the previous floats.
+
+Fills a temporary database with entries whose amounts and liters have two
+decimals, copies their values into one table of the previous ``REAL``
+columns and one of the fixed-point ``INTEGER`` columns, and times:
+
+* the ``SUM`` of amounts and liters over every entry, printing how far each
+  total is from the exact decimal sum;
+* the per-row liter calculation, the previous
+  ``float -> str -> Decimal -> quantize -> float`` round trip against
+  :func:`~src.models.fixed_point.liters_cl`.
+
+Usage::
+
+    python scripts/benchmark_fixed_point.py [entries]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import insert
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models import FuelEntry, Vehicle
+from src.models.fixed_point import SCALE, liters_cl, to_units
+from src.services.storage_service import StorageService
+
+
+def satang(i: int) -> int:
+    return 10_000 + i * 37 % 90_000
+
+
+def centiliters(i: int) -> int:
+    return 100 + i * 53 % 6_000
+
+
+def fill(storage: StorageService, entries: int) -> None:
+    storage.add_vehicle(
+        Vehicle(name="v", vehicle_type="car", license_plate="x", tank_capacity_liters=1)
+    )
+    with storage.engine.begin() as conn:
+        conn.execute(
+            insert(FuelEntry),
+            [
+                {
+                    "entry_date": date(2020, 1, 1) + timedelta(days=i % 1500),
+                    "vehicle_id": 1,
+                    "fuel_type": "e20",
+                    "odo_before": i * 10.0,
+                    "odo_after": i * 10.0 + 10,
+                    "liters": centiliters(i) / SCALE,
+                    "amount_spent": satang(i) / SCALE,
+                }
+                for i in range(entries)
+            ],
+        )
+        # Tables of just the two columns, so both sums read as many pages.
+        conn.exec_driver_sql("CREATE TABLE legacy (amount_spent REAL, liters REAL)")
+        conn.exec_driver_sql(
+            "INSERT INTO legacy SELECT amount_satang / 100.0, liters_cl / 100.0 "
+            "FROM fuelentry"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE fixed (amount_satang INTEGER, liters_cl INTEGER)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO fixed SELECT amount_satang, liters_cl FROM fuelentry"
+        )
+
+
+def best_of(func, *args, repeat: int = 5) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    exact_amount = Decimal(sum(satang(i) for i in range(entries))) / SCALE
+    exact_liters = Decimal(sum(centiliters(i) for i in range(entries))) / SCALE
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = StorageService(db_path=Path(tmp) / "fp.db", password="")
+        fill(storage, entries)
+        with storage.engine.connect() as conn:
+
+            def fetch(sql: str) -> tuple:
+                return conn.exec_driver_sql(sql).cursor.fetchone()
+
+            for name, sql, scale in (
+                ("REAL", "SELECT SUM(amount_spent), SUM(liters) FROM legacy", 1),
+                (
+                    "INTEGER",
+                    "SELECT SUM(amount_satang), SUM(liters_cl) FROM fixed",
+                    SCALE,
+                ),
+            ):
+                elapsed, row = best_of(fetch, sql)
+                money, volume = (Decimal(repr(v)) / scale for v in row)
+                print(
+                    f"SUM {name:<8}{entries} entries {elapsed * 1000:8.2f} ms  "
+                    f"error {float(money - exact_amount):+.2e} baht "
+                    f"{float(volume - exact_liters):+.2e} l"
+                )
+        storage.engine.dispose()
+
+    price = Decimal("37.35")
+    price_satang = to_units(price)
+    amounts = [satang(i) / SCALE for i in range(entries)]
+    elapsed, old = best_of(
+        lambda: [
+            float((Decimal(str(a)) / price).quantize(Decimal("0.01"))) for a in amounts
+        ]
+    )
+    print(f"liters Decimal   {entries} rows {elapsed * 1000:8.2f} ms")
+    elapsed, new = best_of(
+        lambda: [liters_cl(to_units(a), price_satang) / SCALE for a in amounts]
+    )
+    print(f"liters integer   {entries} rows {elapsed * 1000:8.2f} ms")
+    differ = sum(1 for a, b in zip(old, new) if a != b)
+    print(f"rows rounded differently (half-even vs half-up): {differ}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Time :meth:`StorageService.to_frame` on a large generated history.
+
+Fills a temporary database with entries spread over 20 vehicles and all
+fuel types, then reports how long a full-history DataFrame takes to load
+(the best of a few runs), and :meth:`StorageService.to_arrow` when pyarrow
+is installed. ``--models`` also times the old way of building the same
+frame: loading every :class:`FuelEntry` and appending one dict per row.
+
+Usage::
+
+    python scripts/benchmark_frame.py [entries] [--models]
+"""
+
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from importlib.util import find_spec
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import insert
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.constants import FUEL_TYPE_TH
+from src.models import FuelEntry, Vehicle
+from src.services.storage_service import StorageService
+
+VEHICLES = 20
+
+
+def fill(storage: StorageService, entries: int) -> None:
+    fuel_types = list(FUEL_TYPE_TH)
+    with storage.engine.begin() as conn:
+        conn.execute(
+            insert(Vehicle),
+            [
+                {
+                    "name": f"รถคันที่ {i}",
+                    "vehicle_type": "car",
+                    "license_plate": f"กข {i:04d}",
+                    "tank_capacity_liters": 50.0,
+                }
+                for i in range(1, VEHICLES + 1)
+            ],
+        )
+        conn.execute(
+            insert(FuelEntry),
+            [
+                {
+                    "entry_date": date(2000, 1, 1) + timedelta(days=i // 50),
+                    "vehicle_id": i % VEHICLES + 1,
+                    "fuel_type": fuel_types[i % len(fuel_types)],
+                    "odo_before": i * 10.0,
+                    "odo_after": None if i % 9 == 0 else i * 10.0 + 350,
+                    "liters": 30.0,
+                    "amount_spent": 1050.0,
+                }
+                for i in range(entries)
+            ],
+        )
+
+
+def best(read: Callable[[], object], runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        read()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def from_models(storage: StorageService) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "date": e.entry_date,
+                "vehicle_id": e.vehicle_id,
+                "fuel_type": e.fuel_type,
+                "odo_before": e.odo_before,
+                "odo_after": e.odo_after,
+                "liters": e.liters,
+                "amount_spent": e.amount_spent,
+            }
+            for e in storage.list_entries()
+        ]
+    )
+
+
+def main() -> None:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    entries = int(args[0]) if args else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = StorageService(db_path=Path(tmp) / "frame.db", password="")
+        fill(storage, entries)
+        print(f"{entries} entries")
+        print(f"to_frame  {best(storage.to_frame, 3) * 1000:>8.0f} ms")
+        if find_spec("pyarrow") is not None:
+            print(f"to_arrow  {best(storage.to_arrow, 3) * 1000:>8.0f} ms")
+        if "--models" in sys.argv:
+            print(f"models    {best(lambda: from_models(storage), 1) * 1000:>8.0f} ms")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
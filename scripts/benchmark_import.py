@@ -0,0 +1,77 @@
+"""Compare the row-based and columnar CSV import paths.
+
+Usage::
+
+    python scripts/benchmark_import.py [rows]
+"""
+
+import csv
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models import Vehicle
+from src.services.importer import CSV_ENGINE, Importer
+from src.services.storage_service import StorageService
+
+
+def write_csv(path: Path, rows: int) -> None:
+    start = date(2000, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(
+            ["date", "fuel_type", "odo_before", "odo_after", "liters", "amount_spent"]
+        )
+        for i in range(rows):
+            writer.writerow(
+                [
+                    (start + timedelta(days=i // 4)).isoformat(),
+                    "e20",
+                    i * 100,
+                    "" if i % 5 else i * 100 + 80,
+                    "" if i % 2 else 30,
+                    1000,
+                ]
+            )
+
+
+def timed(label: str, func) -> None:
+    t0 = time.perf_counter()
+    func()
+    print(f"{label:<28}{time.perf_counter() - t0:8.2f} s")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "entries.csv"
+        write_csv(csv_path, rows)
+        print(f"{rows} rows, pandas engine: {CSV_ENGINE}")
+
+        for name, method in (
+            ("row", "import_csv"),
+            ("columnar", "import_csv_columnar"),
+        ):
+            storage = StorageService(db_path=Path(tmp) / f"{name}.db", password="")
+            storage.add_vehicle(
+                Vehicle(
+                    name="Car",
+                    vehicle_type="sedan",
+                    license_plate="A",
+                    tank_capacity_liters=40,
+                )
+            )
+            importer = Importer(storage)
+            parse = importer.read_csv if name == "row" else importer.read_frame
+            run = getattr(importer, method)
+            timed(f"{name} parse", lambda parse=parse: parse(csv_path))
+            timed(f"{name} parse + insert", lambda run=run: run(csv_path, 1))
+            storage.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare memory and time of model reads with column projections.
+
+Fills a temporary database with one month of entries, then reads them back
+the way the reports used to (:meth:`StorageService.list_entries_for_month`,
+one :class:`FuelEntry` per row) and through
+:meth:`StorageService.project_entries` with the columns a monthly report reads. For each
+it prints the time (untraced), the memory still held by the result per row and the
+peak allocated per row while reading, as measured by :mod:`tracemalloc`.
+
+Usage::
+
+    python scripts/benchmark_projection.py [entries]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models import FuelEntry, Vehicle
+from src.services.date_ranges import month_range
+from src.services.storage_service import StorageService
+
+#: The columns a monthly report reads.
+COLUMNS = (
+    "entry_date",
+    "vehicle_id",
+    "fuel_type",
+    "odo_before",
+    "odo_after",
+    "liters",
+    "amount_spent",
+)
+
+
+def fill(storage: StorageService, entries: int) -> None:
+    storage.add_vehicle(
+        Vehicle(name="v", vehicle_type="car", license_plate="x", tank_capacity_liters=1)
+    )
+    with storage.engine.begin() as conn:
+        conn.execute(
+            insert(FuelEntry),
+            [
+                {
+                    "entry_date": date(2024, 1, 1) + timedelta(days=i % 31),
+                    "vehicle_id": 1,
+                    "fuel_type": "e20",
+                    "odo_before": i * 10.0,
+                    "odo_after": i * 10.0 + 10,
+                    "liters": 1.0,
+                    "amount_spent": 35.0,
+                }
+                for i in range(entries)
+            ],
+        )
+
+
+def measure(name: str, read: Callable[[], list]) -> None:
+    read()  # warm up statement caches
+    t0 = time.perf_counter()
+    read()
+    elapsed = time.perf_counter() - t0
+    # Timed separately: tracing slows every allocation down.
+    tracemalloc.start()
+    rows = read()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n = len(rows) or 1
+    print(
+        f"{name:<10}{len(rows):>8}{elapsed * 1000:>10.1f}ms{held // n:>8}B{peak // n:>8}B"
+    )
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = StorageService(db_path=Path(tmp) / "projection.db", password="")
+        fill(storage, entries)
+        print(f"{'read':<10}{'rows':>8}{'time':>12}{'held':>9}{'peak':>9}")
+        measure("models", lambda: storage.list_entries_for_month(2024, 1))
+        measure(
+            "tuples",
+            lambda: storage.project_entries(COLUMNS, *month_range(2024, 1)),
+        )
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Time :meth:`StorageService.search` on a large generated fleet.
+
+Fills a temporary database with vehicles and maintenance tasks named in
+Thai and English, then reports the median and 95th percentile latency of a
+few typical queries, including a Thai prefix and a short plate term that
+falls back to ``LIKE``.
+
+Usage::
+
+    python scripts/benchmark_search.py [vehicles] [tasks per vehicle] [runs]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models import Maintenance, Vehicle
+from src.services.storage_service import StorageService
+
+BRANDS = ["โตโยต้า", "ฮอนด้า", "อีซูซุ", "Nissan", "Mazda", "Ford"]
+MODELS = ["รถกระบะ", "รถเก๋ง", "มอเตอร์ไซค์", "Van", "Truck"]
+TASKS = ["เปลี่ยนน้ำมันเครื่อง", "เปลี่ยนยาง", "Brake pads", "ล้างแอร์", "Battery"]
+QUERIES = ["รถกระ", "โตโยต้า 12", "น้ำมันเครื่อง", "brake", "กข", "Nissan Van"]
+
+
+def fill(storage: StorageService, vehicles: int, tasks: int) -> None:
+    with storage.engine.begin() as conn:
+        conn.execute(
+            insert(Vehicle),
+            [
+                {
+                    "name": f"{MODELS[i % 5]}{BRANDS[i % 6]} {i}",
+                    "vehicle_type": "car",
+                    "license_plate": f"กข {i:04d}",
+                    "tank_capacity_liters": 50.0,
+                }
+                for i in range(1, vehicles + 1)
+            ],
+        )
+        conn.execute(
+            insert(Maintenance),
+            [
+                {
+                    "vehicle_id": i % vehicles + 1,
+                    "name": TASKS[i % 5],
+                    "note": f"ศูนย์{BRANDS[i % 6]} สาขา {i % 97}",
+                    "is_done": False,
+                }
+                for i in range(vehicles * tasks)
+            ],
+        )
+
+
+def main() -> None:
+    vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    tasks = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = StorageService(db_path=Path(tmp) / "search.db", password="")
+        fill(storage, vehicles, tasks)
+        print(f"{vehicles} vehicles, {vehicles * tasks} maintenance tasks")
+        print(f"{'query':<16}{'hits':>6}{'p50':>10}{'p95':>10}")
+        for query in QUERIES:
+            times = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                hits = storage.search(query)
+                times.append(time.perf_counter() - t0)
+            p50 = statistics.median(times) * 1000
+            p95 = statistics.quantiles(times, n=20)[-1] * 1000
+            print(f"{query:<16}{len(hits):>6}{p50:>8.2f}ms{p95:>8.2f}ms")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Compare commit latency and concurrent reads of the storage profiles.
+
+For every profile in :data:`src.services.sqlite_profile.PROFILES` the script
+times single-entry commits through :meth:`StorageService.add_entry`, then
+runs a writer thread beside reader threads (like the reports worker beside
+the GUI) and counts the reads, writes and lock errors.
+
+Usage::
+
+    python scripts/benchmark_storage_profile.py [commits] [seconds] [readers]
+"""
+
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models import FuelEntry, Vehicle
+from src.services.sqlite_profile import PROFILES
+from src.services.storage_service import StorageService
+
+START = date(2024, 1, 1)
+
+
+def _entry(i: int) -> FuelEntry:
+    return FuelEntry(
+        entry_date=START + timedelta(days=i % 365),
+        vehicle_id=1,
+        fuel_type="e20",
+        odo_before=float(i * 10),
+        amount_spent=500.0,
+        liters=12.5,
+    )
+
+
+def commit_latency(storage: StorageService, commits: int) -> list[float]:
+    times = []
+    for i in range(commits):
+        t0 = time.perf_counter()
+        storage.add_entry(_entry(i))
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def concurrent(
+    storage: StorageService, seconds: float, readers: int
+) -> tuple[int, int, int]:
+    stop = time.perf_counter() + seconds
+    reads = writes = errors = 0
+    lock = threading.Lock()
+
+    def reader() -> None:
+        nonlocal reads, errors
+        while time.perf_counter() < stop:
+            try:
+                storage.monthly_totals()
+                storage.list_entries_for_month(1, 2024, 1)
+            except OperationalError:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                reads += 1
+
+    def writer() -> None:
+        nonlocal writes, errors
+        i = 100_000
+        while time.perf_counter() < stop:
+            try:
+                storage.add_entry(_entry(i))
+            except OperationalError:
+                with lock:
+                    errors += 1
+                continue
+            i += 1
+            writes += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return reads, writes, errors
+
+
+def main() -> None:
+    commits = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(
+        f"{'profile':<10}{'commit p50':>12}{'commit p95':>12}"
+        f"{'reads/s':>10}{'writes/s':>10}{'errors':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in PROFILES:
+            storage = StorageService(
+                db_path=Path(tmp) / f"{name}.db",
+                password="",
+                profile=name,
+                vacuum_threshold=10**9,
+            )
+            storage.add_vehicle(
+                Vehicle(
+                    name="v",
+                    vehicle_type="car",
+                    license_plate="x",
+                    tank_capacity_liters=1,
+                )
+            )
+            times = commit_latency(storage, commits)
+            p50 = statistics.median(times) * 1000
+            p95 = statistics.quantiles(times, n=20)[-1] * 1000
+            reads, writes, errors = concurrent(storage, seconds, readers)
+            print(
+                f"{name:<10}{p50:>10.2f}ms{p95:>10.2f}ms"
+                f"{reads / seconds:>10.0f}{writes / seconds:>10.0f}{errors:>8}"
+            )
+            storage.close()
+
+
+if __name__ == "__main__":
+    main()
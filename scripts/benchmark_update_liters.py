@@ -0,0 +1,99 @@
+"""Compare the per-row and set-based ``update_missing_liters``.
+
+Usage::
+
+    python scripts/benchmark_update_liters.py [entries]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models import FuelEntry, FuelPrice
+from src.services.oil_service import get_price, update_missing_liters
+from src.services.storage_service import StorageService
+
+START = date(2020, 1, 1)
+DAYS = 1500
+
+
+def seed(storage: StorageService, entries: int) -> None:
+    with Session(storage.engine) as session:
+        # Prices every other day so half of the lookups use the fallback.
+        session.add_all(
+            FuelPrice(
+                date=START + timedelta(days=d),
+                station="ptt",
+                fuel_type=ftype,
+                name_th=ftype,
+                price=Decimal(30) + d % 7,
+            )
+            for d in range(0, DAYS, 2)
+            for ftype in ("e20", "gasohol95")
+        )
+        session.commit()
+        session.execute(
+            insert(FuelEntry.__table__),
+            [
+                {
+                    "entry_date": START + timedelta(days=i % DAYS),
+                    "vehicle_id": 1,
+                    "fuel_type": "e20" if i % 3 else "gasohol95",
+                    "odo_before": float(i),
+                    "odo_after": None,
+                    "amount_spent": 1000.0,
+                    "liters": None,
+                }
+                for i in range(entries)
+            ],
+        )
+        session.commit()
+
+
+def legacy_update(session: Session, station: str = "ptt") -> None:
+    """The previous implementation: one price lookup per (type, day)."""
+    stmt = select(FuelEntry).where(
+        FuelEntry.liters.is_(None), FuelEntry.amount_spent.is_not(None)
+    )
+    prices: dict[tuple[str, date], Decimal | None] = {}
+    for entry in session.exec(stmt).all():
+        key = (entry.fuel_type or "e20", entry.entry_date)
+        if key not in prices:
+            prices[key] = get_price(session, key[0], station, key[1])
+        price = prices[key]
+        if price is None:
+            continue
+        entry.liters = float(
+            (Decimal(str(entry.amount_spent)) / price).quantize(Decimal("0.01"))
+        )
+        session.add(entry)
+    session.commit()
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, func in (("per-row", legacy_update), ("set-based", None)):
+            storage = StorageService(db_path=Path(tmp) / f"{name}.db", password="")
+            seed(storage, entries)
+            with Session(storage.engine) as session:
+                t0 = time.perf_counter()
+                if func is None:
+                    update_missing_liters(session)
+                else:
+                    func(session)
+                elapsed = time.perf_counter() - t0
+            print(f"{name:<12}{entries} entries {elapsed:8.2f} s")
+            storage.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 from src.controllers import main_controller, undo_commands
 from src.services import (
+    date_ranges,
     exporter,
     importer,
     report_service,
@@ -10,6 +11,7 @@ from src.services import (
 from src import settings
 from src.repositories import fuel_entry_repo
 from src.models import fuel_entry as models_fuel_entry
+from src.views import entry_table_model
 import importlib
 from typing import TYPE_CHECKING, Any
 
@@ -28,6 +30,11 @@ _m0005 = importlib.import_module("fueltracker.migrations.versions.0005_add_fuel_
 _m0006 = importlib.import_module("fueltracker.migrations.versions.0006_add_indexes")
 _m0007 = importlib.import_module("fueltracker.migrations.versions.0007_add_fuelprice_index")
 _m0008 = importlib.import_module("fueltracker.migrations.versions.0008_add_budget_index")
+_m0009 = importlib.import_module("fueltracker.migrations.versions.0009_unique_fuelprice_day")
+_m0010 = importlib.import_module("fueltracker.migrations.versions.0010_add_monthly_agg")
+_m0011 = importlib.import_module("fueltracker.migrations.versions.0011_incremental_auto_vacuum")
+_m0012 = importlib.import_module("fueltracker.migrations.versions.0012_add_query_indexes")
+_m0013 = importlib.import_module("fueltracker.migrations.versions.0013_add_search_index")
 
 # Reference attribute to avoid vulture false positive
 _dummy_axid = exporter.LineChart().y_axis.axId
@@ -37,6 +44,14 @@ _ = (
     main_controller.closeEvent,
     main_controller._load_prices,
     main_controller._notify_due_maintenance,
+    # --- QAbstractTableModel overrides called by the view ---
+    entry_table_model.EntryTableModel.canFetchMore,
+    entry_table_model.EntryTableModel.fetchMore,
+    entry_table_model.EntryTableModel.rowCount,
+    entry_table_model.EntryTableModel.columnCount,
+    entry_table_model.EntryTableModel.headerData,
+    entry_table_model.EntryTableModel.data,
+    entry_table_model.EntryTableModel.loading,
     # --- Methods from undo_commands.py that are used by QUndoStack ---
     undo_commands.AddEntryCommand.undo,
     undo_commands.AddEntryCommand.redo,
@@ -61,6 +76,16 @@ _ = (
     storage_service.get_entries_by_vehicle,
     storage_service.list_entries,
     storage_service.update_entry,
+    storage_service.StorageService.rebuild_monthly_agg,
+    storage_service.StorageService.pool_stats,
+    storage_service.StorageService.profile,
+    storage_service.StorageService.vacuum_stats,
+    storage_service.StorageService.search,
+    storage_service.StorageService.to_arrow,
+    date_ranges.quarter_range,
+    date_ranges.year_range,
+    date_ranges.fiscal_year_range,
+    date_ranges.rolling_days,
     fuel_entry_repo.last_entry,
     models_fuel_entry.FuelEntry.calc_metrics,
     # --- Variables used by Pydantic ---
@@ -111,6 +136,26 @@ _ = (
     _m0008.branch_labels,
     _m0008.depends_on,
     _m0008.downgrade,
+    _m0009.down_revision,
+    _m0009.branch_labels,
+    _m0009.depends_on,
+    _m0009.downgrade,
+    _m0010.down_revision,
+    _m0010.branch_labels,
+    _m0010.depends_on,
+    _m0010.downgrade,
+    _m0011.down_revision,
+    _m0011.branch_labels,
+    _m0011.depends_on,
+    _m0011.downgrade,
+    _m0012.down_revision,
+    _m0012.branch_labels,
+    _m0012.depends_on,
+    _m0012.downgrade,
+    _m0013.down_revision,
+    _m0013.branch_labels,
+    _m0013.depends_on,
+    _m0013.downgrade,
     _dummy_axid,
 )
 
@@ -17,6 +17,7 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
     QFileDialog,
+    QProgressDialog,
 )
 from PySide6.QtGui import (
     QDoubleValidator,
@@ -44,9 +45,14 @@ from PySide6.QtCore import (
 )
 import shiboken6
 from concurrent.futures import ThreadPoolExecutor
-from PySide6.QtWidgets import QTableWidget, QTableWidgetItem, QSystemTrayIcon
+from PySide6.QtWidgets import (
+    QTableView,
+    QTableWidget,
+    QTableWidgetItem,
+    QSystemTrayIcon,
+)
 
-from typing import TYPE_CHECKING, Any, cast, Optional
+from typing import TYPE_CHECKING, Any, Callable, cast, Optional
 
 if TYPE_CHECKING:
     from win10toast import ToastNotifier
@@ -67,6 +73,9 @@ from pathlib import Path
 import logging
 import os
 import sys
+import threading
+import time
+import weakref
 from datetime import datetime
 import requests
 import shutil
@@ -79,7 +88,10 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
 from ..models import FuelEntry, Vehicle, Maintenance, FuelPrice
+from ..models.fixed_point import SCALE, liters_cl, to_units
 from ..services import (
+    DashboardService,
+    DashboardSnapshot,
     ReportService,
     StorageService,
     Exporter,
@@ -88,7 +100,15 @@ from ..services import (
     ThemeManager,
     TrayIconManager,
 )
-from ..services.oil_service import fetch_latest, get_price as _get_price
+from ..services.oil_service import (
+    fetch_latest,
+    get_price as _get_price,
+    replay_cached_prices,
+)
+from ..services.price_fetcher import PriceFetcher
+from ..services.importer import ImportCancelled
+from ..services.storage_service import BackupCancelled, EntryFilter
+from ..services.response_cache import ResponseCache
 from ..config import AppConfig
 from .undo_commands import (
     AddEntryCommand,
@@ -105,11 +125,30 @@ from ..views import (
     ImportCsvDialog,
     load_add_entry_dialog,
 )
+from ..views.entry_table_model import EntryTableModel
 from ..views.reports_page import ReportsPage
 from ..hotkey import GlobalHotkey
 
 logger = logging.getLogger(__name__)
 
+#: Number of CSV rows shown in the import preview table.
+PREVIEW_ROWS = 200
+
+#: How often to check whether the database is idle enough for maintenance.
+IDLE_MAINTENANCE_MS = 60_000
+
+#: Quiet time after the last keystroke before the entry search runs.
+ENTRY_SEARCH_DEBOUNCE_MS = 300
+
+#: Interval of the automatic backups.
+BACKUP_INTERVAL_MS = 86_400_000
+
+#: How long quitting waits for a cancelled backup to stop.
+BACKUP_STOP_SECONDS = 5.0
+
+#: Longest a backup made at quit may run before it is cancelled.
+BACKUP_QUIT_SECONDS = 10.0
+
 
 def get_price(*args: Any, **kwargs: Any) -> Optional[Decimal]:
     """Wrapper for src.services.oil_service.get_price."""
@@ -173,10 +212,121 @@ class OilPricesDock(QDockWidget):
         self.setWidget(widget)
 
 
+class _ControllerJob(QRunnable):
+    """Thread pool job reporting to the controller through its signals.
+
+    The job only keeps a weak reference: the pool deletes it on the worker
+    thread, where dropping the last reference would destroy the controller
+    and its widgets outside the GUI thread. ``done`` is set once :meth:`work`
+    has returned and released the controller.
+    """
+
+    def __init__(
+        self,
+        controller: "MainController",
+        cancel: threading.Event,
+        done: threading.Event,
+    ) -> None:
+        super().__init__()
+        self._controller = weakref.ref(controller)
+        self.cancel = cancel
+        self.done = done
+
+    def run(self) -> None:
+        try:
+            controller = self._controller()
+            if controller is not None:
+                self.work(controller)
+            del controller
+        finally:
+            self.done.set()
+
+    def work(self, controller: "MainController") -> None:
+        raise NotImplementedError
+
+    def _emit(self, signal: str, *args: Any) -> None:
+        controller = self._controller()
+        if controller is not None and shiboken6.Shiboken.isValid(controller):
+            getattr(controller, signal).emit(*args)
+
+
+class _BackupJob(_ControllerJob):
+    """Run :meth:`StorageService.auto_backup` on the thread pool.
+
+    Progress and the result reach the controller through its
+    ``backup_progress`` and ``backup_finished`` signals.
+    """
+
+    def work(self, controller: "MainController") -> None:
+        backup: Path | None = None
+        try:
+            backup = controller._backup(
+                self.cancel,
+                lambda copied, total: self._emit("backup_progress", copied, total),
+            )
+        except BackupCancelled:
+            logger.info("ยกเลิกการสำรองข้อมูล")
+        except Exception:  # pragma: no cover - ignore failures with in-memory DB
+            logger.debug("สำรองข้อมูลไม่สำเร็จ", exc_info=True)
+        self._emit("backup_finished", backup)
+
+
+class _ImportJob(_ControllerJob):
+    """Run :meth:`Importer.import_csv_chunked` on the thread pool.
+
+    The import's transaction belongs to the worker thread, so nothing the
+    GUI thread writes meanwhile joins it. Progress and the result reach the
+    controller through its ``import_progress`` and ``import_finished``
+    signals.
+    """
+
+    def __init__(
+        self,
+        controller: "MainController",
+        path: Path,
+        vehicle_id: int,
+        cancel: threading.Event,
+        done: threading.Event,
+    ) -> None:
+        super().__init__(controller, cancel, done)
+        self.path = path
+        self.vehicle_id = vehicle_id
+
+    def work(self, controller: "MainController") -> None:
+        result: tuple[int, list[tuple[int, str]]] | str | None = None
+        try:
+            size = max(self.path.stat().st_size, 1)
+            result = controller.importer.import_csv_chunked(
+                self.path,
+                self.vehicle_id,
+                progress=lambda _rows, read: self._emit(
+                    "import_progress", min(100, read * 100 // size)
+                ),
+                cancel=self.cancel,
+            )
+        except ImportCancelled:
+            logger.info("ยกเลิกการนำเข้า CSV")
+        except Exception as exc:
+            logger.exception("นำเข้า CSV ไม่สำเร็จ")
+            result = str(exc)
+        self._emit("import_finished", result)
+
+
 class MainController(QObject):
     entry_changed = Signal()
     export_finished = Signal(Path, Path)
     export_failed = Signal(str)
+    #: ``(generation, snapshot)`` from the dashboard loader.
+    dashboard_ready = Signal(int, object)
+    #: ``(pages copied, total pages)`` of the running backup.
+    backup_progress = Signal(int, int)
+    #: Path of the new backup, ``None`` when it failed or was cancelled.
+    backup_finished = Signal(object)
+    #: Percent of the CSV file imported so far.
+    import_progress = Signal(int)
+    #: ``(inserted, errors)`` of the import, an error message when it
+    #: failed or ``None`` when it was cancelled.
+    import_finished = Signal(object)
     """โค้ดเชื่อมระหว่างวิดเจ็ต Qt กับบริการของแอป"""
 
     def __init__(
@@ -187,6 +337,7 @@ class MainController(QObject):
         config_path: str | Path | None = None,
     ) -> None:
         super().__init__()
+        self._cleaned_up = False
         self.env = Settings()
         self.config_path = Path(config_path) if config_path else None
         self.config = AppConfig.load(self.config_path)
@@ -197,6 +348,8 @@ class MainController(QObject):
         self._dark_mode = dark_mode
         self._theme_override = theme.lower() if theme else None
         self.report_service = ReportService(self.storage)
+        self.dashboard = DashboardService(self.storage)
+        self._dashboard_generation = 0
         self.exporter = Exporter(self.storage)
         self.export_service = ExportService(self.storage)
         self.importer = Importer(self.storage)
@@ -255,7 +408,21 @@ class MainController(QObject):
                 self.window.themeComboBox.setCurrentIndex(idx)
         self.thread_pool = QThreadPool.globalInstance()
         self.executor = ThreadPoolExecutor(max_workers=1)
+        self.entry_model = EntryTableModel(self.storage, self.executor, parent=self)
+        table = getattr(getattr(self.window, "ui", None), "fuelTable", None)
+        if isinstance(table, QTableView):
+            table.setModel(self.entry_model)
+        self._entry_search_timer = QTimer(self)
+        self._entry_search_timer.setSingleShot(True)
+        self._entry_search_timer.setInterval(ENTRY_SEARCH_DEBOUNCE_MS)
+        self._entry_search_timer.timeout.connect(self.filter_entries)
         self._price_timer_started = False
+        # Kept for the controller's lifetime so ETags and the circuit
+        # breaker state carry over between scheduled updates.
+        self.price_fetcher = PriceFetcher(max_connections=2, retries=2)
+        self.price_cache = ResponseCache(
+            Path(db_path or self.env.db_path).parent / "api_cache"
+        )
         self.window.installEventFilter(self)
         app = QApplication.instance()
         self.theme_manager = (
@@ -265,8 +432,25 @@ class MainController(QObject):
             app.aboutToQuit.connect(self.cleanup)
             if self.theme_manager is not None:
                 self.theme_manager.palette_changed.connect(self._on_palette_changed)
-        self.entry_changed.connect(self._update_stats_panel)
-        self.entry_changed.connect(self._refresh_maintenance_panel)
+        # Emitted from the executor thread, delivered on the GUI thread.
+        self.dashboard_ready.connect(self._apply_dashboard)
+        self.backup_progress.connect(self._show_backup_progress)
+        self.backup_finished.connect(self._show_backup_finished)
+        self.import_progress.connect(self._show_import_progress)
+        self.import_finished.connect(self._show_import_finished)
+        # Set while no backup runs; ``cleanup`` cancels a running one.
+        self._backup_cancel = threading.Event()
+        self._backup_done = threading.Event()
+        self._backup_done.set()
+        # ``data_version`` when the last completed backup started.
+        self._backup_version: int | None = None
+        # Like the backup events, for the running CSV import.
+        self._import_cancel = threading.Event()
+        self._import_done = threading.Event()
+        self._import_done.set()
+        self._import_progress: QProgressDialog | None = None
+        self.entry_changed.connect(self._refresh_dashboard)
+        self.entry_changed.connect(self.entry_model.refresh)
         self._setup_style()
         self._connect_signals()
         self.tray_manager = TrayIconManager(
@@ -283,6 +467,8 @@ class MainController(QObject):
         self.refresh_vehicle_list()
         if hasattr(self.window, "stackedWidget"):
             self.window.stackedWidget.setCurrentWidget(self.window.dashboardPage)
+        self._idle_version = -1
+        self._schedule_idle_maintenance()
         # Start automatic daily backups
         self._schedule_daily_backup()
 
@@ -326,9 +512,9 @@ class MainController(QObject):
         if hasattr(w, "vehicleListWidget"):
             w.vehicleListWidget.itemSelectionChanged.connect(self._vehicle_changed)
         if hasattr(w, "searchLineEdit"):
-            w.searchLineEdit.textChanged.connect(self.filter_entries)
+            w.searchLineEdit.textChanged.connect(self._entry_search_timer.start)
         if hasattr(w, "startDateEdit"):
-            w.startDateEdit.dateChanged.connect(self.filter_entries)
+            w.startDateEdit.dateChanged.connect(self._entry_search_timer.start)
         if hasattr(w, "sidebarList"):
             w.sidebarList.currentRowChanged.connect(self._switch_page)
         if hasattr(self, "reports_page"):
@@ -364,7 +550,9 @@ class MainController(QObject):
         self.sync_enabled = checked
 
     def _browse_cloud_path(self) -> None:
-        path = QFileDialog.getExistingDirectory(self.window, self.tr("เลือกโฟลเดอร์ซิงก์"))
+        path = QFileDialog.getExistingDirectory(
+            self.window, self.tr("เลือกโฟลเดอร์ซิงก์")
+        )
         if path:
             self.cloud_path = Path(path)
             if hasattr(self.window, "cloudPathEdit"):
@@ -408,7 +596,9 @@ class MainController(QObject):
                 f'@echo off\r\n"{sys.executable}" -m fueltracker --start-minimized\r\n'
             )
             shortcut.write_text(cmd, encoding="utf-8")
-            QMessageBox.information(self.window, "ตั้งค่าเรียบร้อย", "สร้างทางลัดเริ่มอัตโนมัติแล้ว")
+            QMessageBox.information(
+                self.window, "ตั้งค่าเรียบร้อย", "สร้างทางลัดเริ่มอัตโนมัติแล้ว"
+            )
 
     def _budget_vehicle_changed(self) -> None:
         if not hasattr(self.window, "budgetVehicleComboBox"):
@@ -442,67 +632,55 @@ class MainController(QObject):
             self._selected_vehicle_id = item.data(Qt.ItemDataRole.UserRole)
         else:
             self._selected_vehicle_id = None
-        self._update_stats_panel()
+        self._refresh_dashboard()
 
-    def _update_stats_panel(self) -> None:
-        vid = self._selected_vehicle_id
-        if vid is None:
-            self.stats_dock.kml_label.setText("กม./ลิตร: -")
-            self.stats_dock.cost_label.setText("บาท/กม.: -")
-            return
-        total_distance, total_liters, total_price = self.storage.get_vehicle_stats(vid)
-        kmpl = total_distance / total_liters if total_liters else 0.0
-        cost = total_price / total_distance if total_distance else 0.0
-        self.stats_dock.kml_label.setText(f"กม./ลิตร: {kmpl:.2f}")
-        self.stats_dock.cost_label.setText(f"บาท/กม.: {cost:.2f}")
-        self._update_tray_tooltip()
-
-    def _update_tray_tooltip(self) -> None:
-        """Update system tray tooltip with a short summary of the last entry."""
-        if not getattr(self, "tray_manager", None):
-            return
+    def _refresh_dashboard(self) -> None:
+        """Reload the stats, tooltip and maintenance widgets in the background.
+
+        Every call bumps a generation counter so a snapshot still in flight
+        for an earlier vehicle or change is dropped when it arrives.
+        """
+        self._dashboard_generation += 1
+        generation = self._dashboard_generation
         vid = self._selected_vehicle_id
         if vid is None:
-            self.tray_manager.set_tooltip("")
+            self._show_dashboard(None)
             return
-        last = self.storage.get_last_entry(vid)
-        if not last:
-            self.tray_manager.set_tooltip("")
-            return
-        parts = [str(last.entry_date)]
-        if last.odo_after is not None:
-            dist = last.odo_after - last.odo_before
-            parts.append(f"{dist:g} km")
-        if last.amount_spent is not None:
-            parts.append(f"฿{last.amount_spent:g}")
-        self.tray_manager.set_tooltip(" - ".join(parts))
+        try:
+            self.executor.submit(self._load_dashboard, generation, vid)
+        except RuntimeError:
+            # The executor is shut down once the application quits.
+            logger.debug("ไม่ได้โหลดแดชบอร์ด: executor ปิดแล้ว")
 
-    def _check_budget(self, vehicle_id: int, entry_date: date) -> None:
-        budget = self.storage.get_budget(vehicle_id)
-        if budget is None:
+    def _load_dashboard(self, generation: int, vehicle_id: int) -> None:
+        """Read the snapshot; runs on the executor thread."""
+        try:
+            snapshot = self.dashboard.snapshot(vehicle_id)
+        except Exception:
+            logger.exception("โหลดข้อมูลแดชบอร์ดไม่สำเร็จ")
             return
-        total = self.storage.get_total_spent(
-            vehicle_id, entry_date.year, entry_date.month
-        )
-        if total > budget:
-            QMessageBox.warning(
-                self.window,
-                "เกินงบประมาณ",
-                "ค่าใช้จ่ายค่าน้ำมันเดือนนี้เกินงบที่ตั้งไว้",
-            )
-            if getattr(self, "tray_manager", None):
-                self.tray_manager.show_message("FuelTracker", "เกินงบประมาณ")
+        if shiboken6.Shiboken.isValid(self):
+            self.dashboard_ready.emit(generation, snapshot)
 
-    def _refresh_maintenance_panel(self) -> None:
-        vid = self._selected_vehicle_id
-        if vid is None:
-            self.maint_dock.list_widget.clear()
-            return
-        tasks = self.storage.list_maintenances(vid)
+    def _apply_dashboard(self, generation: int, snapshot: DashboardSnapshot) -> None:
+        if generation == self._dashboard_generation:
+            self._show_dashboard(snapshot)
+
+    def _show_dashboard(self, snapshot: DashboardSnapshot | None) -> None:
+        """Bind the stats dock, tray tooltip and maintenance dock to ``snapshot``."""
+        if snapshot is None:
+            self.stats_dock.kml_label.setText("กม./ลิตร: -")
+            self.stats_dock.cost_label.setText("บาท/กม.: -")
+        else:
+            self.stats_dock.kml_label.setText(f"กม./ลิตร: {snapshot.km_per_liter:.2f}")
+            self.stats_dock.cost_label.setText(f"บาท/กม.: {snapshot.cost_per_km:.2f}")
+        if getattr(self, "tray_manager", None):
+            self.tray_manager.set_tooltip(snapshot.tooltip if snapshot else "")
         self.maint_dock.list_widget.clear()
-        last = self.storage.get_last_entry(vid)
-        current_odo = last.odo_after if last and last.odo_after is not None else None
-        for t in tasks:
+        if snapshot is None:
+            return
+        today = date.today()
+        for t in snapshot.maintenances:
             text = t.name
             if not t.is_done:
                 if t.due_odo is not None:
@@ -511,14 +689,25 @@ class MainController(QObject):
                     text += f" by {t.due_date}"
             item = QListWidgetItem(text)
             item.setData(Qt.ItemDataRole.UserRole, t.id)
-            if (
-                current_odo is not None
-                and t.due_odo is not None
-                and current_odo >= t.due_odo
-            ) or (t.due_date is not None and t.due_date <= date.today()):
+            if snapshot.is_due(t, today):
                 item.setForeground(Qt.red)
             self.maint_dock.list_widget.addItem(item)
 
+    def _check_budget(self, vehicle_id: int, entry_date: date) -> None:
+        status = self.storage.budget_status(
+            entry_date.year, entry_date.month, [vehicle_id]
+        )[0]
+        if status.budget is None:
+            return
+        if status.spent > status.budget:
+            QMessageBox.warning(
+                self.window,
+                "เกินงบประมาณ",
+                "ค่าใช้จ่ายค่าน้ำมันเดือนนี้เกินงบที่ตั้งไว้",
+            )
+            if getattr(self, "tray_manager", None):
+                self.tray_manager.show_message("FuelTracker", "เกินงบประมาณ")
+
     def _notify_due_maintenance(self, vehicle_id: int, odo: float, when: date) -> None:
         when_dt = datetime.combine(when, datetime.min.time())
         due = self.storage.list_due_maintenances(vehicle_id, odo=odo, date_=when_dt)
@@ -755,7 +944,7 @@ class MainController(QObject):
 
             text = dialog.amountEdit.text().strip()
             try:
-                amount = Decimal(text)
+                amount = to_units(float(text))
             except Exception:
                 dialog.litersEdit.setEnabled(True)
                 return
@@ -776,8 +965,8 @@ class MainController(QObject):
                 dialog.litersEdit.setEnabled(True)
                 return
 
-            liters = (amount / price).quantize(Decimal("0.01"))
-            dialog.litersEdit.setText(str(liters))
+            liters = liters_cl(amount, to_units(price))
+            dialog.litersEdit.setText(f"{liters / SCALE:.2f}")
             dialog.litersEdit.setEnabled(False)
 
         dialog.amountEdit.editingFinished.connect(_auto_fill_liters)
@@ -843,7 +1032,7 @@ class MainController(QObject):
         for v in self.storage.list_vehicles():
             dialog.vehicleComboBox.addItem(v.name, v.id)
 
-        entries: list[FuelEntry] = []
+        selected: list[Path] = []
 
         def _load_file() -> None:
             path, _ = QFileDialog.getOpenFileName(
@@ -851,8 +1040,12 @@ class MainController(QObject):
             )
             if path:
                 dialog.fileLineEdit.setText(path)
-                entries.clear()
-                entries.extend(self.importer.read_csv(Path(path)))
+                selected[:] = [Path(path)]
+                # Only the first chunk is parsed for the preview; the whole
+                # file is streamed again when the import is confirmed.
+                chunks = self.importer.iter_csv(Path(path), chunk_size=PREVIEW_ROWS)
+                preview = next(chunks, [])
+                chunks.close()
                 table = dialog.previewTable
                 headers = [
                     "date",
@@ -864,8 +1057,8 @@ class MainController(QObject):
                 ]
                 table.setColumnCount(len(headers))
                 table.setHorizontalHeaderLabels(headers)
-                table.setRowCount(len(entries))
-                for r, e in enumerate(entries):
+                table.setRowCount(len(preview))
+                for r, e in enumerate(preview):
                     dist = e.odo_after - e.odo_before if e.odo_after is not None else ""
                     values = [
                         e.entry_date.isoformat(),
@@ -880,13 +1073,57 @@ class MainController(QObject):
 
         dialog.browseButton.clicked.connect(_load_file)
 
-        if dialog.exec() == QDialog.DialogCode.Accepted and entries:
-            vehicle_id = dialog.vehicleComboBox.currentData()
-            for e in entries:
-                e.vehicle_id = vehicle_id
-                self.storage.add_entry(e)
-            self.entry_changed.emit()
-            self._update_tray_tooltip()
+        if dialog.exec() == QDialog.DialogCode.Accepted and selected:
+            self._start_import(selected[0], dialog.vehicleComboBox.currentData())
+
+    def _start_import(self, path: Path, vehicle_id: int) -> None:
+        """Import ``path`` on the thread pool behind a modal progress dialog."""
+        if not self._import_done.is_set():
+            return
+        progress = QProgressDialog(
+            self.tr("กำลังนำเข้า..."), self.tr("ยกเลิก"), 0, 100, self.window
+        )
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(self._import_cancel.set)
+        self._import_progress = progress
+        self._import_cancel.clear()
+        self._import_done.clear()
+        self.thread_pool.start(
+            _ImportJob(self, path, vehicle_id, self._import_cancel, self._import_done)
+        )
+
+    @Slot(int)
+    def _show_import_progress(self, percent: int) -> None:
+        if self._import_progress is not None:
+            self._import_progress.setValue(percent)
+
+    @Slot(object)
+    def _show_import_finished(
+        self, result: tuple[int, list[tuple[int, str]]] | str | None
+    ) -> None:
+        progress, self._import_progress = self._import_progress, None
+        if progress is not None:
+            progress.canceled.disconnect(self._import_cancel.set)
+            progress.close()
+        if result is None:
+            return
+        if isinstance(result, str):
+            QMessageBox.critical(
+                self.window,
+                self.tr("ข้อผิดพลาด"),
+                result or self.tr("ไม่สามารถนำเข้าไฟล์ได้"),
+            )
+            return
+        self.entry_changed.emit()
+        _count, errors = result
+        if errors:
+            lines = [f"บรรทัดที่ {line}: {msg}" for line, msg in errors[:10]]
+            QMessageBox.warning(
+                self.window,
+                "นำเข้าไม่ครบ",
+                f"ข้าม {len(errors)} แถวที่ข้อมูลไม่ถูกต้อง\n" + "\n".join(lines),
+            )
 
     def open_about_dialog(self) -> None:
         """Show the application's About dialog."""
@@ -925,7 +1162,7 @@ class MainController(QObject):
                 note=dialog.noteLineEdit.text().strip() or None,
             )
             self.storage.add_maintenance(task)
-            self._refresh_maintenance_panel()
+            self._refresh_dashboard()
 
     def open_edit_maintenance_dialog(self) -> None:
         """Edit the selected maintenance task."""
@@ -976,7 +1213,7 @@ class MainController(QObject):
             task.due_date = cast(date, dialog.dateEdit.date().toPython())
             task.note = dialog.noteLineEdit.text().strip() or None
             self.storage.update_maintenance(task)
-            self._refresh_maintenance_panel()
+            self._refresh_dashboard()
 
     def mark_selected_maintenance_done(self) -> None:
         """Mark the selected maintenance task as completed."""
@@ -986,7 +1223,7 @@ class MainController(QObject):
             return
         task_id = item.data(Qt.ItemDataRole.UserRole)
         self.storage.mark_maintenance_done(task_id, True)
-        self._refresh_maintenance_panel()
+        self._refresh_dashboard()
 
     def export_report(self) -> None:
         """Export the current month's report as CSV and PDF."""
@@ -1060,23 +1297,37 @@ class MainController(QObject):
                 super().__init__()
                 self.controller = controller
 
+            def replay_cache(self) -> None:
+                """Offline cold start: load cached payloads into an empty table."""
+                with Session(self.controller.storage.engine) as sess:
+                    if sess.exec(select(FuelPrice.id)).first() is None:
+                        replay_cached_prices(sess, self.controller.price_cache)
+
             def run(self) -> None:
                 try:
-                    with Session(self.controller.storage.engine) as sess:
-                        fetch_latest(sess, self.controller.config.default_station)
-                        if shiboken6.Shiboken.isValid(self.controller):
-                            # ``invokeMethod`` expects the member name as a
-                            # Python ``str`` in newer PySide versions. Using a
-                            # ``bytes`` object causes a ``ValueError`` which in
-                            # turn fails the test suite.  Cast to ``Any`` is
-                            # kept for mypy compatibility.
-                            cast(Any, QMetaObject).invokeMethod(
-                                self.controller,
-                                "_load_prices",
-                                Qt.ConnectionType.QueuedConnection,
-                            )
+                    # One commit for the new prices, back-filled liters and
+                    # the purge of old prices.
+                    with self.controller.storage.transaction() as sess:
+                        fetch_latest(
+                            sess,
+                            self.controller.config.default_station,
+                            fetcher=self.controller.price_fetcher,
+                            cache=self.controller.price_cache,
+                        )
+                    if shiboken6.Shiboken.isValid(self.controller):
+                        # ``invokeMethod`` expects the member name as a
+                        # Python ``str`` in newer PySide versions. Using a
+                        # ``bytes`` object causes a ``ValueError`` which in
+                        # turn fails the test suite.  Cast to ``Any`` is
+                        # kept for mypy compatibility.
+                        cast(Any, QMetaObject).invokeMethod(
+                            self.controller,
+                            "_load_prices",
+                            Qt.ConnectionType.QueuedConnection,
+                        )
                 except requests.RequestException as exc:  # pragma: no cover - network
                     logger.error("อัปเดตราคาน้ำมันไม่สำเร็จ: %s", exc)
+                    self.replay_cache()
                     if os.name == "nt":
                         try:
                             ToastNotifier().show_toast(
@@ -1117,20 +1368,97 @@ class MainController(QObject):
         cast(Any, self.oil_dock.canvas).draw_idle()
 
     def _schedule_daily_backup(self) -> None:
-        """Perform daily backup and reschedule the timer."""
-        backup: Path | None = None
+        """Start the daily backup in the background and reschedule the timer.
+
+        The copy runs on the thread pool; a backup still running from the
+        previous call is left to finish instead of starting another.
+        """
+        if self._backup_done.is_set():
+            self._backup_cancel.clear()
+            self._backup_done.clear()
+            self.thread_pool.start(
+                _BackupJob(self, self._backup_cancel, self._backup_done)
+            )
+        QTimer.singleShot(BACKUP_INTERVAL_MS, self._schedule_daily_backup)
+
+    def _backup(
+        self,
+        cancel: threading.Event,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> Path:
+        """Back up the database and sync the backups to the cloud folder."""
+        version = self.storage.data_version
+        backup = self.storage.auto_backup(progress=progress, cancel=cancel)
+        self._backup_version = version
+        if self.sync_enabled and self.cloud_path is not None:
+            self.storage.sync_to_cloud(backup.parent, self.cloud_path)
+        return backup
+
+    def _backup_on_quit(self) -> None:
+        """Back up changes made since the last backup, within a time limit.
+
+        The copy is cancelled after :data:`BACKUP_QUIT_SECONDS`; the next
+        start backs up again in that case.
+        """
+        if self.storage.data_version == self._backup_version:
+            return
+        # The deadline is checked after every step rather than by a timer
+        # thread: ``cleanup`` also runs from ``__del__``, where starting a
+        # thread can deadlock during interpreter shutdown.
+        deadline = time.monotonic() + BACKUP_QUIT_SECONDS
+        cancel = threading.Event()
+
+        def check_deadline(_copied: int, _total: int) -> None:
+            if time.monotonic() >= deadline:
+                cancel.set()
+
         try:
-            backup = self.storage.auto_backup()
+            self._backup(cancel, check_deadline)
+        except BackupCancelled:
+            logger.warning("สำรองข้อมูลก่อนปิดโปรแกรมไม่ทันเวลา")
         except Exception:  # pragma: no cover - ignore failures with in-memory DB
-            backup = None
+            logger.debug("สำรองข้อมูลไม่สำเร็จ", exc_info=True)
 
-        if backup and self.sync_enabled and self.cloud_path is not None:
-            self.storage.sync_to_cloud(backup.parent, self.cloud_path)
+    @Slot(int, int)
+    def _show_backup_progress(self, copied: int, total: int) -> None:
+        if isinstance(self.window, QMainWindow) and total:
+            self.window.statusBar().showMessage(
+                f"กำลังสำรองข้อมูล {copied * 100 // total}%"
+            )
 
-        QTimer.singleShot(86_400_000, self._schedule_daily_backup)
+    @Slot(object)
+    def _show_backup_finished(self, backup: Path | None) -> None:
+        if isinstance(self.window, QMainWindow):
+            if backup is None:
+                self.window.statusBar().clearMessage()
+            else:
+                self.window.statusBar().showMessage(
+                    f"สำรองข้อมูลแล้ว: {backup.name}", 5000
+                )
+
+    def _schedule_idle_maintenance(self) -> None:
+        """Reclaim free database pages off the GUI thread when idle.
+
+        The database counts as idle when nothing was written since the
+        previous check.
+        """
+        version = self.storage.data_version
+        if version == self._idle_version and self.storage.maintenance_due:
+            try:
+                self.executor.submit(self.storage.incremental_vacuum)
+            except RuntimeError:
+                # The executor is shut down once the application quits.
+                logger.debug("ไม่ได้คืนพื้นที่ฐานข้อมูล: executor ปิดแล้ว")
+                return
+        self._idle_version = version
+        QTimer.singleShot(IDLE_MAINTENANCE_MS, self._schedule_idle_maintenance)
+
+    def filter_entries(self) -> EntryFilter:
+        """Filter entries based on search text and start date.
 
-    def filter_entries(self) -> list[FuelEntry]:
-        """Filter entries based on search text and start date."""
+        The fuel table reloads its first page in the background; the filter
+        applied is returned.
+        """
         text = None
         start = None
         if hasattr(self.window, "searchLineEdit"):
@@ -1139,16 +1467,9 @@ class MainController(QObject):
                 text = t
         if hasattr(self.window, "startDateEdit"):
             start = cast(date, self.window.startDateEdit.date().toPython())
-        entries = self.storage.list_entries_filtered(text, start)
-        if hasattr(self.window, "vehicleListWidget"):
-            lw = self.window.vehicleListWidget
-            lw.clear()
-            for e in entries:
-                dist = e.odo_after - e.odo_before if e.odo_after is not None else 0
-                item = QListWidgetItem(f"{e.entry_date} - {dist} km")
-                item.setData(Qt.ItemDataRole.UserRole, e.id)
-                lw.addItem(item)
-        return entries
+        filters = EntryFilter(text=text, start=start)
+        self.entry_model.set_filter(filters)
+        return filters
 
     # ------------------------------------------------------------------
     # Data modification helpers
@@ -1165,6 +1486,11 @@ class MainController(QObject):
         self.undo_stack.push(cmd)
 
     def cleanup(self) -> None:
+        # Runs from ``aboutToQuit`` and again from ``__del__``; by then the
+        # database is closed and the executor shut down.
+        if getattr(self, "_cleaned_up", False):
+            return
+        self._cleaned_up = True
         if hasattr(self, "window") and hasattr(self.window, "removeEventFilter"):
             try:
                 self.window.removeEventFilter(self)
@@ -1177,14 +1503,21 @@ class MainController(QObject):
         except RuntimeError:
             # Window already destroyed
             pass
-        backup: Path | None = None
+        # A running import rolls back after its current chunk.
+        self._import_cancel.set()
+        if not self._import_done.wait(BACKUP_STOP_SECONDS):
+            logger.warning("การนำเข้า CSV ยังไม่หยุด ปิดฐานข้อมูลต่อ")
+        # A running backup is cancelled after its current step; changes
+        # since the last completed one are then copied within a time limit.
+        self._backup_cancel.set()
+        if self._backup_done.wait(BACKUP_STOP_SECONDS):
+            self._backup_on_quit()
+        else:
+            logger.warning("การสำรองข้อมูลยังไม่หยุด ปิดฐานข้อมูลต่อ")
         try:
-            backup = self.storage.auto_backup()
-        except Exception:  # pragma: no cover - ignore failures with in-memory DB
-            backup = None
-
-        if backup and self.sync_enabled and self.cloud_path is not None:
-            self.storage.sync_to_cloud(backup.parent, self.cloud_path)
+            self.storage.close()
+        except Exception:  # pragma: no cover - shutdown must not fail
+            logger.exception("Failed to close the database")
         self.export_service.cleanup()
         self._unregister_hotkey()
         self.executor.shutdown(wait=False)
@@ -4,9 +4,33 @@ from PySide6.QtGui import QUndoCommand
 
 from ..models import FuelEntry, Vehicle
 from ..services import StorageService
+from ..services.unit_of_work import transactional
 from PySide6.QtCore import Signal, SignalInstance
 from typing import cast
 
+# ``undo``/``redo`` run in one storage transaction so a command that writes
+# several rows commits once, and commands executed inside an outer
+# ``storage.transaction()`` join it as savepoints.
+
+
+def _emit_after_commit(storage: StorageService, signal: Signal | None) -> None:
+    """Emit ``signal`` once the running transaction has committed.
+
+    Slots may reload data on another connection, which must not see the
+    state before the commit.
+    """
+    if signal is None:
+        return
+
+    def emit() -> None:
+        try:
+            # FIX: mypy clean
+            cast(SignalInstance, signal).emit()
+        except RuntimeError:
+            pass
+
+    storage.after_commit(emit)
+
 
 class AddEntryCommand(QUndoCommand):
     def __init__(
@@ -20,16 +44,13 @@ class AddEntryCommand(QUndoCommand):
         self.entry = entry
         self.signal = signal
 
+    @transactional
     def undo(self) -> None:
         if self.entry.id is not None:
             self.storage.delete_entry(self.entry.id)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
+    @transactional
     def redo(self) -> None:
         # Recreate entry to ensure a fresh insert when redoing after an undo
         if self.entry.id is not None:
@@ -40,12 +61,7 @@ class AddEntryCommand(QUndoCommand):
             or self.entry.odo_after >= self.entry.odo_before
         ), "odo_after must be >= odo_before"
         self.storage.add_entry(self.entry)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
 
 class DeleteEntryCommand(QUndoCommand):
@@ -60,27 +76,19 @@ class DeleteEntryCommand(QUndoCommand):
         self.signal = signal
         self.entry = storage.get_entry(entry_id)
 
+    @transactional
     def undo(self) -> None:
         if self.entry is not None:
             data = self.entry.model_dump(exclude={"id"})
             self.entry = FuelEntry(**data)
             self.storage.add_entry(self.entry)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
+    @transactional
     def redo(self) -> None:
         if self.entry is not None and self.entry.id is not None:
             self.storage.delete_entry(self.entry.id)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
 
 class AddVehicleCommand(QUndoCommand):
@@ -95,27 +103,19 @@ class AddVehicleCommand(QUndoCommand):
         self.vehicle = vehicle
         self.signal = signal
 
+    @transactional
     def undo(self) -> None:
         if self.vehicle.id is not None:
             self.storage.delete_vehicle(self.vehicle.id)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
+    @transactional
     def redo(self) -> None:
         if self.vehicle.id is not None:
             data = self.vehicle.model_dump(exclude={"id"})
             self.vehicle = Vehicle(**data)
         self.storage.add_vehicle(self.vehicle)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
 
 class DeleteVehicleCommand(QUndoCommand):
@@ -130,27 +130,19 @@ class DeleteVehicleCommand(QUndoCommand):
         self.signal = signal
         self.vehicle = storage.get_vehicle(vehicle_id)
 
+    @transactional
     def undo(self) -> None:
         if self.vehicle is not None:
             data = self.vehicle.model_dump(exclude={"id"})
             self.vehicle = Vehicle(**data)
             self.storage.add_vehicle(self.vehicle)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
+    @transactional
     def redo(self) -> None:
         if self.vehicle is not None and self.vehicle.id is not None:
             self.storage.delete_vehicle(self.vehicle.id)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
 
 class UpdateVehicleCommand(QUndoCommand):
@@ -168,24 +160,16 @@ class UpdateVehicleCommand(QUndoCommand):
         self.after = Vehicle.model_validate(vehicle)
         self.signal = signal
 
+    @transactional
     def undo(self) -> None:
         for field in ("name", "vehicle_type", "license_plate", "tank_capacity_liters"):
             setattr(self.vehicle, field, getattr(self.before, field))
         self.storage.update_vehicle(self.vehicle)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
 
+    @transactional
     def redo(self) -> None:
         for field in ("name", "vehicle_type", "license_plate", "tank_capacity_liters"):
             setattr(self.vehicle, field, getattr(self.after, field))
         self.storage.update_vehicle(self.vehicle)
-        if self.signal is not None:
-            try:
-                # FIX: mypy clean
-                cast(SignalInstance, self.signal).emit()
-            except RuntimeError:
-                pass
+        _emit_after_commit(self.storage, self.signal)
@@ -17,7 +17,6 @@ from sqlalchemy import create_engine, inspect, text
 
 from src.settings import Settings
 
-
 ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
 
 if TYPE_CHECKING:  # pragma: no cover - for type checkers only
@@ -69,9 +68,28 @@ def run(argv: list[str] | None = None) -> None:
     if args.command == "backup":
         from src.services import StorageService
 
-        path = StorageService().auto_backup()
+        def progress(copied: int, total: int) -> None:
+            print(f"\rbackup {copied * 100 // total}%", end="", file=sys.stderr)
+
+        path = StorageService().auto_backup(progress=progress)
+        print(file=sys.stderr)
         print(path)
         return
+    if args.command == "rebuild-agg":
+        from src.services import StorageService
+
+        StorageService().rebuild_monthly_agg()
+        return
+    if args.command == "rebuild-search":
+        from src.services import StorageService
+
+        StorageService().rebuild_search_index()
+        return
+    if args.command == "rebuild-odometer":
+        from src.services import StorageService
+
+        print(StorageService().rebuild_odometer_chain())
+        return
     if args.command == "sync":
         from src.services import StorageService
 
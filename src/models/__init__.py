@@ -5,5 +5,6 @@ from .vehicle import Vehicle
 from .budget import Budget
 from .maintenance import Maintenance
 from .fuel_price import FuelPrice
+from .monthly_agg import MonthlyAgg
 
-__all__ = ["FuelEntry", "Vehicle", "Budget", "Maintenance", "FuelPrice"]
+__all__ = ["FuelEntry", "Vehicle", "Budget", "Maintenance", "FuelPrice", "MonthlyAgg"]
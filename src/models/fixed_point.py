@@ -0,0 +1,61 @@
+"""จำนวนเงินและปริมาตรแบบจุดทศนิยมคงที่ เก็บเป็นจำนวนเต็มในฐานข้อมูล
+
+Money is stored in satang and volumes in centiliters, i.e. hundredths of
+the unit the application works with. Columns declared with
+:class:`FixedPoint` are plain ``INTEGER`` columns, so SQLite adds them with
+exact integer arithmetic, while model attributes and ORM/Core queries keep
+seeing baht and liters: values are scaled when bound and when read back.
+Hand-written SQL reads the stored integers and has to scale them itself.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import Integer
+from sqlalchemy.types import TypeDecorator
+
+#: Stored units per baht or liter.
+SCALE = 100
+
+
+def to_units(value: float | Decimal) -> int:
+    """Return ``value`` in hundredths, rounded to the nearest one."""
+    return round(value * SCALE)
+
+
+def liters_cl(amount_satang: int, price_satang: int) -> int:
+    """Return centiliters bought for ``amount_satang`` at ``price_satang``.
+
+    The quotient is rounded half up using integers only; the ``UPDATE`` of
+    :func:`~src.services.oil_service.update_missing_liters` computes the
+    same expression in SQL.
+    """
+    return (amount_satang * 2 * SCALE + price_satang) // (2 * price_satang)
+
+
+class FixedPoint(TypeDecorator):
+    """``INTEGER`` column holding hundredths of the value the model exposes.
+
+    Results are ``float``, or ``Decimal`` with two places when ``asdecimal``
+    is set. Aggregates such as ``func.sum`` over the column keep its type,
+    so their results are scaled as well.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def __init__(self, asdecimal: bool = False) -> None:
+        super().__init__()
+        self.asdecimal = asdecimal
+
+    def process_bind_param(self, value: Any, dialect: Any) -> int | None:
+        return None if value is None else to_units(value)
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        if value is None:
+            return None
+        if self.asdecimal:
+            return Decimal(int(value)).scaleb(-2)
+        return value / SCALE
@@ -6,7 +6,9 @@ from datetime import date
 from typing import Optional
 
 from sqlmodel import Field, SQLModel
-from sqlalchemy import Index
+from sqlalchemy import Column, Index, text
+
+from .fixed_point import FixedPoint
 
 
 class FuelEntry(SQLModel, table=True):
@@ -20,13 +22,29 @@ class FuelEntry(SQLModel, table=True):
     #: Odometer reading after refueling. ``None`` when user didn't provide it.
     odo_after: Optional[float] = None
     #: Total money spent for the refuel. ``None`` for distance-only entries.
-    amount_spent: Optional[float] = None
+    #: Stored in satang in ``amount_satang``.
+    amount_spent: Optional[float] = Field(
+        default=None, sa_column=Column("amount_satang", FixedPoint, key="amount_spent")
+    )
     #: Liters filled. Must be provided together with ``amount_spent``.
-    liters: Optional[float] = None
+    #: Stored in centiliters in ``liters_cl``.
+    liters: Optional[float] = Field(
+        default=None, sa_column=Column("liters_cl", FixedPoint, key="liters")
+    )
 
     __table_args__ = (
         Index("ix_fuelentry_vehicle_id", "vehicle_id"),
         Index("ix_fuelentry_entry_date", "entry_date"),
+        # Latest entries of a vehicle and its entries in a date range.
+        Index("ix_fuelentry_vehicle_date_id", "vehicle_id", "entry_date", "id"),
+        # Rows ``update_missing_liters`` has to fill.
+        Index(
+            "ix_fuelentry_missing_liters",
+            "entry_date",
+            sqlite_where=text("liters_cl IS NULL AND amount_satang IS NOT NULL"),
+        ),
+        # Covers ``liters_by_fuel_type``.
+        Index("ix_fuelentry_fuel_type_liters", "fuel_type", "liters"),
     )
 
     def calc_metrics(self) -> dict[str, Optional[float]]:
@@ -7,7 +7,9 @@ from decimal import Decimal
 from typing import Optional
 
 from sqlmodel import Field, SQLModel
-from sqlalchemy import Index
+from sqlalchemy import Column, Index
+
+from .fixed_point import FixedPoint
 
 
 class FuelPrice(SQLModel, table=True):
@@ -18,7 +20,12 @@ class FuelPrice(SQLModel, table=True):
     station: str
     fuel_type: str
     name_th: str
-    price: Decimal
+    #: Baht per liter, stored in satang in ``price_satang``.
+    price: Decimal = Field(
+        sa_column=Column(
+            "price_satang", FixedPoint(asdecimal=True), key="price", nullable=False
+        )
+    )
 
     __table_args__ = (
         Index(
@@ -26,5 +33,14 @@ class FuelPrice(SQLModel, table=True):
             "date",
             "station",
             "fuel_type",
+            unique=True,
+        ),
+        # Covers the "latest price on or before a day" lookups.
+        Index(
+            "ix_fuelprice_station_fuel_type_date",
+            "station",
+            "fuel_type",
+            "date",
+            "price",
         ),
     )
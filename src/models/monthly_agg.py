@@ -0,0 +1,43 @@
+"""Materialized monthly totals of refuel entries."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Column
+from sqlmodel import Field, SQLModel
+
+from .fixed_point import FixedPoint
+
+
+def _fixed() -> Any:
+    return Field(default=0.0, sa_column=Column(FixedPoint, nullable=False))
+
+
+class MonthlyAgg(SQLModel, table=True):
+    """ยอดรวมรายเดือนต่อยานพาหนะและชนิดน้ำมัน
+
+    Rows are maintained by triggers on ``fuelentry`` (see
+    :mod:`src.services.monthly_agg`). ``fuel_type`` is ``""`` for entries
+    without a fuel type. The ``closed_*`` columns only count entries whose
+    ``odo_after`` is known; the ``full_*`` columns additionally require
+    ``liters``. Liters and amounts are :class:`~.fixed_point.FixedPoint`
+    sums, i.e. exact integers of centiliters and satang in the table.
+    """
+
+    __tablename__ = "monthly_agg"
+
+    vehicle_id: int = Field(primary_key=True)
+    #: Month as ``YYYY-MM``.
+    month: str = Field(primary_key=True)
+    fuel_type: str = Field(default="", primary_key=True)
+    fills: int = 0
+    distance: float = 0.0
+    liters: float = _fixed()
+    amount: float = _fixed()
+    closed_liters: float = _fixed()
+    closed_amount: float = _fixed()
+    full_fills: int = 0
+    full_distance: float = 0.0
+    full_liters: float = _fixed()
+    full_amount: float = _fixed()
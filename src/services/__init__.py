@@ -1,16 +1,19 @@
 """เลเยอร์บริการของ FuelTracker"""
 
 from .report_service import ReportService
+from .dashboard import DashboardService, DashboardSnapshot
 from .storage_service import StorageService
 from .exporter import Exporter
 from .export_service import ExportService
 from .importer import Importer
 from .oil_service import (
+    backfill_prices,
     fetch_latest,
     get_price,
     purge_old_prices,
     update_missing_liters,
 )
+
 try:
     from .theme_manager import ThemeManager
 except Exception:  # pragma: no cover - optional dependency
@@ -23,10 +26,13 @@ except Exception:  # pragma: no cover - optional dependency
 
 __all__ = [
     "ReportService",
+    "DashboardService",
+    "DashboardSnapshot",
     "StorageService",
     "Exporter",
     "ExportService",
     "Importer",
+    "backfill_prices",
     "fetch_latest",
     "get_price",
     "purge_old_prices",
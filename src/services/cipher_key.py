@@ -0,0 +1,89 @@
+"""คำนวณคีย์ SQLCipher เพียงครั้งเดียวต่อโปรเซส
+
+``PRAGMA key='<password>'`` makes SQLCipher run PBKDF2 on every new
+connection. :func:`key_pragma` instead derives the raw key itself, caches it
+per ``(password, salt)`` and returns the raw-key form
+``PRAGMA key = "x'<key><salt>'"``, which SQLCipher applies without a KDF.
+
+The derivation matches SQLCipher 4 defaults (PBKDF2-HMAC-SHA512, 256000
+iterations, 16-byte salt stored in the first bytes of the file), so
+databases stay readable with the plain password.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+#: SQLCipher 4 ``cipher_kdf_algorithm`` / ``kdf_iter`` defaults.
+KDF_ALGORITHM = "sha512"
+KDF_ITERATIONS = 256_000
+KEY_SIZE = 32
+SALT_SIZE = 16
+
+_PLAIN_HEADER = b"SQLite format 3\x00"
+
+_lock = threading.Lock()
+# (sha256(password), salt) -> hex of the derived key
+_keys: dict[tuple[bytes, bytes], str] = {}
+_kdf_runs = 0
+_kdf_seconds = 0.0
+
+
+def read_salt(path: Path) -> bytes | None:
+    """Return the salt stored in an encrypted database file.
+
+    ``None`` means the file is missing, empty or not encrypted.
+    """
+    try:
+        with open(path, "rb") as fh:
+            header = fh.read(SALT_SIZE)
+    except OSError:
+        return None
+    if len(header) < SALT_SIZE or header == _PLAIN_HEADER:
+        return None
+    return header
+
+
+def derive_key(password: str, salt: bytes) -> str:
+    """Return the hex raw key for ``password`` and ``salt``, cached."""
+    global _kdf_runs, _kdf_seconds
+    cache_key = (hashlib.sha256(password.encode()).digest(), salt)
+    with _lock:
+        cached = _keys.get(cache_key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        key = hashlib.pbkdf2_hmac(
+            KDF_ALGORITHM, password.encode(), salt, KDF_ITERATIONS, KEY_SIZE
+        ).hex()
+        _kdf_seconds += time.perf_counter() - start
+        _kdf_runs += 1
+        _keys[cache_key] = key
+        return key
+
+
+def key_pragma(password: str, salt: bytes | None = None) -> str:
+    """Return a raw-key ``PRAGMA key`` statement for ``password``.
+
+    Pass the :func:`read_salt` of an existing database. Without a salt a
+    random one is chosen; reuse the returned statement for every connection
+    to the new file so they all agree on it.
+    """
+    salt = salt or os.urandom(SALT_SIZE)
+    return f"PRAGMA key = \"x'{derive_key(password, salt)}{salt.hex()}'\";"
+
+
+def kdf_stats() -> dict[str, float]:
+    """Return how often and how long the key derivation ran in this process."""
+    with _lock:
+        return {"kdf_runs": _kdf_runs, "kdf_seconds": _kdf_seconds}
+
+
+def clear_cache() -> None:
+    """Forget every derived key, e.g. after the password changed."""
+    with _lock:
+        _keys.clear()
@@ -0,0 +1,224 @@
+"""อ่านรายการเติมน้ำมันแบบคอลัมน์สำหรับรายงานและงานวิเคราะห์
+
+:func:`to_frame` and :func:`to_arrow` run one ``SELECT`` over ``fuelentry``
+and fetch it :data:`BATCH_SIZE` rows at a time. Each batch is transposed
+into one NumPy array per column right away, so the cursor's row tuples only
+live for their batch; the arrays are then concatenated once into a typed
+DataFrame or wrapped as Arrow record batches.
+
+Vehicle names and types and the Thai fuel-type labels come from small
+lookup arrays (the ``vehicle`` table and
+:data:`~src.constants.FUEL_TYPE_TH`) applied to whole columns with
+``take``. Every row then points at the same few label strings, where a
+per-row ``JOIN`` would make the cursor decode a fresh copy of each label
+for every row.
+"""
+
+from __future__ import annotations
+
+import gc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import date
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Connection
+
+from ..constants import FUEL_TYPE_TH
+from .projection import select_sql
+
+#: Rows fetched from the cursor per batch.
+BATCH_SIZE = 65_536
+
+#: Columns of :func:`to_frame` and :func:`to_arrow`, in order.
+FRAME_COLUMNS = (
+    "date",
+    "id",
+    "vehicle_id",
+    "vehicle",
+    "vehicle_type",
+    "fuel_type",
+    "fuel_name",
+    "odo_before",
+    "odo_after",
+    "distance",
+    "liters",
+    "amount_spent",
+)
+
+# julianday('1970-01-01') is 2440587.5, so ``date`` arrives as days since
+# the Unix epoch and becomes ``datetime64[D]`` without parsing any text.
+_SELECT = (
+    "CAST(julianday(entry_date) - 2440587.5 AS INTEGER), id, vehicle_id, "
+    "fuel_type, odo_before, odo_after, liters_cl / 100.0, amount_satang / 100.0"
+)
+
+_DTYPES: tuple[tuple[str, Any], ...] = (
+    ("date", np.int64),
+    ("id", np.int64),
+    ("vehicle_id", np.int64),
+    ("fuel_type", object),
+    # ``None`` becomes NaN in float arrays.
+    ("odo_before", np.float64),
+    ("odo_after", np.float64),
+    ("liters", np.float64),
+    ("amount_spent", np.float64),
+)
+
+Batch = dict[str, np.ndarray]
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector while a batch is fetched.
+
+    Every fetched row is a new tuple the collector tracks, so a large batch
+    triggers repeated collections that rescan all of them although row
+    tuples cannot form cycles; that was about 40% of a full-history load.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _arrays(rows: list[tuple]) -> Batch:
+    columns = zip(*rows) if rows else [()] * len(_DTYPES)
+    batch = {
+        name: np.array(values, dtype=dtype)
+        for (name, dtype), values in zip(_DTYPES, columns)
+    }
+    batch["date"] = batch["date"].astype("datetime64[D]")
+    return batch
+
+
+def iter_batches(
+    conn: Connection,
+    start: date | None = None,
+    end: date | None = None,
+    vehicle_ids: Iterable[int] | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[Batch]:
+    """Yield the stored columns of entries, ``batch_size`` rows at a time.
+
+    Filters and ordering are those of
+    :meth:`~src.services.storage_service.StorageService.project_entries`.
+    """
+    query = select_sql(_SELECT, start, end, vehicle_ids)
+    if query is None:
+        return
+    cursor = conn.exec_driver_sql(*query).cursor
+    while True:
+        with _gc_paused():
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            batch = _arrays(rows)
+            del rows
+        yield batch
+
+
+def _labeller(conn: Connection) -> Any:
+    """Return a function adding the label and ``distance`` columns to a batch."""
+    vehicles = conn.exec_driver_sql(
+        "SELECT id, name, vehicle_type FROM vehicle ORDER BY id"
+    ).cursor.fetchall()
+    ids = np.array([v[0] for v in vehicles], dtype=np.int64)
+    # The extra last entry labels entries whose vehicle no longer exists.
+    names = np.array([v[1] for v in vehicles] + [""], dtype=object)
+    types = np.array([v[2] for v in vehicles] + [""], dtype=object)
+
+    def label(batch: Batch) -> Batch:
+        vid = batch["vehicle_id"]
+        pos = np.searchsorted(ids, vid)
+        if len(ids):
+            found = ids[np.minimum(pos, len(ids) - 1)] == vid
+            pos = np.where(found, pos, len(ids))
+        codes, uniques = pd.factorize(batch["fuel_type"])
+        # ``factorize`` codes a missing fuel type as -1, i.e. the last label.
+        fuel = [FUEL_TYPE_TH.get(ft, ft) for ft in uniques] + [""]
+        return {
+            **batch,
+            "vehicle": names.take(pos),
+            "vehicle_type": types.take(pos),
+            "fuel_name": np.array(fuel, dtype=object).take(codes),
+            "distance": batch["odo_after"] - batch["odo_before"],
+        }
+
+    return label
+
+
+def to_frame(
+    conn: Connection,
+    start: date | None = None,
+    end: date | None = None,
+    vehicle_ids: Iterable[int] | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> pd.DataFrame:
+    """Return entries as a DataFrame with :data:`FRAME_COLUMNS`.
+
+    ``date`` is ``datetime64``, ids are ``int64`` and measurements are
+    ``float64`` with NaN for missing values.
+    """
+    batches = list(iter_batches(conn, start, end, vehicle_ids, batch_size))
+    if len(batches) == 1:
+        columns = batches[0]
+    else:
+        empty = _arrays([])
+        columns = {
+            name: np.concatenate([empty[name], *(b[name] for b in batches)])
+            for name in empty
+        }
+    return pd.DataFrame(_labeller(conn)(columns), columns=list(FRAME_COLUMNS))
+
+
+def to_arrow(
+    conn: Connection,
+    start: date | None = None,
+    end: date | None = None,
+    vehicle_ids: Iterable[int] | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> Any:
+    """Return entries as a ``pyarrow.Table`` of ``batch_size`` record batches.
+
+    Needs the optional ``pyarrow`` package; missing values become nulls.
+    """
+    try:
+        import pyarrow as pa
+    except ModuleNotFoundError as exc:
+        raise ModuleNotFoundError(
+            "to_arrow ต้องใช้ pyarrow: pip install 'fueltracker[arrow]'"
+        ) from exc
+
+    text, real, integer = pa.string(), pa.float64(), pa.int64()
+    schema = pa.schema(
+        [
+            ("date", pa.date32()),
+            ("id", integer),
+            ("vehicle_id", integer),
+            ("vehicle", text),
+            ("vehicle_type", text),
+            ("fuel_type", text),
+            ("fuel_name", text),
+            *((name, real) for name in FRAME_COLUMNS[7:]),
+        ]
+    )
+    label = _labeller(conn)
+    batches = [
+        pa.record_batch(
+            [
+                pa.array(columns[field.name], type=field.type, from_pandas=True)
+                for field in schema
+            ],
+            schema=schema,
+        )
+        for columns in map(
+            label, iter_batches(conn, start, end, vehicle_ids, batch_size)
+        )
+    ]
+    return pa.Table.from_batches(batches, schema=schema)
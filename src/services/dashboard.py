@@ -0,0 +1,148 @@
+"""ภาพรวมของยานพาหนะที่เลือกสำหรับแผงสถิติ ทูลทิป และรายการบำรุงรักษา
+
+The stats dock, the tray tooltip and the maintenance dock all show the
+selected vehicle. Each used to run its own queries (``get_vehicle_stats``,
+``get_last_entry`` twice and ``list_maintenances``) on the GUI thread for
+every change. :class:`DashboardService` reads everything they need with one
+``SELECT`` into an immutable :class:`DashboardSnapshot`. Because it is a
+single statement, SQLite evaluates it against one consistent view of the
+database, so the widgets never mix totals from before a write with tasks
+from after it. Snapshots are cached per vehicle until
+:attr:`StorageService.data_version` changes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import NamedTuple
+
+from ..models.fixed_point import SCALE
+from .storage_service import StorageService
+
+# ``stats`` always yields one row and ``last`` at most one, so the result
+# has one row per maintenance task, or a single row without a task. Liters
+# and money arrive as integer hundredths.
+_SNAPSHOT_SQL = """
+WITH stats AS (
+    SELECT sum(distance), sum(closed_liters), sum(closed_amount)
+    FROM monthly_agg WHERE vehicle_id = ?
+), last AS (
+    SELECT entry_date, odo_before, odo_after, amount_satang
+    FROM fuelentry WHERE vehicle_id = ?
+    ORDER BY entry_date DESC, id DESC LIMIT 1
+)
+SELECT stats.*, last.*, m.id, m.name, m.due_odo, m.due_date, m.is_done
+FROM stats
+LEFT JOIN last ON 1
+LEFT JOIN maintenance AS m ON m.vehicle_id = ?
+ORDER BY m.id
+"""
+
+
+class MaintenanceItem(NamedTuple):
+    id: int
+    name: str
+    due_odo: int | None
+    due_date: date | None
+    is_done: bool
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """ข้อมูลที่วิดเจ็ตแดชบอร์ดแสดงสำหรับยานพาหนะหนึ่งคัน ณ เวอร์ชันข้อมูลหนึ่ง"""
+
+    vehicle_id: int
+    version: int
+    distance: float
+    liters: float
+    price: float
+    last_date: date | None
+    last_distance: float | None
+    last_amount: float | None
+    #: ``odo_after`` of the latest entry, if that entry is closed.
+    current_odo: float | None
+    maintenances: tuple[MaintenanceItem, ...]
+
+    @property
+    def km_per_liter(self) -> float:
+        return self.distance / self.liters if self.liters else 0.0
+
+    @property
+    def cost_per_km(self) -> float:
+        return self.price / self.distance if self.distance else 0.0
+
+    @property
+    def tooltip(self) -> str:
+        """Short summary of the latest entry, empty without entries."""
+        if self.last_date is None:
+            return ""
+        parts = [str(self.last_date)]
+        if self.last_distance is not None:
+            parts.append(f"{self.last_distance:g} km")
+        if self.last_amount is not None:
+            parts.append(f"฿{self.last_amount:g}")
+        return " - ".join(parts)
+
+    def is_due(self, task: MaintenanceItem, today: date) -> bool:
+        """Whether ``task`` is due by odometer or by date on ``today``."""
+        return (
+            self.current_odo is not None
+            and task.due_odo is not None
+            and self.current_odo >= task.due_odo
+        ) or (task.due_date is not None and task.due_date <= today)
+
+
+class DashboardService:
+    """อ่านและแคช :class:`DashboardSnapshot` ของแต่ละยานพาหนะ
+
+    :meth:`snapshot` may be called from a worker thread.
+    """
+
+    def __init__(self, storage: StorageService) -> None:
+        self.storage = storage
+        self._cache: dict[int, DashboardSnapshot] = {}
+
+    def snapshot(self, vehicle_id: int) -> DashboardSnapshot:
+        """Return the current snapshot of ``vehicle_id``."""
+        # Read the version first: a write racing the query then only makes
+        # the next call query again.
+        version = self.storage.data_version
+        cached = self._cache.get(vehicle_id)
+        if cached is not None and cached.version == version:
+            return cached
+        with self.storage.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                _SNAPSHOT_SQL, (vehicle_id, vehicle_id, vehicle_id)
+            ).cursor.fetchall()
+        snap = _snapshot(vehicle_id, version, rows)
+        if any(s.version != version for s in self._cache.values()):
+            self._cache = {}
+        self._cache[vehicle_id] = snap
+        return snap
+
+
+def _snapshot(vehicle_id: int, version: int, rows: list[tuple]) -> DashboardSnapshot:
+    dist, liters, price, last_date, odo_before, odo_after, amount = rows[0][:7]
+    return DashboardSnapshot(
+        vehicle_id=vehicle_id,
+        version=version,
+        distance=float(dist or 0.0),
+        liters=(liters or 0) / SCALE,
+        price=(price or 0) / SCALE,
+        last_date=None if last_date is None else date.fromisoformat(last_date),
+        last_distance=None if odo_after is None else odo_after - odo_before,
+        last_amount=None if amount is None else amount / SCALE,
+        current_odo=odo_after,
+        maintenances=tuple(
+            MaintenanceItem(
+                task_id,
+                name,
+                due_odo,
+                None if due is None else date.fromisoformat(due),
+                bool(done),
+            )
+            for *_, task_id, name, due_odo, due, done in rows
+            if task_id is not None
+        ),
+    )
@@ -0,0 +1,180 @@
+"""Per-table change counters shared by everything using one engine."""
+
+from __future__ import annotations
+
+import re
+import threading
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+try:
+    from pysqlcipher3 import dbapi2 as sqlcipher
+except ModuleNotFoundError:  # pragma: no cover - fallback when dependency missing
+    import sqlite3 as sqlcipher
+
+
+# Matches the target table of INSERT/UPDATE/DELETE statements, both those
+# compiled by SQLAlchemy and hand-written SQL passed to ``exec_driver_sql``.
+# A leading ``WITH`` clause is skipped up to the statement it feeds.
+_WRITE_RE = re.compile(
+    r"^\s*(?:WITH\b.*?\)\s*)?"
+    r"(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO"
+    r"|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"`\[]?(\w+)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class _DataVersion:
+    """Monotonic per-table change counters for one database engine.
+
+    Counters are bumped once a transaction that wrote to a table has
+    committed, regardless of which code path issued the statements. Commits made by
+    other processes are picked up through ``PRAGMA data_version`` on a
+    dedicated watcher connection.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self._lock = threading.Lock()
+        self._tables: dict[str, int] = {
+            t.name: 0 for t in SQLModel.metadata.sorted_tables
+        }
+        self._watch: Callable[[], sqlcipher.Connection] | None = None
+        self._watch_conn: sqlcipher.Connection | None = None
+        self._watch_value: int | None = None
+        #: Local commits not yet seen by the watcher.
+        self._pending_own = 0
+        event.listen(engine, "after_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+        event.listen(engine, "rollback", self._on_rollback)
+        event.listen(engine, "begin", self._on_begin)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    # -- engine events -------------------------------------------------
+    def _on_execute(
+        self,
+        conn: Connection,
+        _cursor: Any,
+        statement: str,
+        *_: Any,
+    ) -> None:
+        match = _WRITE_RE.match(statement)
+        if match:
+            conn.info.setdefault("ft_dirty_tables", set()).add(match.group(1))
+
+    def _on_commit(self, conn: Connection) -> None:
+        # This event fires before the commit reaches SQLite. Bumping here
+        # would let a reader cache the old rows under the new version, so
+        # the tables are only marked and bumped by ``_settle`` once the
+        # connection begins its next transaction or is checked in.
+        dirty = conn.info.pop("ft_dirty_tables", None)
+        if dirty:
+            conn.info.setdefault("ft_committed_tables", set()).update(dirty)
+            # The connection holds the write lock, so a change the watcher
+            # sees now came from another process. With this poll and the
+            # one in ``_settle`` each local commit moves ``data_version``
+            # on its own, which is what ``_pending_own`` counts.
+            self._poll_external(own_commit=True)
+
+    def _on_rollback(self, conn: Connection) -> None:
+        # A rollback after a failed commit discards what it marked.
+        conn.info.pop("ft_dirty_tables", None)
+        if conn.info.pop("ft_committed_tables", None):
+            with self._lock:
+                self._pending_own = max(self._pending_own - 1, 0)
+
+    def _on_begin(self, conn: Connection) -> None:
+        self._settle(conn.info)
+
+    def _on_checkin(self, _dbapi_conn: Any, record: Any) -> None:
+        if record is not None:
+            self._settle(record.info)
+
+    def _settle(self, info: dict[Any, Any]) -> None:
+        committed = info.pop("ft_committed_tables", None)
+        if committed:
+            self.bump(*committed)
+            # Let the watcher see this commit before anyone else's lands.
+            self._poll_external()
+
+    # -- external writers ----------------------------------------------
+    def watch(self, opener: Callable[[], sqlcipher.Connection]) -> None:
+        """Track commits from other connections using ``opener``."""
+        self._watch = opener
+
+    def close(self) -> None:
+        """Close the watcher connection and stop polling."""
+        with self._lock:
+            self._watch = None
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+
+    def _poll_external(self, own_commit: bool = False) -> None:
+        """Bump every table when another process committed since the last poll.
+
+        ``data_version`` moves once per poll that finds the file changed,
+        however many commits landed in between. Local commits still
+        expected are skipped; any movement past them is external.
+        """
+        with self._lock:
+            if self._watch is not None:
+                try:
+                    if self._watch_conn is None:
+                        self._watch_conn = self._watch()
+                        # Never wait on the local writer that is committing.
+                        self._watch_conn.execute("PRAGMA busy_timeout = 0")
+                    row = self._watch_conn.execute("PRAGMA data_version").fetchone()
+                except sqlcipher.Error:
+                    row = None
+                if row is not None:
+                    value = int(row[0])
+                    if self._watch_value is not None:
+                        expected = self._watch_value + min(self._pending_own, 1)
+                        if value > expected:
+                            for name in self._tables:
+                                self._tables[name] += 1
+                        if value != self._watch_value:
+                            self._pending_own = 0
+                    self._watch_value = value
+            if own_commit:
+                self._pending_own += 1
+
+    # -- public API ----------------------------------------------------
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for name in tables:
+                self._tables[name] = self._tables.get(name, 0) + 1
+
+    def table(self, name: str) -> int:
+        self._poll_external()
+        with self._lock:
+            return self._tables.get(name, 0)
+
+    def total(self) -> int:
+        self._poll_external()
+        with self._lock:
+            return sum(self._tables.values())
+
+    def snapshot(self) -> dict[str, int]:
+        self._poll_external()
+        with self._lock:
+            return dict(self._tables)
+
+
+_DATA_VERSIONS: weakref.WeakKeyDictionary[Engine, _DataVersion] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _data_version_for(engine: Engine) -> _DataVersion:
+    """Return the shared :class:`_DataVersion` tracker for ``engine``."""
+    tracker = _DATA_VERSIONS.get(engine)
+    if tracker is None:
+        tracker = _DataVersion(engine)
+        _DATA_VERSIONS[engine] = tracker
+    return tracker
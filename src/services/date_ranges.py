@@ -0,0 +1,59 @@
+"""ช่วงวันที่แบบครึ่งเปิด ``[start, end)`` สำหรับรายงาน
+
+Every helper returns ``(start, end)`` where ``start`` is the first day in the
+period and ``end`` the first day after it, ready for
+:meth:`~src.services.storage_service.StorageService.entries_between`.
+Consecutive periods share their boundary, so no day is counted twice and no
+month needs to know its last day.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+#: Month the Thai government fiscal year starts in (1 October).
+FISCAL_YEAR_START_MONTH = 10
+
+DateRange = tuple[date, date]
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(year: int, month: int) -> DateRange:
+    """Return the calendar month ``year-month``."""
+    start = date(year, month, 1)
+    return start, _add_months(start, 1)
+
+
+def quarter_range(year: int, quarter: int) -> DateRange:
+    """Return calendar quarter ``quarter`` (1-4) of ``year``."""
+    if not 1 <= quarter <= 4:
+        raise ValueError(f"quarter must be 1-4, got {quarter}")
+    start = date(year, 3 * quarter - 2, 1)
+    return start, _add_months(start, 3)
+
+
+def year_range(year: int) -> DateRange:
+    """Return the calendar year ``year``."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def fiscal_year_range(
+    year: int, start_month: int = FISCAL_YEAR_START_MONTH
+) -> DateRange:
+    """Return fiscal year ``year``, which ends in calendar year ``year``.
+
+    With the default October start, fiscal 2024 is 1 Oct 2023 - 30 Sep 2024.
+    ``start_month=1`` makes it the calendar year.
+    """
+    start = date(year - 1 if start_month > 1 else year, start_month, 1)
+    return start, _add_months(start, 12)
+
+
+def rolling_days(days: int, today: date | None = None) -> DateRange:
+    """Return the last ``days`` days up to and including ``today``."""
+    end = (today or date.today()) + timedelta(days=1)
+    return end - timedelta(days=days), end
@@ -26,11 +26,23 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.utils import ImageReader
 
-from ..models import FuelEntry
+from .date_ranges import month_range
 from .storage_service import StorageService
 
 logger = logging.getLogger(__name__)
 
+#: Columns of :meth:`StorageService.to_frame` that exports write.
+EXPORT_COLUMNS = [
+    "date",
+    "vehicle_id",
+    "fuel_type",
+    "odo_before",
+    "odo_after",
+    "distance",
+    "liters",
+    "amount_spent",
+]
+
 
 class ExportService:
     """Service for exporting monthly reports."""
@@ -51,8 +63,7 @@ class ExportService:
     def export_monthly_pdf(self, month: str, vehicle_id: int | None) -> Path:
         """Create a detailed monthly PDF report and return its path."""
         year, mon = (int(x) for x in month.split("-"))
-        entries = self.storage.list_entries_for_month(year, mon, vehicle_id)
-        df = self._entries_to_df(entries)
+        df = self._month_df(year, mon, vehicle_id)
         tmp = TemporaryDirectory()
         self._tmpdirs.append(tmp)
         out_path = Path(tmp.name) / f"report_{month}.pdf"
@@ -81,8 +92,7 @@ class ExportService:
     def export_monthly_xlsx(self, month: str) -> Path:
         """Create a detailed monthly Excel report and return its path."""
         year, mon = (int(x) for x in month.split("-"))
-        entries = self.storage.list_entries_for_month(year, mon)
-        df = self._entries_to_df(entries)
+        df = self._month_df(year, mon)
         tmp = TemporaryDirectory()
         self._tmpdirs.append(tmp)
         out_path = Path(tmp.name) / f"report_{month}.xlsx"
@@ -92,27 +102,15 @@ class ExportService:
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _entries_to_df(self, entries: list[FuelEntry]) -> pd.DataFrame:
-        data = []
-        for e in entries:
-            dist = None
-            if e.odo_after is not None:
-                dist = e.odo_after - e.odo_before
-            data.append(
-                {
-                    "date": e.entry_date,
-                    "vehicle_id": e.vehicle_id,
-                    "fuel_type": e.fuel_type,
-                    "odo_before": e.odo_before,
-                    "odo_after": e.odo_after,
-                    "distance": dist,
-                    "liters": e.liters,
-                    "amount_spent": e.amount_spent,
-                }
-            )
-        df = pd.DataFrame(data)
-        if not df.empty:
-            df.sort_values("date", inplace=True)
+    def _month_df(
+        self, year: int, month: int, vehicle_id: int | None = None
+    ) -> pd.DataFrame:
+        frame = self.storage.to_frame(
+            *month_range(year, month),
+            None if vehicle_id is None else [vehicle_id],
+        )
+        df = frame[EXPORT_COLUMNS].copy()
+        df["date"] = df["date"].dt.date
         return df
 
     def _get_font(self) -> str:
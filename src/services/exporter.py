@@ -5,21 +5,30 @@ from typing import List
 import csv
 import shutil
 
-from ..models import FuelEntry
+from .date_ranges import month_range
 from .storage_service import StorageService
 from .export_service import ExportService
 
+CSV_COLUMNS = (
+    "entry_date",
+    "fuel_type",
+    "odo_before",
+    "odo_after",
+    "liters",
+    "amount_spent",
+)
+
 
 class Exporter:
     def __init__(self, storage: StorageService) -> None:
         self.storage = storage
         self.export_service = ExportService(storage)
 
-    def _entries(self, month: int, year: int) -> List[FuelEntry]:
-        return self.storage.list_entries_for_month(year, month)
+    def _entries(self, month: int, year: int) -> List[tuple]:
+        return self.storage.project_entries(CSV_COLUMNS, *month_range(year, month))
 
     def monthly_csv(self, month: int, year: int, path: Path) -> None:
-        entries = self._entries(month, year)
+        rows = self._entries(month, year)
         with open(path, "w", newline="", encoding="utf-8") as fh:
             writer = csv.writer(fh)
             writer.writerow(
@@ -33,17 +42,17 @@ class Exporter:
                     "amount_spent",
                 ]
             )
-            for e in entries:
-                dist = e.odo_after - e.odo_before if e.odo_after is not None else ""
+            for day, fuel, odo_before, odo_after, liters, amount in rows:
+                dist = odo_after - odo_before if odo_after is not None else ""
                 writer.writerow(
                     [
-                        e.entry_date.isoformat(),
-                        e.fuel_type or "",
-                        e.odo_before,
-                        e.odo_after,
+                        day.isoformat(),
+                        fuel or "",
+                        odo_before,
+                        odo_after,
                         dist,
-                        e.liters,
-                        e.amount_spent,
+                        liters,
+                        amount,
                     ]
                 )
 
@@ -0,0 +1,85 @@
+"""แปลงคอลัมน์เงินและปริมาตรของฐานข้อมูลเดิมเป็นจำนวนเต็ม
+
+``fuelentry.amount_spent``/``liters`` and ``fuelprice.price`` used to be
+stored as ``REAL``/``NUMERIC`` baht and liters. They now live in the
+``INTEGER`` columns ``amount_satang``, ``liters_cl`` and ``price_satang``
+(see :mod:`src.models.fixed_point`). ``fueltracker migrate`` stamps
+databases whose tables already exist instead of upgrading them, so
+:func:`install` converts such files when they are opened. The conversion
+drops the old columns; :class:`~src.services.storage_service.StorageService`
+backs a file up before it runs, and that backup is the way back to the old
+layout.
+
+``monthly_agg`` only holds totals derived from ``fuelentry``; its triggers
+reference the old columns, so it is dropped here and recreated with integer
+columns by :func:`~src.services.monthly_agg.install`. Indexes on the old
+columns are dropped as well and recreated from the models.
+"""
+
+from __future__ import annotations
+
+from typing import Any, cast
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from ..models import FuelEntry, FuelPrice
+from ..models.fixed_point import SCALE
+from . import monthly_agg
+
+#: ``(model, old column)`` of each converted column.
+_CONVERTED = (
+    (FuelEntry, "amount_spent"),
+    (FuelEntry, "liters"),
+    (FuelPrice, "price"),
+)
+
+#: Indexes covering the old columns.
+_INDEXES = (
+    "ix_fuelentry_missing_liters",
+    "ix_fuelentry_fuel_type_liters",
+    "ix_fuelprice_station_fuel_type_date",
+)
+
+
+def pending(conn: Connection) -> list[tuple[Any, str]]:
+    """Return ``(table, old column)`` of the columns still to convert."""
+    insp = inspect(conn)
+    found = []
+    for model, old in _CONVERTED:
+        table = cast(Any, model).__table__
+        if insp.has_table(table.name) and old in {
+            c["name"] for c in insp.get_columns(table.name)
+        }:
+            found.append((table, old))
+    return found
+
+
+def install(conn: Connection) -> bool:
+    """Convert old ``REAL`` money and volume columns to fixed-point integers.
+
+    Returns ``True`` when anything was converted. Must run before the model
+    indexes and ``monthly_agg`` are installed. SQLite runs the ``ALTER
+    TABLE`` statements inside ``conn``'s transaction, so a failure leaves
+    the old columns in place.
+    """
+    todo = pending(conn)
+    if not todo:
+        return False
+    for name in monthly_agg.TRIGGERS:
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    conn.exec_driver_sql("DROP TABLE IF EXISTS monthly_agg")
+    for index in _INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+    for table, old in todo:
+        column = table.c[old]
+        ddl = f"{column.name} INTEGER"
+        if not column.nullable:
+            ddl += " NOT NULL DEFAULT 0"
+        conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+        conn.exec_driver_sql(
+            f"UPDATE {table.name} "
+            f"SET {column.name} = CAST(ROUND({old} * {SCALE}) AS INTEGER)"
+        )
+        conn.exec_driver_sql(f"ALTER TABLE {table.name} DROP COLUMN {old}")
+    return True
@@ -0,0 +1,166 @@
+"""ดูแลตารางสรุปรายเดือน ``monthly_agg``
+
+``fuelentry`` triggers add the contribution of each inserted row and
+subtract that of each deleted row; an update does both. Every write path,
+including raw SQL such as
+:func:`~src.services.oil_service.update_missing_liters` and the ``odo_after``
+back-fill of :meth:`StorageService.add_entry`, therefore keeps the totals
+current without touching Python code. :func:`rebuild` recomputes the table
+from scratch.
+"""
+
+from __future__ import annotations
+
+from typing import Any, cast
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from ..models import MonthlyAgg
+
+#: Per-row contribution of a ``fuelentry`` row ``{r}`` to each column.
+_COLUMNS = {
+    "fills": "1",
+    "distance": "COALESCE({r}.odo_after - {r}.odo_before, 0)",
+    "liters": "COALESCE({r}.liters_cl, 0)",
+    "amount": "COALESCE({r}.amount_satang, 0)",
+    "closed_liters": (
+        "CASE WHEN {r}.odo_after IS NOT NULL THEN COALESCE({r}.liters_cl, 0) ELSE 0 END"
+    ),
+    "closed_amount": (
+        "CASE WHEN {r}.odo_after IS NOT NULL "
+        "THEN COALESCE({r}.amount_satang, 0) ELSE 0 END"
+    ),
+    "full_fills": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters_cl IS NOT NULL "
+        "THEN 1 ELSE 0 END"
+    ),
+    "full_distance": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters_cl IS NOT NULL "
+        "THEN {r}.odo_after - {r}.odo_before ELSE 0 END"
+    ),
+    "full_liters": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters_cl IS NOT NULL "
+        "THEN {r}.liters_cl ELSE 0 END"
+    ),
+    "full_amount": (
+        "CASE WHEN {r}.odo_after IS NOT NULL AND {r}.liters_cl IS NOT NULL "
+        "THEN COALESCE({r}.amount_satang, 0) ELSE 0 END"
+    ),
+}
+
+_DECIMALS = 6
+#: Columns summing integers: counts, satang and centiliters.
+_EXACT = frozenset(
+    {
+        "fills",
+        "full_fills",
+        "liters",
+        "amount",
+        "closed_liters",
+        "closed_amount",
+        "full_liters",
+        "full_amount",
+    }
+)
+
+_KEY = (
+    "{r}.vehicle_id",
+    "strftime('%Y-%m', {r}.entry_date)",
+    "COALESCE({r}.fuel_type, '')",
+)
+
+
+def _round(expr: str, column: str) -> str:
+    # Running sums of floats drift after many add/subtract cycles; odometer
+    # readings have at most two decimals, so six keep the distances exact.
+    # Integer columns need no rounding.
+    return expr if column in _EXACT else f"ROUND({expr}, {_DECIMALS})"
+
+
+def _add(row: str) -> str:
+    """Return an upsert adding the contribution of ``row`` to its group."""
+    names = ", ".join(["vehicle_id", "month", "fuel_type", *_COLUMNS])
+    values = ", ".join(
+        [k.format(r=row) for k in _KEY]
+        + [expr.format(r=row) for expr in _COLUMNS.values()]
+    )
+    updates = ", ".join(f"{c} = {_round(f'{c} + excluded.{c}', c)}" for c in _COLUMNS)
+    return (
+        f"INSERT INTO monthly_agg ({names}) VALUES ({values}) "
+        f"ON CONFLICT(vehicle_id, month, fuel_type) DO UPDATE SET {updates};"
+    )
+
+
+def _subtract(row: str) -> str:
+    """Return statements removing ``row`` from its group.
+
+    Groups that end up without entries are dropped. A missing group is left
+    alone, so deleting entries after ``monthly_agg`` was cleared is safe.
+    """
+    updates = ", ".join(
+        f"{c} = {_round(f'{c} - ({expr.format(r=row)})', c)}"
+        for c, expr in _COLUMNS.items()
+    )
+    where = " AND ".join(
+        f"{c} = {k.format(r=row)}"
+        for c, k in zip(("vehicle_id", "month", "fuel_type"), _KEY)
+    )
+    return (
+        f"UPDATE monthly_agg SET {updates} WHERE {where};"
+        f"DELETE FROM monthly_agg WHERE fills <= 0 AND {where};"
+    )
+
+
+TRIGGERS = {
+    "trg_monthly_agg_insert": ("AFTER INSERT", _add("NEW")),
+    "trg_monthly_agg_delete": ("AFTER DELETE", _subtract("OLD")),
+    "trg_monthly_agg_update": ("AFTER UPDATE", _subtract("OLD") + _add("NEW")),
+}
+
+
+def _rebuild_sql() -> str:
+    names = ", ".join(["vehicle_id", "month", "fuel_type", *_COLUMNS])
+    keys = [k.format(r="fuelentry") for k in _KEY]
+    sums = [
+        _round(f"SUM({expr.format(r='fuelentry')})", c) for c, expr in _COLUMNS.items()
+    ]
+    return (
+        f"INSERT INTO monthly_agg ({names}) "
+        f"SELECT {', '.join(keys + sums)} FROM fuelentry "
+        f"GROUP BY {', '.join(keys)}"
+    )
+
+
+def install(conn: Connection) -> bool:
+    """Create ``monthly_agg`` and its triggers when missing.
+
+    The table is refilled from ``fuelentry`` whenever a trigger had to be
+    created, since writes made before that were not counted. Returns
+    ``True`` in that case.
+    """
+    insp = inspect(conn)
+    if not insp.has_table("fuelentry"):
+        return False
+    if not insp.has_table("monthly_agg"):
+        cast(Any, MonthlyAgg).__table__.create(conn)
+    existing = set(
+        conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        ).scalars()
+    )
+    missing = [name for name in TRIGGERS if name not in existing]
+    for name in missing:
+        timing, body = TRIGGERS[name]
+        conn.execute(
+            text(f"CREATE TRIGGER {name} {timing} ON fuelentry BEGIN {body} END")
+        )
+    if missing:
+        rebuild(conn)
+    return bool(missing)
+
+
+def rebuild(conn: Connection) -> None:
+    """Recompute every ``monthly_agg`` row from ``fuelentry``."""
+    conn.execute(text("DELETE FROM monthly_agg"))
+    conn.execute(text(_rebuild_sql()))
@@ -0,0 +1,73 @@
+"""เชื่อมเลขไมล์ ``odo_after`` ของรายการเติมน้ำมันต่อกันตามลำดับวันที่
+
+An entry's ``odo_after`` is the odometer reading at the vehicle's next
+refuel, i.e. the ``odo_before`` of the entry that follows it in
+``(entry_date, id)`` order. :func:`rebuild` restores that with one
+set-based ``UPDATE`` whose new values come from ``LEAD(odo_before)`` over
+each vehicle's entries.
+
+Given ``since``, only the suffix of each vehicle's history from the last
+entry before ``since`` onwards is read and written; write paths pass the
+date they touched, so their cost follows the entries after it rather than
+the whole history. The latest entry of a vehicle has no successor and
+keeps its stored ``odo_after``, which may be a reading entered by hand or
+imported from CSV, unless it is below its own ``odo_before``: such a value
+was left by an entry that no longer follows it, and is cleared.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from sqlalchemy.engine import Connection
+
+_UPDATE = """
+WITH chain AS (
+    SELECT id, LEAD(
+        odo_before, 1, CASE WHEN odo_after >= odo_before THEN odo_after END
+    ) OVER (PARTITION BY vehicle_id ORDER BY entry_date, id) AS next_odo
+    FROM fuelentry AS f{where}
+)
+UPDATE fuelentry SET odo_after = chain.next_odo
+FROM chain
+WHERE fuelentry.id = chain.id AND fuelentry.odo_after IS NOT chain.next_odo
+RETURNING fuelentry.id, fuelentry.odo_after
+"""
+
+# The suffix starts at the date of the last entry before ``since``: that
+# entry's ``odo_after`` depends on the first entry from ``since`` on.
+_SUFFIX = (
+    "f.entry_date >= COALESCE((SELECT max(p.entry_date) FROM fuelentry AS p "
+    "WHERE p.vehicle_id = {vehicle} AND p.entry_date < ?), ?)"
+)
+
+
+def rebuild(
+    conn: Connection,
+    vehicle_id: int | None = None,
+    since: date | None = None,
+) -> list[tuple[int, float | None]]:
+    """Set ``odo_after`` from the next entry's ``odo_before``.
+
+    ``vehicle_id`` limits the rebuild to one vehicle and ``since`` to the
+    entries from the last one before that date on. Returns
+    ``(id, odo_after)`` of the rows that changed.
+    """
+    conditions: list[str] = []
+    params: list[Any] = []
+    if vehicle_id is not None:
+        conditions.append("f.vehicle_id = ?")
+        params.append(vehicle_id)
+    if since is not None:
+        # With one vehicle the subquery does not depend on the row, so
+        # SQLite evaluates it once and seeks the index to the suffix.
+        conditions.append(
+            _SUFFIX.format(vehicle="f.vehicle_id" if vehicle_id is None else "?")
+        )
+        if vehicle_id is not None:
+            params.append(vehicle_id)
+        params.extend([since.isoformat(), since.isoformat()])
+    where = f"\n    WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = _UPDATE.format(where=where)
+    return conn.exec_driver_sql(sql, tuple(params)).cursor.fetchall()
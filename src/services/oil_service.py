@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+import asyncio
+from collections.abc import Iterable, Mapping
+from contextlib import ExitStack
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import Any, Dict, Optional, cast
+from typing import TYPE_CHECKING, Any, cast
 import os
+import threading
+import weakref
 
 import requests
 from sqlmodel import Session, select
-from sqlalchemy import delete
+from sqlalchemy import Integer, delete, event, func, type_coerce, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 
 from ..models import FuelPrice, FuelEntry
+from ..models.fixed_point import SCALE
+from .data_version import _data_version_for
+from .unit_of_work import commit
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle only for typing
+    from .price_fetcher import PriceFetcher
+    from .response_cache import ResponseCache
 
 # Reusable HTTP session for API requests
 _HTTP_SESSION = requests.Session()
@@ -45,29 +60,52 @@ def _parse_thai_date(text: str) -> date:
     return date(year, month, int(day_str))
 
 
-def _parse_prices(data: Dict[str, Any], day: date, session: Session) -> None:
-    for station, fuels in data.items():
-        for ftype, info in fuels.items():
-            exists = session.exec(
-                select(FuelPrice).where(
-                    FuelPrice.date == day,
-                    FuelPrice.station == station,
-                    FuelPrice.fuel_type == ftype,
-                )
-            ).first()
-            if exists is not None:
-                continue
-            price = Decimal(str(info["price"]))
-            session.add(
-                FuelPrice(
-                    date=day,
-                    station=station,
-                    fuel_type=ftype,
-                    name_th=str(info.get("name_th") or info.get("name", "")),
-                    price=price,
-                )
-            )
-    session.commit()
+def _price_rows(data: dict[str, Any], day: date) -> list[dict[str, Any]]:
+    return [
+        {
+            "date": day,
+            "station": station,
+            "fuel_type": ftype,
+            "name_th": str(info.get("name_th") or info.get("name", "")),
+            "price": Decimal(str(info["price"])),
+        }
+        for station, fuels in data.items()
+        for ftype, info in fuels.items()
+    ]
+
+
+def _insert_prices(session: Session, rows: list[dict[str, Any]]) -> int:
+    """Insert price rows in one ``executemany``, skipping existing days."""
+    if not rows:
+        return 0
+    stmt = sqlite_insert(cast(Any, FuelPrice).__table__).on_conflict_do_nothing(
+        index_elements=["date", "station", "fuel_type"]
+    )
+    result = session.execute(stmt, rows)
+    return int(cast(Any, result).rowcount or 0)
+
+
+def _parse_prices(data: dict[str, Any], day: date, session: Session) -> None:
+    _insert_prices(session, _price_rows(data, day))
+    commit(session)
+
+
+def backfill_prices(session: Session, days: Mapping[date, dict[str, Any]]) -> int:
+    """Store many days of API ``stations`` payloads in a single transaction.
+
+    ``days`` maps each day to the ``response.stations`` part of an API
+    payload. Prices already stored for a day, station and fuel type are kept.
+
+    Returns
+    -------
+    int
+        Number of new price rows.
+    """
+
+    rows = [row for day, data in days.items() for row in _price_rows(data, day)]
+    inserted = _insert_prices(session, rows)
+    commit(session)
+    return inserted
 
 
 def purge_old_prices(session: Session, days: int | None = None) -> None:
@@ -92,88 +130,335 @@ def purge_old_prices(session: Session, days: int | None = None) -> None:
     base_day = max_day or date.today()
     cutoff = base_day - timedelta(days=days)
     session.execute(delete(FuelPrice).where(cast(Any, FuelPrice.date) < cutoff))
-    session.commit()
+    commit(session)
 
 
-def update_missing_liters(session: Session, station: str = "ptt") -> None:
-    """Fill :class:`FuelEntry.liters` for rows missing the value."""
+def update_missing_liters(
+    session: Session,
+    station: str = "ptt",
+    fallback_days: int = DEFAULT_FALLBACK_DAYS,
+) -> int:
+    """Fill :class:`FuelEntry.liters` for rows missing the value.
+
+    Runs as a single ``UPDATE`` with a correlated subquery picking the price
+    :func:`get_price` would return: the entry's day, otherwise the latest
+    price within ``fallback_days`` before it. Liters are computed from the
+    stored satang with integer arithmetic, rounding like
+    :func:`~src.models.fixed_point.liters_cl`. Entries without a matching
+    price are left untouched.
 
-    stmt = select(FuelEntry).where(
-        cast(Any, FuelEntry.liters).is_(None),
-        cast(Any, FuelEntry.amount_spent).is_not(None),
+    Returns
+    -------
+    int
+        Number of entries filled.
+    """
+
+    entry = cast(Any, FuelEntry).__table__.c
+    price_col = cast(Any, FuelPrice).__table__.c
+    ftype = func.coalesce(entry.fuel_type, "e20")
+    # Typed as a plain integer so the arithmetic below stays in satang.
+    price = type_coerce(
+        select(price_col.price)
+        .where(
+            price_col.station == station,
+            price_col.fuel_type == ftype,
+            price_col.date <= entry.entry_date,
+            price_col.date
+            >= func.date(entry.entry_date, f"-{max(fallback_days, 0)} days"),
+        )
+        .order_by(price_col.date.desc(), price_col.id)
+        .limit(1)
+        .scalar_subquery(),
+        Integer,
+    )
+    amount = type_coerce(entry.amount_spent, Integer)
+    # :func:`~src.models.fixed_point.liters_cl` in integer SQL.
+    liters = (amount * (2 * SCALE) + price) // (2 * price)
+    stmt = (
+        update(FuelEntry)
+        .where(
+            entry.liters.is_(None),
+            entry.amount_spent.is_not(None),
+            price.is_not(None),
+        )
+        .values({entry.liters: type_coerce(liters, Integer)})
+        .execution_options(synchronize_session=False)
     )
-    entries = session.exec(stmt).all()
+    result = session.execute(stmt)
+    commit(session)
+    return int(cast(Any, result).rowcount or 0)
 
-    prices: dict[tuple[str, date], Optional[Decimal]] = {}
 
-    for entry in entries:
-        ftype = entry.fuel_type or "e20"
-        key = (ftype, entry.entry_date)
-        if key not in prices:
-            prices[key] = get_price(session, ftype, station, entry.entry_date)
-        price = prices[key]
+def _confirm_when_committed(
+    session: Session, fetcher: PriceFetcher, paths: Iterable[str]
+) -> None:
+    """Confirm ``paths`` with ``fetcher`` once ``session`` has committed.
 
-        if price is None or entry.amount_spent is None:
-            continue
+    Inside a unit of work :func:`commit` only flushes, so the payloads are
+    stored when the outer transaction commits; if it rolls back instead the
+    validators are dropped and the next request downloads them again.
+    """
+    paths = list(paths)
+    if not session.in_transaction():
+        fetcher.confirm(paths)
+        return
+    done = False
 
-        entry.liters = float(
-            (Decimal(str(entry.amount_spent)) / price).quantize(Decimal("0.01"))
-        )
-        session.add(entry)
-    session.commit()
+    def on_commit(_session: Session) -> None:
+        nonlocal done
+        if not done:
+            done = True
+            fetcher.confirm(paths)
+
+    def on_rollback(_session: Session) -> None:
+        nonlocal done
+        done = True
+
+    event.listen(session, "after_commit", on_commit, once=True)
+    event.listen(session, "after_rollback", on_rollback, once=True)
 
 
 def fetch_latest(
     session: Session,
     station: str = "ptt",
-    api_base: Optional[str] = None,
+    api_base: str | None = None,
+    fetcher: PriceFetcher | None = None,
+    cache: ResponseCache | None = None,
 ) -> None:
     """ดึงและบันทึกราคาน้ำมันล่าสุดจาก Thai Oil API
 
     สามารถกำหนดฐาน URL ได้ผ่านพารามิเตอร์ ``api_base``
     หรือผ่านตัวแปรสภาพแวดล้อม ``OIL_API_BASE``
+    เมื่อส่ง ``fetcher`` จะใช้ :class:`~src.services.price_fetcher.PriceFetcher`
+    ซึ่งลองใหม่อัตโนมัติ และข้ามการบันทึกเมื่อข้อมูลไม่เปลี่ยนแปลง
+    เมื่อส่ง ``cache`` จะใช้ข้อมูลในแคชแทนการเรียก API หากยังไม่หมดอายุ
+    และบันทึกข้อมูลที่ดาวน์โหลดใหม่ลงแคช
     """
 
-    base = api_base or os.getenv("OIL_API_BASE", API_BASE)
-    resp = _HTTP_SESSION.get(f"{base}/latest", timeout=5)
-    resp.raise_for_status()
-    data = resp.json()
+    if fetcher is not None:
+        url = f"{fetcher.api_base}/latest"
+    else:
+        url = f"{api_base or os.getenv('OIL_API_BASE', API_BASE)}/latest"
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        data = cached
+    else:
+        if fetcher is not None:
+            fresh = fetcher.fetch_sync("latest")
+            if fresh is None:
+                return
+            data = fresh
+        else:
+            resp = _HTTP_SESSION.get(url, timeout=5)
+            resp.raise_for_status()
+            data = resp.json()
+        if cache is not None:
+            cache.put(url, data)
     thai_date = data["response"]["date"]
     day = _parse_thai_date(thai_date)
     stations = data["response"]["stations"]
     _parse_prices(stations, day, session)
+    if fetcher is not None and cached is None:
+        _confirm_when_committed(session, fetcher, ["latest"])
     update_missing_liters(session, station)
     purge_old_prices(session)
 
 
-def get_price(
+def backfill_from_api(
+    session: Session, days: Iterable[date], fetcher: PriceFetcher
+) -> int:
+    """Fetch several past ``days`` concurrently and store them at once.
+
+    Returns the number of new price rows, see :func:`backfill_prices`.
+    """
+
+    days = list(days)
+    payloads = asyncio.run(fetcher.fetch_history(days))
+    stations = {
+        _parse_thai_date(data["response"]["date"]): data["response"]["stations"]
+        for data in payloads.values()
+    }
+    inserted = backfill_prices(session, stations)
+    _confirm_when_committed(
+        session, fetcher, [fetcher.history_path.format(day=day) for day in days]
+    )
+    if inserted:
+        update_missing_liters(session)
+    return inserted
+
+
+def replay_cached_prices(
+    session: Session, cache: ResponseCache, clear: bool = False
+) -> int:
+    """Rebuild ``fuelprice`` from cached API payloads without the network.
+
+    With ``clear`` the table is emptied first. When a day was cached more
+    than once the newest payload wins.
+
+    Returns
+    -------
+    int
+        Number of price rows inserted.
+    """
+
+    days: dict[date, dict[str, Any]] = {}
+    for data in cache.payloads():
+        try:
+            day = _parse_thai_date(data["response"]["date"])
+            days[day] = data["response"]["stations"]
+        except (KeyError, TypeError, ValueError):
+            continue
+    if clear:
+        session.execute(delete(FuelPrice))
+    inserted = backfill_prices(session, days)
+    if inserted:
+        update_missing_liters(session)
+    return inserted
+
+
+class PriceIndex:
+    """In-memory as-of lookup over the :class:`FuelPrice` table of an engine.
+
+    Prices are loaded into sorted lists of dates and satang per ``(station,
+    fuel_type)`` and answered with :func:`bisect.bisect_right`. The index
+    reloads lazily after any committed write to ``fuelprice``, e.g. from
+    :func:`_parse_prices` or :func:`purge_old_prices`.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self._engine = engine
+        self._versions = _data_version_for(engine)
+        self._lock = threading.Lock()
+        self._loaded: int | None = None
+        self._series: dict[tuple[str, str], tuple[list[date], list[int]]] = {}
+
+    def invalidate(self) -> None:
+        """Force a reload on the next lookup."""
+        with self._lock:
+            self._loaded = None
+
+    def _refresh(self, session: Session | None = None) -> None:
+        version = self._versions.table("fuelprice")
+        if self._loaded == version:
+            return
+        series: dict[tuple[str, str], tuple[list[date], list[int]]] = {}
+        with ExitStack() as stack:
+            if session is None:
+                session = stack.enter_context(Session(self._engine))
+            table = cast(Any, FuelPrice).__table__.c
+            # The stored satang, without converting each price to Decimal.
+            rows = session.exec(
+                select(
+                    table.station,
+                    table.fuel_type,
+                    table.date,
+                    type_coerce(table.price, Integer),
+                ).order_by(table.date, table.id)
+            )
+            for station, ftype, day, price in rows:
+                dates, prices = series.setdefault((station, ftype), ([], []))
+                if dates and dates[-1] == day:
+                    continue  # the first row of a day wins
+                dates.append(day)
+                prices.append(price)
+        self._series = series
+        self._loaded = version
+
+    def lookup_satang(
+        self,
+        fuel_type: str,
+        station: str,
+        day: date,
+        fallback_days: int = DEFAULT_FALLBACK_DAYS,
+        session: Session | None = None,
+    ) -> int | None:
+        """Return the price on ``day`` or the latest within ``fallback_days``.
+
+        The price is in satang per liter. A reload reads through ``session``
+        when given, so it sees the same connection as the caller instead of
+        checking out another one.
+        """
+        with self._lock:
+            self._refresh(session)
+            dates, prices = self._series.get((station, fuel_type), ([], []))
+        pos = bisect_right(dates, day) - 1
+        if pos < 0:
+            return None
+        if dates[pos] == day:
+            return prices[pos]
+        if fallback_days and dates[pos] >= day - timedelta(days=fallback_days):
+            return prices[pos]
+        return None
+
+    def lookup(
+        self,
+        fuel_type: str,
+        station: str,
+        day: date,
+        fallback_days: int = DEFAULT_FALLBACK_DAYS,
+        session: Session | None = None,
+    ) -> Decimal | None:
+        """Return :meth:`lookup_satang`'s price in baht."""
+        price = self.lookup_satang(fuel_type, station, day, fallback_days, session)
+        return None if price is None else Decimal(price).scaleb(-2)
+
+
+_PRICE_INDEXES: weakref.WeakKeyDictionary[Engine, PriceIndex] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def price_index_for(engine: Engine) -> PriceIndex:
+    """Return the shared :class:`PriceIndex` for ``engine``."""
+    index = _PRICE_INDEXES.get(engine)
+    if index is None:
+        index = PriceIndex(engine)
+        _PRICE_INDEXES[engine] = index
+    return index
+
+
+def get_price_satang(
     session: Session,
     fuel_type: str,
     station: str,
     day: date,
     fallback_days: int = DEFAULT_FALLBACK_DAYS,
-) -> Optional[Decimal]:
-    row = session.exec(
-        select(cast(Any, FuelPrice.price)).where(
-            FuelPrice.date == day,
-            FuelPrice.station == station,
-            FuelPrice.fuel_type == fuel_type,
-        )
-    ).first()
+) -> int | None:
+    """Return the price for ``day`` in satang through the :class:`PriceIndex`.
 
-    if row is None and fallback_days:
-        cutoff = day - timedelta(days=fallback_days)
-        row = session.exec(
-            select(cast(Any, FuelPrice.price))
-            .where(
-                FuelPrice.date < day,
-                FuelPrice.date >= cutoff,
-                FuelPrice.station == station,
-                FuelPrice.fuel_type == fuel_type,
+    When ``session`` has written prices that are not committed yet, e.g.
+    inside :meth:`StorageService.transaction`, the price is queried directly
+    so those rows are seen.
+    """
+    if session.in_transaction():
+        dirty = session.connection().info.get("ft_dirty_tables", ())
+        if "fuelprice" in dirty:
+            table = cast(Any, FuelPrice).__table__.c
+            stmt = (
+                select(type_coerce(table.price, Integer))
+                .where(
+                    table.station == station,
+                    table.fuel_type == fuel_type,
+                    table.date <= day,
+                    table.date >= day - timedelta(days=fallback_days),
+                )
+                .order_by(table.date.desc(), table.id)
+                .limit(1)
             )
-            .order_by(cast(Any, FuelPrice.date).desc())
-        ).first()
+            return session.exec(stmt).first()
+    engine = cast(Engine, session.get_bind().engine)
+    return price_index_for(engine).lookup_satang(
+        fuel_type, station, day, fallback_days, session=session
+    )
 
-    if row is None:
-        return None
-    return Decimal(row)
+
+def get_price(
+    session: Session,
+    fuel_type: str,
+    station: str,
+    day: date,
+    fallback_days: int = DEFAULT_FALLBACK_DAYS,
+) -> Decimal | None:
+    """Return :func:`get_price_satang`'s price in baht per liter."""
+    price = get_price_satang(session, fuel_type, station, day, fallback_days)
+    return None if price is None else Decimal(price).scaleb(-2)
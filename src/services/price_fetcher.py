@@ -0,0 +1,267 @@
+"""ตัวดึงราคาน้ำมันแบบ asyncio สำหรับ Thai Oil API
+
+:class:`PriceFetcher` owns a pooled :class:`requests.Session` so calls run
+concurrently in worker threads. It sends conditional GETs, retries transient
+errors with exponential backoff and full jitter, and stops calling a failing
+API through a :class:`CircuitBreaker`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import date
+from typing import Any
+
+import requests
+
+from . import oil_service
+
+logger = logging.getLogger(__name__)
+
+#: Statuses worth retrying; everything else fails immediately.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling the API while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Open after ``failure_threshold`` failed fetches in a row.
+
+    While open every call fails fast. After ``reset_after`` seconds a single
+    trial call is let through; its success closes the circuit again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_after: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """Return ``True`` when a call may be attempted now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or self._clock() - self._opened_at < self.reset_after:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+    def release(self) -> None:
+        """Let another trial through after one ended without a result."""
+        with self._lock:
+            self._trial = False
+
+
+class PriceFetcher:
+    """Fetch API payloads concurrently with retries and conditional requests.
+
+    Parameters
+    ----------
+    api_base:
+        Base URL, defaults to ``OIL_API_BASE`` or
+        :data:`~src.services.oil_service.API_BASE`.
+    max_connections:
+        Size of the HTTP connection pool and the concurrency limit of
+        :meth:`fetch_many`.
+    retries:
+        Extra attempts after a connection error, timeout or retryable status.
+    backoff, max_backoff:
+        Retry ``n`` sleeps a random time up to
+        ``min(max_backoff, backoff * 2**n)`` seconds.
+    history_path:
+        ``str.format`` template with ``day`` for :meth:`fetch_history`.
+    session:
+        HTTP session to use, defaults to a new session of this fetcher with
+        a pool of ``max_connections``.
+
+    The ``ETag``/``Last-Modified`` validators of a new payload are only sent
+    with later requests once :meth:`confirm` was called for its path, i.e.
+    after the caller stored the payload. A payload that was never stored is
+    therefore downloaded again instead of being answered with ``304``.
+    """
+
+    def __init__(
+        self,
+        api_base: str | None = None,
+        *,
+        max_connections: int = 4,
+        timeout: float = 5.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        breaker: CircuitBreaker | None = None,
+        history_path: str = "history/{day:%Y-%m-%d}",
+        session: requests.Session | None = None,
+    ) -> None:
+        self.api_base = (
+            api_base or os.getenv("OIL_API_BASE", oil_service.API_BASE)
+        ).rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.history_path = history_path
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_connections)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._lock = threading.Lock()
+        # url -> (ETag, Last-Modified) of the last stored response
+        self._validators: dict[str, tuple[str | None, str | None]] = {}
+        # Validators of responses not confirmed as stored yet.
+        self._pending: dict[str, tuple[str | None, str | None]] = {}
+
+    def _url(self, path: str) -> str:
+        return f"{self.api_base}/{path.lstrip('/')}"
+
+    def _get(self, url: str) -> dict[str, Any] | None:
+        headers: dict[str, str] = {}
+        with self._lock:
+            etag, modified = self._validators.get(url, (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+        resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304:
+            return None
+        resp.raise_for_status()
+        data: dict[str, Any] = resp.json()
+        with self._lock:
+            self._pending[url] = (
+                resp.headers.get("ETag"),
+                resp.headers.get("Last-Modified"),
+            )
+        return data
+
+    def confirm(self, paths: Iterable[str]) -> None:
+        """Use the validators of the payloads fetched from ``paths``.
+
+        Call this once those payloads are stored; later requests for the
+        paths are then conditional.
+        """
+        with self._lock:
+            for path in paths:
+                validators = self._pending.pop(self._url(path), None)
+                if validators is not None:
+                    self._validators[self._url(path)] = validators
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    async def fetch(self, path: str = "latest") -> dict[str, Any] | None:
+        """Return the JSON payload at ``path`` or ``None`` when unchanged.
+
+        Raises
+        ------
+        CircuitOpenError
+            The API failed too often recently and was not called.
+        requests.RequestException
+            The request still failed after all retries.
+        """
+        url = self._url(path)
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"ข้ามการเรียก {url} ชั่วคราวเนื่องจากล้มเหลวหลายครั้ง"
+            )
+        attempt = 0
+        recorded = False
+        try:
+            while True:
+                try:
+                    data = await asyncio.to_thread(self._get, url)
+                except requests.RequestException as exc:
+                    response = getattr(exc, "response", None)
+                    retryable = (
+                        response is None or response.status_code in RETRY_STATUSES
+                    )
+                    if not retryable or attempt >= self.retries:
+                        recorded = True
+                        self.breaker.record_failure()
+                        raise
+                    delay = self._delay(attempt)
+                    logger.warning(
+                        "ดึง %s ไม่สำเร็จ (%s) ลองใหม่ใน %.1f วินาที", url, exc, delay
+                    )
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                recorded = True
+                self.breaker.record_success()
+                return data
+        finally:
+            # A cancelled call (or any other exception) must not keep a
+            # half-open circuit's trial slot forever.
+            if not recorded:
+                self.breaker.release()
+
+    async def fetch_many(self, paths: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Fetch ``paths`` concurrently, at most ``max_connections`` at a time.
+
+        Returns the payloads that changed, keyed by path. Failed paths are
+        logged and left out.
+        """
+        limit = asyncio.Semaphore(self.max_connections)
+
+        async def one(path: str) -> dict[str, Any] | None:
+            async with limit:
+                return await self.fetch(path)
+
+        paths = list(paths)
+        results = await asyncio.gather(*(one(p) for p in paths), return_exceptions=True)
+        payloads: dict[str, dict[str, Any]] = {}
+        for path, result in zip(paths, results):
+            if isinstance(result, BaseException):
+                logger.error("ดึง %s ไม่สำเร็จ: %s", path, result)
+            elif result is not None:
+                payloads[path] = result
+        return payloads
+
+    async def fetch_history(self, days: Iterable[date]) -> dict[date, dict[str, Any]]:
+        """Fetch the payloads of several past ``days`` concurrently."""
+        paths = {self.history_path.format(day=day): day for day in days}
+        payloads = await self.fetch_many(paths)
+        return {paths[path]: data for path, data in payloads.items()}
+
+    def fetch_sync(self, path: str = "latest") -> dict[str, Any] | None:
+        """Blocking :meth:`fetch` for worker threads without an event loop."""
+        return asyncio.run(self.fetch(path))
@@ -0,0 +1,102 @@
+"""อ่านคอลัมน์ที่เลือกของรายการเติมน้ำมันเป็น tuple สำหรับรายงาน
+
+Reports and exports read a handful of columns from many entries and turn
+them straight into DataFrames or CSV rows. Loading them as
+:class:`~src.models.FuelEntry` instances first validates every row, tracks
+it in the session and keeps its instance state alive, only for the caller
+to copy the fields out again. :func:`entry_rows` instead runs one
+``SELECT`` of the requested columns and returns the tuples the DBAPI cursor
+already built; only ``entry_date`` is converted from the ISO text SQLite
+stores. The rows are plain data: nothing is attached to a session and
+changing them writes nothing back.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from datetime import date
+from typing import Any
+
+from sqlalchemy.engine import Connection
+
+#: Columns of ``fuelentry`` that can be projected and the SQL reading them.
+#: Money and volumes are stored in hundredths; see
+#: :mod:`src.models.fixed_point`.
+ENTRY_COLUMNS = {
+    "id": "id",
+    "entry_date": "entry_date",
+    "vehicle_id": "vehicle_id",
+    "fuel_type": "fuel_type",
+    "odo_before": "odo_before",
+    "odo_after": "odo_after",
+    "amount_spent": "amount_satang / 100.0",
+    "liters": "liters_cl / 100.0",
+}
+
+
+def select_sql(
+    select: str,
+    start: date | None = None,
+    end: date | None = None,
+    vehicle_ids: Iterable[int] | None = None,
+) -> tuple[str, tuple] | None:
+    """Return ``SELECT {select} FROM fuelentry`` for a period and its params.
+
+    Rows are ordered by date and id. ``None`` means ``vehicle_ids`` is empty
+    and the query would return nothing.
+    """
+    conditions: list[str] = []
+    params: list[Any] = []
+    if start is not None:
+        conditions.append("entry_date >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        conditions.append("entry_date < ?")
+        params.append(end.isoformat())
+    if vehicle_ids is not None:
+        ids = sorted(set(vehicle_ids))
+        if not ids:
+            return None
+        # ``=`` lets SQLite use ix_fuelentry_vehicle_date_id directly.
+        conditions.append(
+            "vehicle_id = ?"
+            if len(ids) == 1
+            else f"vehicle_id IN ({', '.join('?' * len(ids))})"
+        )
+        params.extend(ids)
+    sql = f"SELECT {select} FROM fuelentry"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql + " ORDER BY entry_date, id", tuple(params)
+
+
+def entry_rows(
+    conn: Connection,
+    columns: Sequence[str],
+    start: date | None = None,
+    end: date | None = None,
+    vehicle_ids: Iterable[int] | None = None,
+) -> list[tuple]:
+    """Return ``columns`` of entries with ``start <= entry_date < end``.
+
+    Either bound may be ``None`` for an open range and ``vehicle_ids``
+    limits the result to those vehicles. Rows are ordered by date and id,
+    like :meth:`~src.services.storage_service.StorageService.entries_between`.
+    """
+    unknown = [c for c in columns if c not in ENTRY_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"unknown fuelentry columns: {unknown or columns}")
+    query = select_sql(
+        ", ".join(ENTRY_COLUMNS[c] for c in columns), start, end, vehicle_ids
+    )
+    if query is None:
+        return []
+    # Fetch from the DBAPI cursor itself: its tuples need no Row wrapper.
+    rows: list[tuple] = conn.exec_driver_sql(*query).cursor.fetchall()
+    if "entry_date" not in columns:
+        return rows
+    i = list(columns).index("entry_date")
+    fromiso = date.fromisoformat
+    if i == 0:
+        return [(fromiso(r[0]),) + r[1:] for r in rows]
+    return [r[:i] + (fromiso(r[i]),) + r[i + 1 :] for r in rows]
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import date
 from pathlib import Path
-from typing import Dict, List
+from collections.abc import Callable
 
 from pandas import DataFrame, Series
 
@@ -13,7 +13,7 @@ from fpdf import FPDF
 from fpdf.enums import XPos, YPos
 import matplotlib
 from matplotlib import font_manager
-from typing import Any, Callable, cast
+from typing import Any, cast
 from io import BytesIO
 import logging
 
@@ -27,22 +27,34 @@ else:
 import matplotlib.pyplot as plt  # noqa: E402
 from matplotlib import dates as mdates  # noqa: E402
 
-from ..models import FuelEntry, Vehicle  # noqa: E402
 from .storage_service import StorageService  # noqa: E402
+from .date_ranges import month_range  # noqa: E402
 from ..constants import FUEL_TYPE_TH  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
 date2num = cast(Callable[[date], float], mdates.date2num)
 
+MONTHLY_COLUMNS = [
+    "date",
+    "vehicle",
+    "vehicle_type",
+    "fuel_type",
+    "distance",
+    "liters",
+    "amount_spent",
+    "km_per_l",
+    "thb_per_km",
+]
+
 
 class ReportService:
     def __init__(self, storage: StorageService) -> None:
         self.storage = storage
         self._monthly_cache: dict[tuple[str, int | None], DataFrame] = {}
-        self._monthly_cache_ts: float | None = None
+        self._monthly_cache_ts: int | None = None
 
-    def calc_overall_stats(self) -> Dict[str, float]:
+    def calc_overall_stats(self) -> dict[str, float]:
         total_distance, total_liters, total_price = self.storage.get_overall_totals()
 
         avg_consumption = (
@@ -68,76 +80,62 @@ class ReportService:
     # New functionality for exporting monthly reports
     # ------------------------------------------------------------------
 
-    def _filter_entries(self, month: date, vehicle_id: int | None) -> List[FuelEntry]:
-        """ดึงรายการของยานพาหนะในเดือนที่กำหนด"""
-        return self.storage.list_entries_for_month(month.year, month.month, vehicle_id)
+    def _filter_entries(self, month: date, vehicle_id: int | None) -> DataFrame:
+        """ดึงรายการของเดือนที่กำหนดจาก :meth:`StorageService.to_frame`"""
+        return self.storage.to_frame(
+            *month_range(month.year, month.month),
+            None if vehicle_id is None else [vehicle_id],
+        )
 
     # FIX: mypy clean
     def _monthly_df(self, month: date, vehicle_id: int | None) -> DataFrame:
         """Return monthly entries as a :class:`pandas.DataFrame`."""
         key = (month.strftime("%Y-%m"), vehicle_id)
-        ts = getattr(self.storage, "last_modified", None)
-        if key in self._monthly_cache and self._monthly_cache_ts == ts:
-            return self._monthly_cache[key].copy()
-
-        entries = self._filter_entries(month, vehicle_id)
-        vehicles: Dict[int, Vehicle | None] = {}
-        data = []
-        for e in entries:
-            if e.vehicle_id not in vehicles:
-                vehicle = self.storage.get_vehicle(e.vehicle_id)
-                vehicles[e.vehicle_id] = vehicle
-            v = vehicles[e.vehicle_id]
-            dist = None if e.odo_after is None else e.odo_after - e.odo_before
-            kmpl = dist / e.liters if dist and e.liters else None
-            cpk = e.amount_spent / dist if dist and e.amount_spent else None
-            data.append(
-                {
-                    "date": e.entry_date,
-                    "vehicle": v.name if v else "",
-                    "vehicle_type": v.vehicle_type if v else "",
-                    "fuel_type": FUEL_TYPE_TH.get(e.fuel_type or "", e.fuel_type or ""),
-                    "distance": dist,
-                    "liters": e.liters,
-                    "amount_spent": e.amount_spent,
-                    "km_per_l": kmpl,
-                    "thb_per_km": cpk,
-                }
-            )
-
-        if not data:
-            df = pd.DataFrame(
-                columns=[
-                    "date",
-                    "vehicle",
-                    "vehicle_type",
-                    "fuel_type",
-                    "distance",
-                    "liters",
-                    "amount_spent",
-                    "km_per_l",
-                    "thb_per_km",
-                    "weekday",
-                ]
-            )
-            self._monthly_cache[key] = df
+        ts = getattr(self.storage, "data_version", None)
+        if self._monthly_cache_ts != ts:
+            # Any write invalidates every cached month, not only ``key``.
+            self._monthly_cache.clear()
             self._monthly_cache_ts = ts
-            return df.copy()
+        if key in self._monthly_cache:
+            return self._monthly_cache[key].copy()
 
-        df = pd.DataFrame(data)
-        df.sort_values("date", inplace=True)
-        df["weekday"] = pd.to_datetime(df["date"]).dt.day_name().str[:3]
+        frame = self._filter_entries(month, vehicle_id)
+        dist = frame["distance"]
+        # Zero or unknown distance, liters or amount leave the ratio empty.
+        moved = dist.fillna(0) != 0
+        df = pd.DataFrame(
+            {
+                "date": frame["date"].dt.date,
+                "vehicle": frame["vehicle"],
+                "vehicle_type": frame["vehicle_type"],
+                "fuel_type": frame["fuel_name"],
+                "distance": dist,
+                "liters": frame["liters"],
+                "amount_spent": frame["amount_spent"],
+                "km_per_l": (dist / frame["liters"]).where(
+                    moved & (frame["liters"].fillna(0) != 0)
+                ),
+                "thb_per_km": (frame["amount_spent"] / dist).where(
+                    moved & (frame["amount_spent"].fillna(0) != 0)
+                ),
+                "weekday": frame["date"].dt.day_name().str[:3],
+            },
+            columns=[*MONTHLY_COLUMNS, "weekday"],
+        )
         self._monthly_cache[key] = df
-        self._monthly_cache_ts = ts
         return df.copy()
 
-    def get_monthly_stats(self, month: date, vehicle_id: int) -> Dict[str, float]:
+    def get_monthly_stats(self, month: date, vehicle_id: int) -> dict[str, float]:
         """คำนวณผลรวมและค่าเฉลี่ยของเดือนสำหรับยานพาหนะ"""
         total_distance, total_liters, total_price = self.storage.vehicle_monthly_stats(
             vehicle_id, month.year, month.month
         )
         fills_count = len(
-            self.storage.list_entries_for_month(month.year, month.month, vehicle_id)
+            self.storage.project_entries(
+                ("id",),
+                *month_range(month.year, month.month),
+                None if vehicle_id is None else [vehicle_id],
+            )
         )
 
         avg_consumption = (
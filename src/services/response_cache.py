@@ -0,0 +1,149 @@
+"""แคชข้อมูลดิบจาก API ราคาน้ำมันบนดิสก์
+
+Payloads are stored content-addressed as ``objects/<sha256>.json`` so
+identical responses on different days share one file. ``index.json`` maps
+``(url, day)`` to the object and the time it was stored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from ..settings import data_dir
+
+logger = logging.getLogger(__name__)
+
+#: Seconds a cached response is served instead of calling the API.
+DEFAULT_TTL = 6 * 3600
+#: Total size of cached objects kept on disk.
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+
+class ResponseCache:
+    """Content-addressed cache of raw API responses with TTL and size limit."""
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.root = Path(root) if root is not None else data_dir() / "api_cache"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._objects = self.root / "objects"
+        self._index_path = self.root / "index.json"
+
+    @staticmethod
+    def _key(url: str, day: date) -> str:
+        return f"{day.isoformat()} {url}"
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        try:
+            data = json.loads(self._index_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("อ่านดัชนีแคช %s ไม่ได้ เริ่มใหม่", self._index_path)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_index(self, index: dict[str, dict[str, Any]]) -> None:
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self._index_path)
+
+    def put(self, url: str, payload: dict[str, Any], day: date | None = None) -> str:
+        """Store ``payload`` for ``url`` on ``day`` (today) and return its hash."""
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            self._objects.mkdir(parents=True, exist_ok=True)
+            obj = self._objects / f"{digest}.json"
+            if not obj.exists():
+                tmp = obj.with_suffix(".tmp")
+                tmp.write_bytes(body)
+                os.replace(tmp, obj)
+            index = self._load_index()
+            index[self._key(url, day or date.today())] = {
+                "url": url,
+                "sha256": digest,
+                "stored": self._clock(),
+            }
+            self._evict(index)
+            self._save_index(index)
+        return digest
+
+    def _read(self, digest: str) -> dict[str, Any] | None:
+        try:
+            data: dict[str, Any] = json.loads(
+                (self._objects / f"{digest}.json").read_bytes()
+            )
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def get(
+        self, url: str, day: date | None = None, max_age: float | None = None
+    ) -> dict[str, Any] | None:
+        """Return the payload cached for ``url`` on ``day`` if still fresh.
+
+        ``max_age`` overrides the cache TTL; pass ``float("inf")`` to accept
+        stale entries.
+        """
+        with self._lock:
+            entry = self._load_index().get(self._key(url, day or date.today()))
+        if entry is None:
+            return None
+        limit = self.ttl if max_age is None else max_age
+        if self._clock() - float(entry["stored"]) > limit:
+            return None
+        return self._read(str(entry["sha256"]))
+
+    def payloads(self) -> Iterator[dict[str, Any]]:
+        """Yield every cached payload, oldest first, for offline replay."""
+        with self._lock:
+            entries = sorted(self._load_index().values(), key=lambda e: e["stored"])
+        seen: set[str] = set()
+        for entry in entries:
+            digest = str(entry["sha256"])
+            if digest in seen:
+                continue
+            seen.add(digest)
+            data = self._read(digest)
+            if data is not None:
+                yield data
+
+    def _evict(self, index: dict[str, dict[str, Any]]) -> None:
+        """Drop the oldest entries until objects fit in ``max_bytes``."""
+        sizes: dict[str, int] = {}
+        for path in self._objects.glob("*.json"):
+            sizes[path.stem] = path.stat().st_size
+        refs = Counter(str(e["sha256"]) for e in index.values())
+        # Objects no entry points to anymore are removed right away.
+        for digest in set(sizes) - set(refs):
+            (self._objects / f"{digest}.json").unlink(missing_ok=True)
+            del sizes[digest]
+        total = sum(sizes.values())
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1]["stored"]):
+            if total <= self.max_bytes:
+                break
+            del index[key]
+            digest = str(entry["sha256"])
+            refs[digest] -= 1
+            if refs[digest] == 0 and digest in sizes:
+                (self._objects / f"{digest}.json").unlink(missing_ok=True)
+                total -= sizes.pop(digest)
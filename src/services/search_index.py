@@ -0,0 +1,224 @@
+"""ดัชนีค้นหาข้อความ FTS5 ของยานพาหนะและงานซ่อมบำรุง
+
+``vehicle_fts`` and ``maintenance_fts`` are external-content FTS5 tables over
+``vehicle`` and ``maintenance``: they store only the index and read the text
+back from the base tables. Triggers on the base tables keep them current for
+every write path, and :func:`rebuild` regenerates them from scratch.
+
+The ``trigram`` tokenizer indexes every three-character run instead of
+words. Thai is written without spaces between words, so word tokenizers see
+a whole phrase as one token; trigrams let any part of it match, including
+its beginning. Terms shorter than three characters cannot use the index and
+are matched with ``LIKE`` on the few rows the other terms leave.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+#: ``{fts table: (content table, indexed columns by search rank)}``.
+TABLES = {
+    "vehicle_fts": ("vehicle", ("name", "license_plate", "vehicle_type")),
+    "maintenance_fts": ("maintenance", ("name", "note")),
+}
+
+#: Shortest term the trigram index can look up.
+MIN_TERM = 3
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """ผลการค้นหาหนึ่งรายการจาก :meth:`StorageService.search`"""
+
+    #: ``"vehicle"`` or ``"maintenance"``.
+    kind: str
+    id: int
+    vehicle_id: int
+    title: str
+    #: 0 when the name matched, higher for plate, type or note matches.
+    rank: int
+
+
+def _triggers(fts: str) -> dict[str, tuple[str, str]]:
+    content, columns = TABLES[fts]
+    names = ", ".join(columns)
+
+    def values(row: str) -> str:
+        return ", ".join(f"{row}.{c}" for c in columns)
+
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (NEW.id, {values('NEW')});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {names}) "
+        f"VALUES ('delete', OLD.id, {values('OLD')});"
+    )
+    return {
+        f"trg_{fts}_insert": (f"AFTER INSERT ON {content}", insert),
+        f"trg_{fts}_delete": (f"AFTER DELETE ON {content}", delete),
+        f"trg_{fts}_update": (f"AFTER UPDATE ON {content}", delete + insert),
+    }
+
+
+TRIGGERS = {name: body for fts in TABLES for name, body in _triggers(fts).items()}
+
+
+def _create_sql(fts: str) -> str:
+    content, columns = TABLES[fts]
+    return (
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, "
+        f"content='{content}', content_rowid='id', tokenize='trigram')"
+    )
+
+
+def available(conn: Connection) -> bool:
+    """Return ``True`` when both FTS tables exist in the database."""
+    names = set(
+        conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ).scalars()
+    )
+    return set(TABLES) <= names
+
+
+def install(conn: Connection) -> bool:
+    """Create the FTS tables and their triggers when missing.
+
+    A table is rebuilt from its content table whenever it or one of its
+    triggers had to be created. Returns ``False`` when this SQLite build
+    lacks FTS5 or the trigram tokenizer (SQLite < 3.34); searches then fall
+    back to ``LIKE``.
+    """
+    insp = inspect(conn)
+    if not all(insp.has_table(content) for content, _columns in TABLES.values()):
+        return False
+    existing = set(conn.execute(text("SELECT name FROM sqlite_master")).scalars())
+    try:
+        for fts in TABLES:
+            missing = [n for n in _triggers(fts) if n not in existing]
+            if fts not in existing:
+                conn.execute(text(_create_sql(fts)))
+                missing = list(_triggers(fts))
+            for name in missing:
+                timing, body = TRIGGERS[name]
+                conn.execute(text(f"CREATE TRIGGER {name} {timing} BEGIN {body} END"))
+            if missing:
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    except OperationalError as exc:
+        logger.warning("สร้างดัชนีค้นหา FTS5 ไม่ได้ ใช้ LIKE แทน: %s", exc)
+        return False
+    return True
+
+
+def rebuild(conn: Connection) -> None:
+    """Regenerate both FTS indexes from ``vehicle`` and ``maintenance``."""
+    for fts in TABLES:
+        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def _terms(query: str) -> list[str]:
+    return query.split()
+
+
+def _like(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _likes(source: str, columns: tuple[str, ...], short: list[int]) -> list[str]:
+    """Return one ``LIKE`` clause per short term, matching any column."""
+    return [
+        "(" + " OR ".join(f"{source}.{c} LIKE :t{i} ESCAPE '\\'" for c in columns) + ")"
+        for i in short
+    ]
+
+
+def _split(conn: Connection, terms: list[str]) -> tuple[list[str], list[int]]:
+    """Return the terms the index can look up and the positions of the rest."""
+    indexed = [t for t in terms if len(t) >= MIN_TERM] if available(conn) else []
+    return indexed, [i for i, t in enumerate(terms) if t not in indexed]
+
+
+def search(conn: Connection, query: str, limit: int = 20) -> list[SearchHit]:
+    """Return vehicles and maintenance tasks matching every term of ``query``.
+
+    Hits are ranked by the column the first term is found in (name, then
+    plate, type or note), then names starting with that term, then newest
+    first. Each rank is one ``MATCH ... ORDER BY rowid DESC LIMIT`` that the
+    FTS index stops after ``limit`` rows, so a common word costs the same as
+    a rare one; bm25 would have to score every match first.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    indexed, short = _split(conn, terms)
+    params: dict[str, Any] = {f"t{i}": _like(t) for i, t in enumerate(terms)}
+    params.update(prefix=_like(terms[0])[1:], limit=limit)
+    parts = []
+    for fts, (content, columns) in TABLES.items():
+        vehicle_id = "c.id" if content == "vehicle" else "c.vehicle_id"
+        head = (
+            f"SELECT '{content}' AS kind, c.id AS id, {vehicle_id} AS vehicle_id, "
+            "c.name AS title"
+        )
+        if not indexed:
+            where = " AND ".join(_likes("c", columns, short))
+            rank = " ".join(
+                f"WHEN c.{c} LIKE :t0 ESCAPE '\\' THEN {n}"
+                for n, c in enumerate(columns)
+            )
+            parts.append(
+                f"SELECT * FROM ({head}, CASE {rank} END AS rank FROM {content} c "
+                f"WHERE {where} ORDER BY c.id DESC LIMIT :limit)"
+            )
+            continue
+        for rank, column in enumerate(columns):
+            key = f"{fts}_{column}"
+            params[key] = " AND ".join(
+                [f"{{{column}}} : {_phrase(indexed[0])}", *map(_phrase, indexed[1:])]
+            )
+            where = " AND ".join([f"{fts} MATCH :{key}", *_likes(fts, columns, short)])
+            best = (
+                f"SELECT rowid FROM {fts} WHERE {where} "
+                "ORDER BY rowid DESC LIMIT :limit"
+            )
+            parts.append(
+                f"{head}, {rank} AS rank FROM ({best}) f "
+                f"JOIN {content} c ON c.id = f.rowid"
+            )
+    sql = (
+        "SELECT kind, id, vehicle_id, title, MIN(rank) AS rank "
+        f"FROM ({' UNION ALL '.join(parts)}) GROUP BY kind, id "
+        "ORDER BY rank, title LIKE :prefix ESCAPE '\\' DESC, kind DESC, id DESC "
+        "LIMIT :limit"
+    )
+    rows = conn.execute(text(sql), params)
+    return [SearchHit(r.kind, r.id, r.vehicle_id, r.title, r.rank) for r in rows]
+
+
+def vehicle_ids(conn: Connection, query: str) -> set[int]:
+    """Return ids of vehicles whose name, plate or type matches ``query``."""
+    terms = _terms(query)
+    if not terms:
+        return set()
+    indexed, short = _split(conn, terms)
+    params: dict[str, Any] = {f"t{i}": _like(t) for i, t in enumerate(terms)}
+    _content, columns = TABLES["vehicle_fts"]
+    if indexed:
+        params["match"] = " AND ".join(map(_phrase, indexed))
+        where = ["vehicle_fts MATCH :match", *_likes("vehicle_fts", columns, short)]
+        sql = f"SELECT rowid FROM vehicle_fts WHERE {' AND '.join(where)}"
+    else:
+        where = _likes("vehicle", columns, short)
+        sql = f"SELECT id FROM vehicle WHERE {' AND '.join(where)}"
+    return set(conn.execute(text(sql), params).scalars())
@@ -7,14 +7,26 @@ utilities for encrypted databases, automatic backups and cleanup helpers.
 
 from pathlib import Path
 from datetime import datetime, date
-from typing import List, Optional, Any, Callable, cast
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    cast,
+)
 import os
 import shutil
 import gzip
 from getpass import getpass
 import sys
-from decimal import Decimal
-from contextlib import closing
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+import logging
+import threading
+import time
 
 from ..settings import Settings
 
@@ -27,13 +39,35 @@ except ModuleNotFoundError:  # pragma: no cover - fallback when dependency missi
 
     _SQLCIPHER_AVAILABLE = False
 
+import pandas as pd
 from sqlmodel import Session, SQLModel, create_engine, select
-from sqlalchemy.engine import Engine
-from sqlalchemy import func, or_, case
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy import event, func, insert, or_, select as sa_select, tuple_
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.pool import QueuePool
 
-from ..models import FuelEntry, Vehicle, Budget, Maintenance, FuelPrice
+from ..models import FuelEntry, Vehicle, Budget, Maintenance, FuelPrice, MonthlyAgg
+from ..models.fixed_point import SCALE, liters_cl, to_units
 from .validators import validate_entry
-from .oil_service import get_price
+from .data_version import _data_version_for
+from . import (
+    columnar,
+    fixed_point_columns,
+    monthly_agg,
+    odometer_chain,
+    projection,
+    search_index,
+    unique_prices,
+)
+from .date_ranges import month_range
+from .cipher_key import key_pragma, kdf_stats, read_salt
+from .sqlite_profile import StorageProfile, get_profile
+from .unit_of_work import UnitOfWork, current as current_unit_of_work
+from .oil_service import PriceIndex, get_price_satang, price_index_for
+from .search_index import SearchHit
+
+logger = logging.getLogger(__name__)
+
 
 # ---------------------------------------------------------------------------
 # Database table collection
@@ -46,6 +80,57 @@ ALL_TABLES = (
     cast(Any, FuelPrice).__table__,
 )
 
+#: Pages copied per step of :meth:`StorageService.auto_backup`.
+BACKUP_PAGES = 256
+#: Seconds :meth:`StorageService.auto_backup` pauses between steps.
+BACKUP_PAUSE = 0.005
+#: Added to the name of the backup taken before the fixed-point conversion.
+PRE_FIXED_POINT_SUFFIX = "-pre-fixed-point"
+
+
+class BackupCancelled(Exception):
+    """:meth:`StorageService.auto_backup` was cancelled; no file was kept."""
+
+
+#: Position in the newest-first entry listing: ``(entry_date, id)`` of the
+#: last row already shown.
+EntryKey = tuple[date, int]
+
+
+@dataclass(frozen=True)
+class EntryFilter:
+    """เงื่อนไขกรองรายการสำหรับ :meth:`StorageService.page_entries`"""
+
+    #: Case-insensitive part of the vehicle name.
+    text: str | None = None
+    #: First day to include.
+    start: date | None = None
+    vehicle_id: int | None = None
+
+
+@dataclass(frozen=True)
+class BudgetStatus:
+    """งบประมาณและยอดใช้จ่ายของหนึ่งเดือนจาก :meth:`StorageService.budget_status`"""
+
+    #: ``None`` for the fleet total row.
+    vehicle_id: int | None
+    #: ``None`` when no budget is set.
+    budget: float | None
+    spent: float
+    #: ``budget - spent``; ``None`` without a budget.
+    remaining: float | None
+    #: ``spent`` as a percentage of ``budget``; ``None`` without a budget.
+    percent_used: float | None
+
+    @classmethod
+    def of(
+        cls, vehicle_id: int | None, budget: float | None, spent: float
+    ) -> "BudgetStatus":
+        if budget is None:
+            return cls(vehicle_id, None, spent, None, None)
+        percent = spent / budget * 100 if budget else None
+        return cls(vehicle_id, budget, spent, budget - spent, percent)
+
 
 def _is_plain_sqlite(path: Path) -> bool:
     with open(path, "rb") as fh:
@@ -67,6 +152,44 @@ def _migrate_plain_to_encrypted(path: Path, password: str) -> None:
     os.replace(tmp, path)
 
 
+def _key_statement(path: Path, password: str) -> str:
+    """Return the ``PRAGMA key`` statement to run on each new connection.
+
+    The raw-key form from :mod:`.cipher_key` avoids a KDF run per
+    connection. Files whose key was derived with other SQLCipher settings
+    fall back to the passphrase form.
+    """
+    salt = read_salt(path)
+    statement = key_pragma(password, salt)
+    if salt is None:
+        return statement
+    with closing(sqlcipher.connect(str(path))) as probe:
+        try:
+            probe.execute(statement)
+            probe.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        except sqlcipher.DatabaseError:
+            logger.warning("คีย์ดิบใช้กับ %s ไม่ได้ ใช้รหัสผ่านแทน", path)
+            return f"PRAGMA key='{password}';"
+    return statement
+
+
+def _install_indexes(conn: Connection) -> None:
+    """Create model indexes missing from an existing database.
+
+    ``fueltracker migrate`` stamps a database whose tables already exist
+    instead of upgrading it, so indexes added by later migrations are
+    created here as well.
+    """
+    for table in ALL_TABLES:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _liters_from_amount(amount: float, price: int) -> float:
+    """Return liters bought for ``amount`` baht at ``price`` satang per liter."""
+    return liters_cl(to_units(amount), price) / SCALE
+
+
 class _ConnProxy:
     def __init__(self, conn: sqlcipher.Connection) -> None:
         self._conn = conn
@@ -99,6 +222,9 @@ class StorageService:
         password: str | None = None,
         vacuum_threshold: int = 100,
         default_station: str = "ptt",
+        pool_size: int = 5,
+        max_overflow: int = 5,
+        profile: str | StorageProfile | None = None,
     ) -> None:
         """เริ่มต้นบริการจัดเก็บข้อมูล
 
@@ -109,15 +235,37 @@ class StorageService:
         engine: Engine | None
             ออบเจ็กต์ Engine ที่เตรียมไว้ (ไม่บังคับ)
         vacuum_threshold:
-            เรียก :meth:`vacuum` หลังจากเพิ่มข้อมูลด้วย :meth:`add_entry`
-            ครบจำนวนครั้งที่กำหนด ค่าเริ่มต้น ``100``
+            ตั้ง :attr:`maintenance_due` หลังจากเพิ่มข้อมูลด้วย :meth:`add_entry`
+            ครบจำนวนครั้งที่กำหนด ค่าเริ่มต้น ``100`` งานเบื้องหลังจะเรียก
+            :meth:`incremental_vacuum` เมื่อโปรแกรมว่าง
         default_station:
             สถานีบริการน้ำมันเริ่มต้นสำหรับคำสั่งคำนวณอัตโนมัติ
+        pool_size, max_overflow:
+            จำนวนการเชื่อมต่อที่เก็บไว้ใช้ซ้ำ (เธรด GUI และ worker เบื้องหลัง)
+            และจำนวนที่เปิดเพิ่มได้ชั่วคราว ใช้เมื่อเปิดจาก ``db_path`` เท่านั้น
+        profile:
+            ชื่อหรือ :class:`~.sqlite_profile.StorageProfile` ของค่า PRAGMA
+            ที่ใช้กับทุกการเชื่อมต่อ ค่าเริ่มต้นมาจาก ``FT_DB_PROFILE``
+            (``"balanced"``) ใช้เมื่อเปิดจาก ``db_path`` เท่านั้น
         """
 
         self._vacuum_threshold = vacuum_threshold
         self.default_station = default_station
         self._entry_counter = 0
+        self._key_sql: str | None = None
+        self._local = threading.local()
+        self._connects = 0
+        self._connect_seconds = 0.0
+        self._checkouts = 0
+        self._profile: StorageProfile | None = None
+        self._commits_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._checkpoints = 0
+        # Checked once at idle time after start, e.g. to convert old files.
+        self._maintenance_due = True
+        self._reclaimed_pages = 0
+        self._incremental_runs = 0
+        self._closed = False
 
         if engine is not None:
             self.engine = engine
@@ -159,26 +307,265 @@ class StorageService:
                 _migrate_plain_to_encrypted(db_path, password)
 
             self._password = password or ""
+            if _SQLCIPHER_AVAILABLE and self._password:
+                self._key_sql = _key_statement(db_path, self._password)
+            storage_profile = get_profile(
+                profile if profile is not None else Settings().ft_db_profile
+            )
+            self._profile = storage_profile
 
             def _connect() -> sqlcipher.Connection:
+                start = time.perf_counter()
                 raw = sqlcipher.connect(str(db_path), check_same_thread=False)
-                if _SQLCIPHER_AVAILABLE:
-                    raw.execute(f"PRAGMA key='{password}';")
+                if self._key_sql:
+                    raw.execute(self._key_sql)
+                # Takes effect only for a new file and must come before
+                # ``journal_mode``; migration 0011 converts existing files.
+                raw.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                storage_profile.apply(raw)
+                self._connects += 1
+                self._connect_seconds += time.perf_counter() - start
                 return _ConnProxy(raw)
 
             exists_before = db_path.exists()
+            # "sqlite://" would default to one connection per thread; a queue
+            # pool lets the GUI thread and workers reuse a few connections.
             self.engine = create_engine(
                 "sqlite://",
                 creator=_connect,
-                connect_args={"check_same_thread": False},
+                poolclass=QueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=True,
             )
             self._db_path = db_path
 
             if not exists_before:
                 SQLModel.metadata.create_all(self.engine, tables=list(ALL_TABLES))
+            if storage_profile.wal and storage_profile.checkpoint_seconds > 0:
+                event.listen(self.engine, "commit", self._on_commit)
+                event.listen(self.engine, "checkin", self._on_checkin)
+
+        self._backup_before_conversion()
+        with self.engine.begin() as conn:
+            fixed_point_columns.install(conn)
+            unique_prices.install(conn)
+            _install_indexes(conn)
+            monthly_agg.install(conn)
+            search_index.install(conn)
+
+        event.listen(self.engine, "checkout", self._on_checkout)
+        self._versions = _data_version_for(self.engine)
+        if self._db_path is not None:
+            self._versions.watch(self._open_raw)
+
+    # ------------------------------------------------------------------
+    # Change tracking
+    # ------------------------------------------------------------------
+
+    def _open_raw(self) -> sqlcipher.Connection:
+        """Open a new DB-API connection to the database file."""
+        raw = sqlcipher.connect(str(self._db_path), check_same_thread=False)
+        if self._key_sql:
+            raw.execute(self._key_sql)
+        if self._profile is not None:
+            self._profile.apply(raw)
+        return raw
+
+    def _backup_before_conversion(self) -> None:
+        """Back up a file whose money columns are about to be converted.
+
+        :func:`fixed_point_columns.install` drops the old ``REAL`` columns,
+        so the backup is the only copy of the old layout. It gets its own
+        name, which regular backups neither overwrite nor prune.
+        """
+        if self._db_path is None or not self._db_path.exists():
+            return
+        with self.engine.connect() as conn:
+            if not fixed_point_columns.pending(conn):
+                return
+        backup_dir = self._db_path.parent / "backups"
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        backup = backup_dir / datetime.now().strftime(
+            f"%y-%m-%d_%H%M{PRE_FIXED_POINT_SUFFIX}.db"
+        )
+        self._copy_to(backup, encrypted=True, pages=-1)
+        logger.info("สำรองฐานข้อมูลก่อนแปลงคอลัมน์เงินเป็นจำนวนเต็มไว้ที่ %s", backup)
+
+    def _on_checkout(self, *_args: Any) -> None:
+        self._checkouts += 1
+
+    def _on_commit(self, *_args: Any) -> None:
+        self._commits_since_checkpoint += 1
+
+    def _on_checkin(self, dbapi_conn: Any, _record: Any) -> None:
+        # The "commit" event fires before SQLite commits; by check-in the
+        # connection is idle, so a passive checkpoint cannot hit our own lock.
+        profile = cast(StorageProfile, self._profile)
+        if dbapi_conn is None or not self._commits_since_checkpoint:
+            return
+        now = time.monotonic()
+        if now - self._last_checkpoint < profile.checkpoint_seconds:
+            return
+        self._last_checkpoint = now
+        self._commits_since_checkpoint = 0
+        try:
+            dbapi_conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        except sqlcipher.Error:
+            logger.debug("wal_checkpoint ไม่สำเร็จ", exc_info=True)
+            return
+        self._checkpoints += 1
+
+    def pool_stats(self) -> dict[str, float]:
+        """Return connection pool and key derivation metrics.
+
+        ``connects``/``connect_seconds`` count new raw connections opened by
+        this service; ``checkouts`` counts connections handed out by the
+        pool; ``checkpoints`` counts periodic WAL checkpoints;
+        ``kdf_runs``/``kdf_seconds`` are process-wide.
+        """
+        pool = self.engine.pool
+        stats: dict[str, float] = {
+            "size": pool.size() if isinstance(pool, QueuePool) else 0,
+            "checked_out": pool.checkedout() if isinstance(pool, QueuePool) else 0,
+            "connects": self._connects,
+            "connect_seconds": self._connect_seconds,
+            "checkouts": self._checkouts,
+            "checkpoints": self._checkpoints,
+        }
+        stats.update(kdf_stats())
+        return stats
+
+    @property
+    def data_version(self) -> int:
+        """Monotonic counter that grows whenever any table changes.
+
+        Writes made through this engine are counted when their transaction
+        commits. For file databases, commits from other processes are
+        detected through SQLite's ``PRAGMA data_version``.
+        """
+        return self._versions.total()
+
+    # Kept for callers that poll ``last_modified`` to detect changes.
+    last_modified = data_version
+
+    def table_version(self, table: str) -> int:
+        """Return the change counter of a single table such as ``"fuelentry"``."""
+        return self._versions.table(table)
+
+    def table_versions(self) -> dict[str, int]:
+        """Return the change counters of all tables."""
+        return self._versions.snapshot()
+
+    # ------------------------------------------------------------------
+    # Unit of work
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def transaction(self, refresh: bool = True) -> Iterator[Session]:
+        """รวมการเขียนหลายคำสั่งไว้ใน session และ commit เดียว
+
+        Storage methods called in this thread inside the block share the
+        yielded session and only flush; the block commits once at the end
+        and rolls back completely when it raises. Helpers taking a session,
+        e.g. :func:`~src.services.oil_service.fetch_latest`, can be given the
+        yielded session to join.
+
+        A nested ``transaction()`` becomes a savepoint: an exception leaving
+        it rolls back only the nested block.
+
+        Objects stay loaded after the commit. With ``refresh`` the objects
+        written by storage methods are refreshed once after the commit
+        instead of after every call; pass ``False`` to skip that.
+        """
+        outer: UnitOfWork | None = getattr(self._local, "uow", None)
+        if outer is not None:
+            queued = len(outer.after_commit)
+            try:
+                with outer.session.begin_nested():
+                    yield outer.session
+            except BaseException:
+                # Writes of the savepoint are gone, so are their callbacks.
+                del outer.after_commit[queued:]
+                raise
+            return
+
+        session = Session(self.engine, expire_on_commit=False)
+        uow = UnitOfWork(session, refresh)
+        self._local.uow = uow
+        try:
+            yield session
+            session.commit()
+            if refresh:
+                for obj in uow.written:
+                    if obj in session:
+                        session.refresh(obj)
+        except BaseException:
+            session.rollback()
+            # The index may have loaded prices that were rolled back.
+            self.price_index.invalidate()
+            raise
+        finally:
+            self._local.uow = None
+            session.close()
+        self._count_entries(uow.entries)
+        for callback in uow.after_commit:
+            callback()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the current :meth:`transaction` has committed.
+
+        Outside a transaction it is called right away; when the transaction
+        rolls back it is never called. Used to notify the GUI only when the
+        change is visible to other connections.
+        """
+        uow: UnitOfWork | None = getattr(self._local, "uow", None)
+        if uow is None:
+            callback()
+        else:
+            uow.after_commit.append(callback)
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """Yield the active unit-of-work session or a new one."""
+        uow: UnitOfWork | None = getattr(self._local, "uow", None)
+        if uow is not None:
+            yield uow.session
+            return
+        with Session(self.engine, expire_on_commit=False) as session:
+            yield session
+
+    def _commit(self, session: Session, *written: Any) -> None:
+        """Commit a standalone session or flush inside :meth:`transaction`."""
+        uow = current_unit_of_work(session)
+        if uow is None:
+            session.commit()
+            # Reload so callers see the stored values, e.g. ints as floats.
+            for obj in written:
+                session.refresh(obj)
+            return
+        session.flush()
+        uow.written.extend(written)
+
+    def _count_entries(self, count: int) -> None:
+        """Count added entries and flag maintenance once the threshold is reached."""
+        uow: UnitOfWork | None = getattr(self._local, "uow", None)
+        if uow is not None:
+            # Entries rolled back with the block must not count.
+            uow.entries += count
+            return
+        self._entry_counter += count
+        if self._entry_counter >= self._vacuum_threshold:
+            self._maintenance_due = True
+            self._entry_counter = 0
+
+    @property
+    def price_index(self) -> PriceIndex:
+        """Shared in-memory :class:`PriceIndex` over this database's prices."""
+        return price_index_for(self.engine)
 
     def add_entry(self, entry: FuelEntry) -> None:
-        """Add a refuel entry and finalize the previous incomplete one.
+        """Add a refuel entry and chain it into the vehicle's odometer readings.
 
         Parameters
         ----------
@@ -191,169 +578,302 @@ class StorageService:
         -------
         None
             The entry is written to the database. After the call ``entry.id``
-            will be populated with the assigned primary key.
+            will be populated with the assigned primary key. The entry before
+            it gets ``odo_after`` set to ``entry.odo_before``; a back-dated
+            entry also gets its own ``odo_after`` from the entry after it.
         """
 
         validate_entry(entry)
-        with Session(self.engine) as session:
-            # ------------------------------------------------------------------
-            # Find the latest entry for this vehicle that hasn't recorded an
-            # ``odo_after`` yet. This represents a previous refuel awaiting the
-            # next odometer reading to know the distance driven.
-            # ------------------------------------------------------------------
-            stmt = (
-                select(FuelEntry)
-                .where(
-                    FuelEntry.vehicle_id == entry.vehicle_id,
-                    cast(Any, FuelEntry.odo_after).is_(None),
-                )
-                .order_by(
-                    cast(Any, FuelEntry.entry_date).desc(),
-                    cast(Any, FuelEntry.id).desc(),
-                )
-            )
-            prev = session.exec(stmt).first()
-            if prev is not None:
-                # Update the previous entry so that its ``odo_after`` matches the
-                # odometer reading before this new refuel.
-                prev.odo_after = entry.odo_before
-
-                # If the previous entry recorded spending but not liters, derive
-                # the liters from the historical fuel price at that date.
-                if prev.amount_spent is not None and prev.liters is None:
-                    price = get_price(
-                        session,
-                        prev.fuel_type or "e20",
-                        self.default_station,
-                        prev.entry_date,
-                    )
-                    if price is not None:
-                        prev.liters = float(
-                            (Decimal(str(prev.amount_spent)) / price).quantize(
-                                Decimal("0.01")
-                            )
-                        )
-                session.add(prev)
-
+        with self._session() as session:
             # ------------------------------------------------------------------
             # Auto-calculate liters for the current entry when only the amount
             # spent is provided. The calculation uses the fuel price for the
             # entry date and the service's default station.
             # ------------------------------------------------------------------
             if entry.amount_spent is not None and entry.liters is None:
-                price = get_price(
+                price = get_price_satang(
                     session,
                     entry.fuel_type or "e20",
                     self.default_station,
                     entry.entry_date,
                 )
                 if price is not None:
-                    entry.liters = float(
-                        (Decimal(str(entry.amount_spent)) / price).quantize(
-                            Decimal("0.01")
-                        )
-                    )
+                    entry.liters = _liters_from_amount(entry.amount_spent, price)
 
             session.add(entry)
-            session.commit()
+            for entry_id, odo_after in self._rechain(
+                session, entry.vehicle_id, entry.entry_date
+            ):
+                if entry_id == entry.id or odo_after is None:
+                    continue
+                # The previous refuel now knows its distance; if it recorded
+                # spending but not liters, derive them from the historical
+                # fuel price at that date.
+                prev = session.get(FuelEntry, entry_id)
+                if prev is None or prev.amount_spent is None or prev.liters is not None:
+                    continue
+                price = get_price_satang(
+                    session,
+                    prev.fuel_type or "e20",
+                    self.default_station,
+                    prev.entry_date,
+                )
+                if price is not None:
+                    prev.liters = _liters_from_amount(prev.amount_spent, price)
+                    session.add(prev)
 
-            # FIX: prevent hang when entry.id is None
-            session.flush()
-            if entry.id is not None:
-                session.refresh(entry)
+            self._commit(session, entry)
 
-        self._entry_counter += 1
-        if self._entry_counter >= self._vacuum_threshold:
-            self.vacuum()
-            self._entry_counter = 0
+        self._count_entries(1)
+
+    def add_entries_bulk(self, entries: Iterable[FuelEntry]) -> list[tuple[int, str]]:
+        """Insert many refuel entries in one transaction.
+
+        The result is the same as calling :meth:`add_entry` for each entry in
+        date order: the odometer chain of each vehicle is rebuilt once from
+        its earliest new date and missing liters are derived from stored
+        prices. Prices come from the shared :class:`PriceIndex` and rows are
+        inserted with a single ``executemany``.
+
+        Parameters
+        ----------
+        entries:
+            Entries to insert. Valid entries get their ``id`` populated.
+
+        Returns
+        -------
+        list[tuple[int, str]]
+            ``(position, message)`` for every entry rejected by
+            :func:`validate_entry`. Rejected entries are skipped, the rest
+            are still inserted.
+        """
+
+        errors: list[tuple[int, str]] = []
+        valid: list[tuple[int, FuelEntry]] = []
+        for idx, entry in enumerate(entries):
+            try:
+                validate_entry(entry)
+            except ValueError as exc:
+                errors.append((idx, str(exc)))
+                continue
+            valid.append((idx, entry))
+        if not valid:
+            return errors
+        valid.sort(key=lambda item: (item[1].entry_date, item[0]))
+        batch = [e for _, e in valid]
+        rows = [e.model_dump(exclude={"id"}) for e in batch]
+        ids = self.add_entry_records(rows)
+        for entry, row, new_id in zip(batch, rows, ids):
+            entry.odo_after = row["odo_after"]
+            entry.liters = row["liters"]
+            entry.id = new_id
+        return errors
+
+    def add_entry_records(self, rows: list[dict[str, Any]]) -> list[int]:
+        """Insert already validated entry rows given as plain dictionaries.
+
+        This is the engine behind :meth:`add_entries_bulk` for callers that
+        already hold column data, e.g. the columnar CSV importer, and want to
+        skip building a :class:`FuelEntry` per row. ``rows`` must be sorted by
+        ``entry_date`` and are updated in place with the chained
+        ``odo_after`` and derived ``liters``.
+
+        Returns
+        -------
+        list[int]
+            Ids of the inserted rows in input order.
+        """
+
+        if not rows:
+            return []
+        with self._session() as session:
+            prices = self.price_index
+            station = self.default_station
+            for r in rows:
+                if r["amount_spent"] is None or r["liters"] is not None:
+                    continue
+                price = prices.lookup_satang(
+                    r["fuel_type"] or "e20", station, r["entry_date"]
+                )
+                if price is not None:
+                    r["liters"] = _liters_from_amount(r["amount_spent"], price)
+
+            # ORM inserts group rows by their ``None`` columns and ordered
+            # ``RETURNING`` runs one statement per row on SQLite, so use a
+            # Core ``executemany``. The write lock is held until commit,
+            # which makes the new rowids the last ones.
+            session.execute(insert(cast(Any, FuelEntry).__table__), rows)
+            last = session.exec(select(func.max(FuelEntry.id))).one() or 0
+            ids = list(range(last - len(rows) + 1, last + 1))
+
+            # Rechain each vehicle from its earliest new date, like
+            # ``add_entry`` does for a single entry.
+            since: dict[int, date] = {}
+            for row in rows:
+                vid, day = row["vehicle_id"], row["entry_date"]
+                since[vid] = min(since.get(vid, day), day)
+            by_id = dict(zip(ids, rows))
+            finalized: list[int] = []
+            for vid, day in since.items():
+                for entry_id, odo_after in self._rechain(session, vid, day):
+                    if entry_id in by_id:
+                        by_id[entry_id]["odo_after"] = odo_after
+                    elif odo_after is not None:
+                        finalized.append(entry_id)
+
+            # Stored entries that now know their distance get liters derived
+            # from the historical price, as in ``add_entry``.
+            if finalized:
+                stmt = select(FuelEntry).where(
+                    cast(Any, FuelEntry.id).in_(finalized),
+                    cast(Any, FuelEntry.amount_spent).is_not(None),
+                    cast(Any, FuelEntry.liters).is_(None),
+                )
+                for prev in session.exec(stmt):
+                    price = prices.lookup_satang(
+                        prev.fuel_type or "e20", station, prev.entry_date
+                    )
+                    if price is not None and prev.amount_spent is not None:
+                        prev.liters = _liters_from_amount(prev.amount_spent, price)
+                        session.add(prev)
+            self._commit(session)
+
+        self._count_entries(len(rows))
+        return ids
 
     def add_vehicle(self, vehicle: Vehicle) -> None:
-        with Session(self.engine) as session:
+        with self._session() as session:
             session.add(vehicle)
-            session.commit()
-            # FIX: prevent hang when vehicle.id is None
-            session.flush()
-            if vehicle.id is not None:
-                session.refresh(vehicle)
+            self._commit(session, vehicle)
 
     def list_entries(self) -> List[FuelEntry]:
-        with Session(self.engine) as session:
+        with self._session() as session:
             statement = select(FuelEntry)
             return list(session.exec(statement))
 
     def list_entries_filtered(
         self, text: str | None = None, start: date | None = None
     ) -> list[FuelEntry]:
-        """Return entries filtered by vehicle name and start date."""
-        with Session(self.engine) as session:
+        """Return entries filtered by vehicle text and start date.
+
+        ``text`` is looked up in the vehicle search index, so it matches the
+        name, license plate or type.
+        """
+        with self._session() as session:
             stmt = select(FuelEntry)
             if text:
-                stmt = stmt.join(
-                    Vehicle,
-                    cast(Any, FuelEntry.vehicle_id == Vehicle.id),
-                ).where(func.lower(Vehicle.name).contains(text.lower()))
+                ids = search_index.vehicle_ids(session.connection(), text)
+                stmt = stmt.where(cast(Any, FuelEntry.vehicle_id).in_(sorted(ids)))
             if start:
                 stmt = stmt.where(FuelEntry.entry_date >= start)
             return list(session.exec(stmt))
 
+    def page_entries(
+        self,
+        after_key: EntryKey | None = None,
+        limit: int = 100,
+        filters: EntryFilter | None = None,
+    ) -> list[FuelEntry]:
+        """คืนรายการถัดไปไม่เกิน ``limit`` แถว เรียงจากใหม่ไปเก่า
+
+        Pass ``(entry_date, id)`` of the last row received as ``after_key``
+        to get the following page; ``None`` starts at the newest entry.
+        Unlike ``OFFSET`` the key lets SQLite seek straight to the page in
+        the ``entry_date`` indexes, so late pages cost the same as the
+        first one and rows inserted meanwhile do not shift the listing.
+        """
+        filters = filters or EntryFilter()
+        entry_date = cast(Any, FuelEntry.entry_date)
+        entry_id = cast(Any, FuelEntry.id)
+        conditions = []
+        with self._session() as session:
+            vehicle_ids = None
+            if filters.text:
+                # Resolve the vehicles first so the entry scan stays on an
+                # index instead of joining every entry to its vehicle.
+                vehicle_ids = search_index.vehicle_ids(
+                    session.connection(), filters.text
+                )
+            if filters.vehicle_id is not None:
+                only = {filters.vehicle_id}
+                vehicle_ids = only if vehicle_ids is None else only & vehicle_ids
+            if vehicle_ids is not None:
+                if not vehicle_ids:
+                    return []
+                if len(vehicle_ids) == 1:
+                    conditions.append(FuelEntry.vehicle_id == next(iter(vehicle_ids)))
+                else:
+                    conditions.append(
+                        cast(Any, FuelEntry.vehicle_id).in_(sorted(vehicle_ids))
+                    )
+            if filters.start is not None:
+                conditions.append(entry_date >= filters.start)
+            if after_key is not None:
+                conditions.append(tuple_(entry_date, entry_id) < tuple_(*after_key))
+            stmt = (
+                select(FuelEntry)
+                .where(*conditions)
+                .order_by(entry_date.desc(), entry_id.desc())
+                .limit(limit)
+            )
+            return list(session.exec(stmt))
+
     def list_vehicles(self) -> List[Vehicle]:
-        with Session(self.engine) as session:
+        with self._session() as session:
             statement = select(Vehicle)
             return list(session.exec(statement))
 
     def get_vehicle(self, vehicle_id: int) -> Optional[Vehicle]:
         """ดึงข้อมูลยานพาหนะตามรหัส"""
-        with Session(self.engine) as session:
+        with self._session() as session:
             return session.get(Vehicle, vehicle_id)
 
     def update_vehicle(self, vehicle: Vehicle) -> None:
         """บันทึกการแก้ไขข้อมูลยานพาหนะ"""
-        with Session(self.engine) as session:
+        with self._session() as session:
             session.add(vehicle)
-            session.commit()
-            # FIX: prevent hang when vehicle.id is None
-            session.flush()
-            if vehicle.id is not None:
-                session.refresh(vehicle)
+            self._commit(session, vehicle)
 
     def delete_vehicle(self, vehicle_id: int) -> None:
         """ลบยานพาหนะออกจากฐานข้อมูล"""
-        with Session(self.engine) as session:
+        with self._session() as session:
             obj = session.get(Vehicle, vehicle_id)
             if obj:
                 session.delete(obj)
-                session.commit()
+                self._commit(session)
+                self._maintenance_due = True
 
     def get_entries_by_vehicle(self, vehicle_id: int) -> List[FuelEntry]:
         """คืนรายการทั้งหมดของยานพาหนะที่กำหนด"""
-        with Session(self.engine) as session:
+        with self._session() as session:
             statement = select(FuelEntry).where(FuelEntry.vehicle_id == vehicle_id)
             return list(session.exec(statement))
 
     def get_last_entry(self, vehicle_id: int) -> FuelEntry | None:
         """Return the most recent entry for the given vehicle."""
-        with Session(self.engine) as session:
-            stmt = (
-                select(FuelEntry)
-                .where(FuelEntry.vehicle_id == vehicle_id)
-                .order_by(
-                    cast(Any, FuelEntry.entry_date).desc(),
-                    cast(Any, FuelEntry.id).desc(),
-                )
+        with self._session() as session:
+            return self._last_entry(session, vehicle_id)
+
+    @staticmethod
+    def _last_entry(session: Session, vehicle_id: int) -> FuelEntry | None:
+        stmt = (
+            select(FuelEntry)
+            .where(FuelEntry.vehicle_id == vehicle_id)
+            .order_by(
+                cast(Any, FuelEntry.entry_date).desc(),
+                cast(Any, FuelEntry.id).desc(),
             )
-            return session.exec(stmt).first()
+        )
+        return session.exec(stmt).first()
 
     def get_vehicle_stats(self, vehicle_id: int) -> tuple[float, float, float]:
         """Calculate aggregate stats for a vehicle."""
-        with Session(self.engine) as session:
+        with self._session() as session:
             stmt = select(
-                func.sum(cast(Any, FuelEntry.odo_after) - FuelEntry.odo_before),
-                func.sum(FuelEntry.liters),
-                func.sum(FuelEntry.amount_spent),
-            ).where(
-                FuelEntry.vehicle_id == vehicle_id,
-                cast(Any, FuelEntry.odo_after).is_not(None),
-            )
+                func.sum(MonthlyAgg.distance),
+                func.sum(MonthlyAgg.closed_liters),
+                func.sum(MonthlyAgg.closed_amount),
+            ).where(MonthlyAgg.vehicle_id == vehicle_id)
             totals = session.exec(stmt).one()
             dist = float(totals[0] or 0.0)
             liters = float(totals[1] or 0.0)
@@ -362,51 +882,132 @@ class StorageService:
 
     def get_overall_totals(self) -> tuple[float, float, float]:
         """Return overall distance, liters and amount spent across all vehicles."""
-        with Session(self.engine) as session:
-            dist, liters = session.exec(
+        with self._session() as session:
+            dist, liters, price = session.exec(
                 select(
-                    func.sum(cast(Any, FuelEntry.odo_after) - FuelEntry.odo_before),
-                    func.sum(FuelEntry.liters),
-                ).where(cast(Any, FuelEntry.odo_after).is_not(None))
+                    func.sum(MonthlyAgg.distance),
+                    func.sum(MonthlyAgg.closed_liters),
+                    func.sum(MonthlyAgg.amount),
+                )
             ).one()
-            price = session.exec(select(func.sum(FuelEntry.amount_spent))).one()
             return (
                 float(dist or 0.0),
                 float(liters or 0.0),
                 float(price or 0.0),
             )
 
+    def entries_between(
+        self,
+        start: date,
+        end: date,
+        vehicle_ids: Iterable[int] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> list[Any]:
+        """คืนรายการเติมน้ำมันที่ ``start <= entry_date < end``
+
+        Any period works as one indexed range scan; see
+        :mod:`~src.services.date_ranges` for months, quarters, fiscal years
+        and rolling windows. Entries are ordered by date and id.
+
+        Parameters
+        ----------
+        vehicle_ids:
+            Only return entries of these vehicles; ``None`` means all.
+        columns:
+            Names of :class:`~src.models.FuelEntry` columns to select. The
+            result is then a list of plain tuples of those fields instead of
+            model instances; see :meth:`project_entries`.
+        """
+        if columns is not None:
+            return self.project_entries(columns, start, end, vehicle_ids)
+        entry_date = cast(Any, FuelEntry.entry_date)
+        conditions = [entry_date >= start, entry_date < end]
+        if vehicle_ids is not None:
+            ids = sorted(set(vehicle_ids))
+            if len(ids) == 1:
+                # ``=`` lets SQLite use ix_fuelentry_vehicle_date_id directly.
+                conditions.append(FuelEntry.vehicle_id == ids[0])
+            else:
+                conditions.append(cast(Any, FuelEntry.vehicle_id).in_(ids))
+        order = (entry_date, cast(Any, FuelEntry.id))
+        with self._session() as session:
+            return list(
+                session.exec(select(FuelEntry).where(*conditions).order_by(*order))
+            )
+
+    def project_entries(
+        self,
+        columns: Sequence[str],
+        start: date | None = None,
+        end: date | None = None,
+        vehicle_ids: Iterable[int] | None = None,
+    ) -> list[tuple]:
+        """คืนเฉพาะคอลัมน์ที่เลือกของรายการเติมน้ำมันเป็น tuple
+
+        Read-only counterpart of :meth:`entries_between` for reports and
+        exports: rows come straight from the cursor without building
+        :class:`~src.models.FuelEntry` instances, and ``start``/``end`` may
+        be ``None`` for an open range. Tuples follow the order of
+        ``columns``; see :mod:`~src.services.projection`.
+        """
+        with self._session() as session:
+            return projection.entry_rows(
+                session.connection(), columns, start, end, vehicle_ids
+            )
+
+    def to_frame(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        vehicle_ids: Iterable[int] | None = None,
+    ) -> pd.DataFrame:
+        """คืนรายการเติมน้ำมันเป็น DataFrame แบบมีชนิดข้อมูลสำหรับรายงาน
+
+        One pass over the entries in ``[start, end)`` (either bound may be
+        ``None``), with vehicle name and type, the Thai fuel-type label and
+        ``distance`` already attached; see :mod:`~src.services.columnar`.
+        """
+        with self._session() as session:
+            return columnar.to_frame(session.connection(), start, end, vehicle_ids)
+
+    def to_arrow(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        vehicle_ids: Iterable[int] | None = None,
+    ) -> Any:
+        """Return :meth:`to_frame`'s columns as a ``pyarrow.Table``.
+
+        Requires the optional ``pyarrow`` package (``fueltracker[arrow]``).
+        """
+        with self._session() as session:
+            return columnar.to_arrow(session.connection(), start, end, vehicle_ids)
+
     def list_entries_for_month(
         self, year: int, month: int, vehicle_id: int | None = None
     ) -> List[FuelEntry]:
         """Return entries within the given month optionally filtered by vehicle."""
-        with Session(self.engine) as session:
-            stmt = select(FuelEntry).where(
-                cast(Any, FuelEntry.entry_date).between(
-                    f"{year}-{month:02d}-01", f"{year}-{month:02d}-31"
-                )
-            )
-            if vehicle_id is not None:
-                stmt = stmt.where(FuelEntry.vehicle_id == vehicle_id)
-            return list(session.exec(stmt))
+        return self.entries_between(
+            *month_range(year, month),
+            vehicle_ids=None if vehicle_id is None else [vehicle_id],
+        )
 
     def monthly_totals(self) -> list[tuple[str, float, float, float]]:
-        """Return aggregated totals grouped by month."""
-        month = func.strftime("%Y-%m", FuelEntry.entry_date)
-        with Session(self.engine) as session:
+        """Return aggregated totals grouped by month.
+
+        Only entries with both ``odo_after`` and ``liters`` are counted.
+        """
+        with self._session() as session:
             stmt = (
                 select(
-                    month.label("month"),
-                    func.sum(cast(Any, FuelEntry.odo_after) - FuelEntry.odo_before),
-                    func.sum(FuelEntry.liters),
-                    func.sum(FuelEntry.amount_spent),
+                    MonthlyAgg.month,
+                    func.sum(MonthlyAgg.full_distance),
+                    func.sum(MonthlyAgg.full_liters),
+                    func.sum(MonthlyAgg.full_amount),
                 )
-                .where(
-                    cast(Any, FuelEntry.odo_after).is_not(None),
-                    cast(Any, FuelEntry.liters).is_not(None),
-                )
-                .group_by(month)
-                .order_by(month)
+                .group_by(MonthlyAgg.month)
+                .having(func.sum(MonthlyAgg.full_fills) > 0)
+                .order_by(MonthlyAgg.month)
             )
             res = []
             for m, d, liters_val, amount_val in session.exec(stmt):
@@ -422,7 +1023,7 @@ class StorageService:
 
     def liters_by_fuel_type(self) -> dict[str | None, float]:
         """Return total liters grouped by fuel type."""
-        with Session(self.engine) as session:
+        with self._session() as session:
             stmt = (
                 select(FuelEntry.fuel_type, func.sum(FuelEntry.liters))
                 .where(cast(Any, FuelEntry.liters).is_not(None))
@@ -435,73 +1036,110 @@ class StorageService:
 
     def get_entry(self, entry_id: int) -> Optional[FuelEntry]:
         """ดึงข้อมูลการเติมน้ำมันตามรหัส"""
-        with Session(self.engine) as session:
+        with self._session() as session:
             return session.get(FuelEntry, entry_id)
 
     def update_entry(self, entry: FuelEntry) -> None:
-        """บันทึกการแก้ไขข้อมูลการเติมน้ำมัน"""
-        validate_entry(entry)
-        with Session(self.engine) as session:
-            session.add(entry)
-            session.commit()
-            # FIX: prevent hang when entry.id is None
-            session.flush()
+        """บันทึกการแก้ไขข้อมูลการเติมน้ำมัน
+
+        The odometer chain is rebuilt from the earlier of the old and new
+        date, for the old and the new vehicle. An entry moved to another
+        date or vehicle takes its ``odo_after`` from its new successor.
+        """
+        with self._session() as session:
+            since = {entry.vehicle_id: entry.entry_date}
             if entry.id is not None:
-                session.refresh(entry)
+                # Read the stored row, not the edited object being saved.
+                with session.no_autoflush:
+                    old = session.exec(
+                        sa_select(FuelEntry.vehicle_id, FuelEntry.entry_date).where(
+                            FuelEntry.id == entry.id
+                        )
+                    ).first()
+                if old is not None:
+                    vid, day = old
+                    since[vid] = min(since.get(vid, day), day)
+                    if (vid, day) != (entry.vehicle_id, entry.entry_date):
+                        entry.odo_after = None
+            validate_entry(entry)
+            session.add(entry)
+            for vid, day in since.items():
+                self._rechain(session, vid, day)
+            self._commit(session, entry)
 
     def delete_entry(self, entry_id: int) -> None:
-        """ลบข้อมูลการเติมน้ำมันออกจากฐานข้อมูล"""
-        with Session(self.engine) as session:
+        """ลบข้อมูลการเติมน้ำมันออกจากฐานข้อมูล
+
+        Deleting the latest entry of a vehicle reopens the entry before it
+        when that entry's ``odo_after`` came from the deleted one, as if the
+        deleted entry had never been added.
+        """
+        with self._session() as session:
             obj = session.get(FuelEntry, entry_id)
             if obj:
                 session.delete(obj)
-                session.commit()
+                self._rechain(session, obj.vehicle_id, obj.entry_date)
+                last = self._last_entry(session, obj.vehicle_id)
+                if (
+                    last is not None
+                    and (last.entry_date, last.id or 0) < (obj.entry_date, obj.id or 0)
+                    and last.odo_after == obj.odo_before
+                ):
+                    last.odo_after = None
+                    session.add(last)
+                self._commit(session)
+                self._maintenance_due = True
+
+    def _rechain(
+        self, session: Session, vehicle_id: int | None, since: date | None
+    ) -> list[tuple[int, float | None]]:
+        """Run :func:`odometer_chain.rebuild` in ``session``.
+
+        Pending changes are flushed first, and entries already loaded in the
+        session get the rebuilt ``odo_after`` so a later flush or refresh
+        does not see stale values.
+        """
+        session.flush()
+        changed = odometer_chain.rebuild(session.connection(), vehicle_id, since)
+        for entry_id, odo_after in changed:
+            loaded = session.identity_map.get(Session.identity_key(FuelEntry, entry_id))
+            if loaded is not None:
+                set_committed_value(loaded, "odo_after", odo_after)
+        return changed
 
     # ------------------------------------------------------------------
     # Maintenance helpers
     # ------------------------------------------------------------------
 
     def add_maintenance(self, task: Maintenance) -> None:
-        with Session(self.engine) as session:
+        with self._session() as session:
             session.add(task)
-            session.commit()
-            # FIX: prevent hang
-            session.flush()
-            if task.id is not None:
-                session.refresh(task)
+            self._commit(session, task)
 
     def list_maintenances(self, vehicle_id: int | None = None) -> List[Maintenance]:
-        with Session(self.engine) as session:
+        with self._session() as session:
             stmt = select(Maintenance)
             if vehicle_id is not None:
                 stmt = stmt.where(Maintenance.vehicle_id == vehicle_id)
             return list(session.exec(stmt))
 
     def get_maintenance(self, task_id: int) -> Maintenance | None:
-        with Session(self.engine) as session:
+        with self._session() as session:
             return session.get(Maintenance, task_id)
 
     def update_maintenance(self, task: Maintenance) -> None:
-        with Session(self.engine) as session:
+        with self._session() as session:
             session.add(task)
-            session.commit()
-            # FIX: prevent hang
-            session.flush()
-            if task.id is not None:
-                session.refresh(task)
+            self._commit(session, task)
 
     def mark_maintenance_done(self, task_id: int, done: bool = True) -> None:
-        with Session(self.engine) as session:
+        with self._session() as session:
             task = session.get(Maintenance, task_id)
             if task is None:
                 return
             task.is_done = done
             session.add(task)
-            session.commit()
-            # FIX: prevent hang
-            session.flush()
-            if task.id is not None:
-                session.refresh(task)
+            self._commit(session, task)
 
     def list_due_maintenances(
         self,
@@ -509,7 +1147,7 @@ class StorageService:
         odo: float | None = None,
         date_: datetime | None = None,
     ) -> List[Maintenance]:
-        with Session(self.engine) as session:
+        with self._session() as session:
             if odo is None and date_ is None:
                 return []
 
@@ -552,7 +1190,7 @@ class StorageService:
 
     def set_budget(self, vehicle_id: int, amount: float) -> None:
         """ตั้งงบประมาณรายเดือนของยานพาหนะ"""
-        with Session(self.engine) as session:
+        with self._session() as session:
             budget = session.exec(
                 select(Budget).where(Budget.vehicle_id == vehicle_id)
             ).first()
@@ -561,52 +1199,80 @@ class StorageService:
             else:
                 budget.amount = amount
             session.add(budget)
-            session.commit()
+            self._commit(session)
 
     def get_budget(self, vehicle_id: int) -> Optional[float]:
-        with Session(self.engine) as session:
+        with self._session() as session:
             budget = session.exec(
                 select(Budget.amount).where(Budget.vehicle_id == vehicle_id)
             ).first()
             return float(budget) if budget is not None else None
 
     def get_total_spent(self, vehicle_id: int, year: int, month: int) -> float:
-        with Session(self.engine) as session:
-            stmt = select(func.sum(FuelEntry.amount_spent)).where(
-                FuelEntry.vehicle_id == vehicle_id,
-                cast(Any, FuelEntry.entry_date).between(
-                    f"{year}-{month:02d}-01", f"{year}-{month:02d}-31"
-                ),
-                cast(Any, FuelEntry.amount_spent).is_not(None),
+        with self._session() as session:
+            stmt = select(func.sum(MonthlyAgg.amount)).where(
+                MonthlyAgg.vehicle_id == vehicle_id,
+                MonthlyAgg.month == f"{year}-{month:02d}",
             )
             total = session.exec(stmt).first()
             return float(total or 0.0)
 
+    def budget_status(
+        self, year: int, month: int, vehicle_ids: Iterable[int] | None = None
+    ) -> list[BudgetStatus]:
+        """คืนงบประมาณ ยอดใช้จ่าย และงบคงเหลือของเดือนสำหรับทุกคัน
+
+        The month's ``monthly_agg`` rows (kept current from ``fuelentry`` by
+        triggers, one per fuel type) are summed per vehicle in a correlated
+        subquery on the ``(vehicle_id, month)`` key, so joining ``budget``
+        needs no grouping. The result is a row per vehicle, ordered by id and
+        limited to ``vehicle_ids`` when given, followed by a fleet total row
+        with ``vehicle_id=None``. The fleet budget is the sum of the budgets
+        that are set, and its spending counts every listed vehicle.
+        """
+        vehicle_id = cast(Any, Vehicle.id)
+        spent = (
+            sa_select(func.sum(MonthlyAgg.amount))
+            .where(
+                MonthlyAgg.vehicle_id == vehicle_id,
+                MonthlyAgg.month == f"{year}-{month:02d}",
+            )
+            .scalar_subquery()
+        )
+        stmt = (
+            sa_select(vehicle_id, Budget.amount, spent)
+            .outerjoin(Budget, Budget.vehicle_id == vehicle_id)
+            .order_by(vehicle_id)
+        )
+        if vehicle_ids is not None:
+            stmt = stmt.where(vehicle_id.in_(sorted(set(vehicle_ids))))
+        with self._session() as session:
+            rows = [
+                BudgetStatus.of(
+                    vid,
+                    None if budget is None else float(budget),
+                    float(amount or 0.0),
+                )
+                for vid, budget, amount in session.execute(stmt)
+            ]
+        budgets = [r.budget for r in rows if r.budget is not None]
+        fleet = BudgetStatus.of(
+            None, sum(budgets) if budgets else None, sum(r.spent for r in rows)
+        )
+        return [*rows, fleet]
+
     def vehicle_monthly_stats(
         self, vehicle_id: int, year: int, month: int
     ) -> tuple[float, float, float]:
         """Return total distance, liters and spending for a vehicle in a month."""
-        with Session(self.engine) as session:
-            month_range = (
-                f"{year}-{month:02d}-01",
-                f"{year}-{month:02d}-31",
-            )
-
+        with self._session() as session:
             stmt = select(
-                func.sum(
-                    case(
-                        (
-                            cast(Any, FuelEntry.odo_after).is_not(None),
-                            cast(Any, FuelEntry.odo_after) - FuelEntry.odo_before,
-                        ),
-                        else_=0,
-                    )
-                ),
-                func.sum(FuelEntry.liters),
-                func.sum(FuelEntry.amount_spent),
+                func.sum(MonthlyAgg.distance),
+                func.sum(MonthlyAgg.liters),
+                func.sum(MonthlyAgg.amount),
             ).where(
-                FuelEntry.vehicle_id == vehicle_id,
-                cast(Any, FuelEntry.entry_date).between(*month_range),
+                MonthlyAgg.vehicle_id == vehicle_id,
+                MonthlyAgg.month == f"{year}-{month:02d}",
             )
 
             dist, liters, spent = session.exec(stmt).one()
@@ -616,6 +1282,57 @@ class StorageService:
                 float(spent or 0.0),
             )
 
+    def rebuild_monthly_agg(self) -> None:
+        """คำนวณตาราง ``monthly_agg`` ใหม่ทั้งหมดจาก ``fuelentry``
+
+        The table is kept current by triggers; this is only needed after
+        editing the database with tools that bypass them.
+        """
+        with self._session() as session:
+            conn = session.connection()
+            monthly_agg.install(conn)
+            monthly_agg.rebuild(conn)
+            self._commit(session)
+
+    def rebuild_odometer_chain(
+        self, vehicle_id: int | None = None, since: date | None = None
+    ) -> int:
+        """เชื่อม ``odo_after`` ของรายการใหม่จาก ``odo_before`` ของรายการถัดไป
+
+        ``vehicle_id`` limits the rebuild to one vehicle and ``since`` to the
+        entries from the last one before that date on; see
+        :mod:`~src.services.odometer_chain`. Write methods already do this
+        for the entries they touch, so a full rebuild is only needed for
+        data written by older versions or other tools. Returns the number
+        of entries changed.
+        """
+        with self._session() as session:
+            changed = self._rechain(session, vehicle_id, since)
+            self._commit(session)
+        return len(changed)
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """ค้นหายานพาหนะและงานซ่อมบำรุงจากข้อความ
+
+        Every whitespace-separated term must appear in the name, license
+        plate, type or note; any part of a word matches, which also covers
+        Thai text. See :mod:`~src.services.search_index` for the ranking.
+        """
+        with self._session() as session:
+            return search_index.search(session.connection(), query, limit)
+
+    def rebuild_search_index(self) -> None:
+        """สร้างดัชนีค้นหา FTS5 ใหม่จากตาราง ``vehicle`` และ ``maintenance``
+
+        Triggers keep the index current; this is only needed after editing
+        the database with tools that bypass them.
+        """
+        with self._session() as session:
+            conn = session.connection()
+            if search_index.install(conn):
+                search_index.rebuild(conn)
+            self._commit(session)
+
     # ------------------------------------------------------------------
     # Utilities
     # ------------------------------------------------------------------
@@ -627,9 +1344,18 @@ class StorageService:
         encrypted: bool = False,
         compress: bool = False,
         max_backups: int = 30,
+        pages: int = BACKUP_PAGES,
+        pause: float = BACKUP_PAUSE,
+        progress: Callable[[int, int], None] | None = None,
+        cancel: threading.Event | None = None,
     ) -> Path:
         """Create a timestamped backup of the current database.
 
+        The SQLite online backup API copies ``pages`` pages per step and
+        pauses ``pause`` seconds between steps, so writers on other
+        connections are only locked out for one step at a time. A write from
+        another connection makes SQLite restart the copy.
+
         Parameters
         ----------
         now:
@@ -644,6 +1370,15 @@ class StorageService:
             Compress the resulting backup using ``gzip`` and add a ``.gz`` suffix.
         max_backups:
             Maximum number of backup files to keep before old ones are deleted.
+        pages, pause:
+            Pages per step and seconds between steps; ``pages=-1`` copies
+            everything in one step.
+        progress:
+            Called after every step with the pages copied so far and the
+            total.
+        cancel:
+            Checked after every step; once set the partial file is removed
+            and :class:`BackupCancelled` is raised.
 
         Returns
         -------
@@ -660,25 +1395,18 @@ class StorageService:
         backup_dir.mkdir(parents=True, exist_ok=True)
 
         backup_path = backup_dir / now.strftime("%y-%m-%d_%H%M.db")
-
-        with (
-            closing(
-                cast(sqlcipher.Connection, self.engine.raw_connection())
-            ) as source_conn,
-            closing(sqlcipher.connect(str(backup_path))) as dest_conn,
-        ):
-            if encrypted and _SQLCIPHER_AVAILABLE and self._password:
-                dest_conn.execute(f"PRAGMA key='{self._password}';")
-            source_conn.backup(dest_conn)
-
         if compress:
-            gz_path = backup_path.with_suffix(backup_path.suffix + ".gz")
-            with open(backup_path, "rb") as fh, gzip.open(gz_path, "wb") as out:
-                shutil.copyfileobj(fh, out)
-            backup_path.unlink()
-            backup_path = gz_path
-
-        backups = [p for p in backup_dir.glob("*.db*") if p != self._db_path]
+            backup_path = backup_path.with_suffix(backup_path.suffix + ".gz")
+        self._copy_to(backup_path, encrypted, compress, pages, pause, progress, cancel)
+
+        # Skip the live database, its ``-wal``/``-shm`` files and the copy
+        # taken before the fixed-point conversion.
+        backups = [
+            p
+            for p in backup_dir.glob("*.db*")
+            if not p.name.startswith(self._db_path.name)
+            and PRE_FIXED_POINT_SUFFIX not in p.name
+        ]
         backups.sort()
         if len(backups) > max_backups:
             for old in backups[: len(backups) - max_backups]:
@@ -686,6 +1414,60 @@ class StorageService:
 
         return backup_path
 
+    def _copy_to(
+        self,
+        backup_path: Path,
+        encrypted: bool = False,
+        compress: bool = False,
+        pages: int = BACKUP_PAGES,
+        pause: float = BACKUP_PAUSE,
+        progress: Callable[[int, int], None] | None = None,
+        cancel: threading.Event | None = None,
+    ) -> None:
+        """Copy the database to ``backup_path`` with the online backup API.
+
+        The copy is written to a ``.tmp`` file next to ``backup_path`` and
+        moved into place once complete, so a failed or cancelled copy never
+        replaces an earlier backup of the same name. See :meth:`auto_backup`
+        for the parameters.
+        """
+        tmp = backup_path.with_name(backup_path.name.split(".")[0] + ".tmp")
+        gz_tmp = tmp.with_suffix(".gz.tmp")
+
+        def step(_status: int, remaining: int, total: int) -> None:
+            if progress is not None:
+                progress(total - remaining, total)
+            if not remaining:
+                return
+            # ``Event.wait`` returns as soon as ``cancel`` is set.
+            if cancel is not None and cancel.wait(pause):
+                raise BackupCancelled(str(backup_path))
+            if cancel is None and pause > 0:
+                time.sleep(pause)
+
+        try:
+            with (
+                closing(
+                    cast(sqlcipher.Connection, self.engine.raw_connection())
+                ) as source_conn,
+                closing(sqlcipher.connect(str(tmp))) as dest_conn,
+            ):
+                if encrypted and _SQLCIPHER_AVAILABLE and self._password:
+                    # Reusing the source's raw key and salt avoids a KDF run.
+                    dest_conn.execute(
+                        self._key_sql or f"PRAGMA key='{self._password}';"
+                    )
+                source_conn.backup(dest_conn, pages=pages, progress=step)
+            if compress:
+                with open(tmp, "rb") as fh, gzip.open(gz_tmp, "wb") as out:
+                    shutil.copyfileobj(fh, out)
+                os.replace(gz_tmp, backup_path)
+            else:
+                os.replace(tmp, backup_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+            gz_tmp.unlink(missing_ok=True)
+
     def sync_to_cloud(self, backup_dir: Path, cloud_dir: Path) -> None:
         """คัดลอกโฟลเดอร์สำรองขึ้นพื้นที่ซิงก์คลาวด์"""
         cloud_dir.mkdir(parents=True, exist_ok=True)
@@ -697,6 +1479,99 @@ class StorageService:
             shutil.copy2(file, cloud_dir / file.name)
 
     def vacuum(self) -> None:
-        """ลดขนาดฐานข้อมูลด้วยคำสั่ง ``VACUUM``."""
+        """ลดขนาดฐานข้อมูลด้วยคำสั่ง ``VACUUM``.
+
+        This rewrites the whole file; :meth:`incremental_vacuum` is the
+        cheap variant used during normal operation.
+        """
         with self.engine.connect() as conn:
             conn.exec_driver_sql("VACUUM")
+
+    @property
+    def maintenance_due(self) -> bool:
+        """``True`` after ``vacuum_threshold`` new entries or any deletion."""
+        return self._maintenance_due
+
+    def vacuum_stats(self) -> dict[str, int]:
+        """Return page counts and what :meth:`incremental_vacuum` reclaimed."""
+        with self.engine.connect() as conn:
+            auto_vacuum = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+            page_count = conn.exec_driver_sql("PRAGMA page_count").scalar()
+            freelist = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        return {
+            "auto_vacuum": int(auto_vacuum or 0),
+            "page_count": int(page_count or 0),
+            "freelist_count": int(freelist or 0),
+            "reclaimed_pages": self._reclaimed_pages,
+            "incremental_runs": self._incremental_runs,
+        }
+
+    def incremental_vacuum(
+        self,
+        pages_per_step: int = 256,
+        max_steps: int = 16,
+        min_free_ratio: float = 0.05,
+    ) -> int:
+        """คืนพื้นที่ว่างในไฟล์ทีละส่วนโดยไม่เขียนฐานข้อมูลใหม่ทั้งไฟล์
+
+        Meant to run off the GUI thread while the application is idle.
+        Nothing happens unless free pages make up at least
+        ``min_free_ratio`` of the file. Each step releases up to
+        ``pages_per_step`` pages in its own short write, so other writers
+        can get in between; at most ``max_steps`` steps run per call.
+
+        Files older than migration 0011 need that migration first; on
+        databases without incremental auto-vacuum nothing is reclaimed.
+
+        Returns the number of pages reclaimed.
+        """
+        if getattr(self._local, "uow", None) is not None:
+            return 0
+        self._maintenance_due = False
+        reclaimed = 0
+        with self.engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+                return 0
+        for step in range(max_steps):
+            with self.engine.connect() as conn:
+                free = conn.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+                pages = conn.exec_driver_sql("PRAGMA page_count").scalar() or 1
+                if free == 0 or (step == 0 and free / pages < min_free_ratio):
+                    break
+                # ``execute`` would step the pragma once and free a single
+                # page; ``executescript`` runs it to completion.
+                raw = cast(Any, conn.connection.driver_connection)
+                raw.executescript(f"PRAGMA incremental_vacuum({int(pages_per_step)});")
+                left = conn.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+            reclaimed += free - left
+            if left >= free:
+                break
+        if reclaimed:
+            self._incremental_runs += 1
+            self._reclaimed_pages += reclaimed
+            logger.info("incremental vacuum คืนพื้นที่ %d หน้า", reclaimed)
+        return reclaimed
+
+    @property
+    def profile(self) -> StorageProfile | None:
+        """The PRAGMA profile of this service, ``None`` for a given engine."""
+        return self._profile
+
+    def close(self) -> None:
+        """ปิดฐานข้อมูลเมื่อปิดโปรแกรม
+
+        Runs ``PRAGMA optimize`` so SQLite refreshes the statistics its query
+        planner needs, folds the WAL file back into the database and closes
+        the pooled connections and the change watcher. Engines passed to the
+        constructor are left open for their owner. Calls after the first do
+        nothing.
+        """
+        if self._profile is None or self._closed:
+            return
+        self._closed = True
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+            if self._profile.wal:
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._versions.close()
+        self.engine.dispose()
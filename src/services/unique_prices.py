@@ -0,0 +1,41 @@
+"""ทำให้ราคาน้ำมันหนึ่งวันต่อสถานีและชนิดน้ำมันไม่ซ้ำในฐานข้อมูลเดิม
+
+Price inserts rely on ``ON CONFLICT (date, station, fuel_type) DO NOTHING``,
+which SQLite only accepts when a ``UNIQUE`` index covers those columns.
+Migration ``0009`` makes ``ix_fuelprice_date_station_fuel_type`` unique, but
+``fueltracker migrate`` stamps databases whose tables already exist instead
+of upgrading them, and :func:`~src.services.storage_service._install_indexes`
+leaves an index with the right name alone. :func:`install` upgrades such
+files when they are opened.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+INDEX = "ix_fuelprice_date_station_fuel_type"
+
+
+def install(conn: Connection) -> bool:
+    """Replace a missing or non-unique ``fuelprice`` day index with a unique one.
+
+    Duplicate prices are removed first, keeping the first stored price of
+    each day like migration ``0009``. Returns ``True`` when the index was
+    (re)created.
+    """
+    insp = inspect(conn)
+    if not insp.has_table("fuelprice"):
+        return False
+    index = next((i for i in insp.get_indexes("fuelprice") if i["name"] == INDEX), None)
+    if index is not None and index["unique"]:
+        return False
+    conn.exec_driver_sql(
+        "DELETE FROM fuelprice WHERE id NOT IN ("
+        "SELECT MIN(id) FROM fuelprice GROUP BY date, station, fuel_type)"
+    )
+    conn.exec_driver_sql(f"DROP INDEX IF EXISTS {INDEX}")
+    conn.exec_driver_sql(
+        f"CREATE UNIQUE INDEX {INDEX} ON fuelprice (date, station, fuel_type)"
+    )
+    return True
@@ -0,0 +1,67 @@
+"""หน่วยงานเดียว (unit of work) สำหรับรวมหลายคำสั่งเขียนไว้ใน commit เดียว
+
+:meth:`StorageService.transaction` opens one :class:`~sqlmodel.Session` and
+marks it in ``session.info``. While it is active, storage methods called in
+the same thread reuse that session, and :func:`commit` only flushes, so the
+whole block is written with a single ``COMMIT``. Helpers that receive a
+session from their caller, such as those in
+:mod:`~src.services.oil_service`, call :func:`commit` too and therefore
+join the caller's unit of work.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from sqlmodel import Session
+
+#: ``session.info`` key holding the active :class:`UnitOfWork`.
+INFO_KEY = "ft_unit_of_work"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class UnitOfWork:
+    """State of one :meth:`StorageService.transaction` block."""
+
+    def __init__(self, session: Session, refresh: bool) -> None:
+        self.session = session
+        self.refresh = refresh
+        #: Objects written inside the block, refreshed after the commit.
+        self.written: list[Any] = []
+        #: Entries added inside the block, counted towards idle maintenance.
+        self.entries = 0
+        #: Callbacks from :meth:`StorageService.after_commit`, run once the
+        #: block has committed.
+        self.after_commit: list[Callable[[], None]] = []
+        session.info[INFO_KEY] = self
+
+
+def current(session: Session) -> UnitOfWork | None:
+    """Return the unit of work ``session`` belongs to, if any."""
+    uow = session.info.get(INFO_KEY)
+    return uow if isinstance(uow, UnitOfWork) else None
+
+
+def commit(session: Session) -> None:
+    """Commit ``session``, or only flush it inside a unit of work."""
+    if current(session) is not None:
+        session.flush()
+    else:
+        session.commit()
+
+
+def transactional(method: F) -> F:
+    """Run a method of an object with a ``storage`` attribute in one transaction.
+
+    Nested calls become savepoints, see :meth:`StorageService.transaction`.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        with self.storage.transaction():
+            return method(self, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
@@ -17,6 +17,7 @@ class Settings(BaseSettings):
     db_path: Path = Field(default_factory=lambda: data_dir() / "fuel.db")
     ft_theme: str = Field(default="system")
     ft_db_password: str | None = None
+    ft_db_profile: str = "balanced"
     ft_cloud_dir: Path | None = None
     appdata: Path | None = Field(default=None, validation_alias="APPDATA")
 
@@ -0,0 +1,211 @@
+"""โมเดลตารางรายการเติมน้ำมันที่โหลดทีละหน้า
+
+:class:`EntryTableModel` shows the newest entries first and asks
+:meth:`~src.services.storage_service.StorageService.page_entries` for the
+next page only when the view scrolls near the end (``canFetchMore`` /
+``fetchMore``). Pages are queried on an executor and handed back to the GUI
+thread through a queued signal, so a slow search never blocks painting.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Executor
+from datetime import date
+from typing import Any, NamedTuple
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    Qt,
+    Signal,
+)
+
+from ..services.storage_service import EntryFilter, StorageService
+
+logger = logging.getLogger(__name__)
+
+#: Rows requested per ``fetchMore``; a few screens of the fuel table.
+PAGE_SIZE = 200
+
+_Index = QModelIndex | QPersistentModelIndex
+
+#: The invalid index Qt uses for the table root.
+_ROOT = QModelIndex()
+
+
+class _Row(NamedTuple):
+    entry_date: date
+    id: int
+    vehicle_id: int
+    liters: float | None
+    amount_spent: float | None
+
+
+class EntryTableModel(QAbstractTableModel):
+    """ตารางรายการเติมน้ำมันแบบ lazy สำหรับ ``QTableView``
+
+    Only the fields shown are kept per loaded row and cell text is formatted
+    in :meth:`data`, i.e. for the rows the view actually paints. Changing
+    the filter bumps a generation counter, so pages still in flight for an
+    older search are dropped when they arrive.
+    """
+
+    HEADERS = ("วันที่", "ยานพาหนะ", "จำนวนลิตร", "ราคา/ลิตร", "ราคารวม")
+
+    #: ``(generation, rows, vehicle names or None)`` from the loader.
+    page_loaded = Signal(int, object, object)
+
+    def __init__(
+        self,
+        storage: StorageService,
+        executor: Executor | None = None,
+        page_size: int = PAGE_SIZE,
+        parent: Any = None,
+    ) -> None:
+        super().__init__(parent)
+        self._storage = storage
+        self._executor = executor
+        self._page_size = page_size
+        self._filter = EntryFilter()
+        self._rows: list[_Row] = []
+        self._names: dict[int, str] = {}
+        self._generation = 0
+        self._loading = False
+        self._exhausted = False
+        # Emitted from the executor thread, delivered on the GUI thread.
+        self.page_loaded.connect(self._append_page)
+
+    @property
+    def loading(self) -> bool:
+        return self._loading
+
+    def set_filter(self, filters: EntryFilter) -> None:
+        """Clear the table and start loading the first page for ``filters``."""
+        self.beginResetModel()
+        self._filter = filters
+        self._rows = []
+        self._generation += 1
+        self._loading = False
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def refresh(self) -> None:
+        """Reload from the first page, e.g. after an entry was changed."""
+        self.set_filter(self._filter)
+
+    # ------------------------------------------------------------------
+    # Paging
+    # ------------------------------------------------------------------
+
+    def canFetchMore(self, parent: _Index = _ROOT) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: _Index = _ROOT) -> None:
+        if parent.isValid() or self._loading or self._exhausted:
+            return
+        self._loading = True
+        after = (self._rows[-1].entry_date, self._rows[-1].id) if self._rows else None
+        args = (self._generation, self._filter, after)
+        if self._executor is None:
+            self._load(*args)
+            return
+        try:
+            self._executor.submit(self._load, *args)
+        except Exception:
+            # Qt calls this from C++; an exception escaping here (e.g. the
+            # executor already shut down on quit) would take the process down.
+            logger.exception("ส่งงานโหลดรายการไม่สำเร็จ")
+            self._append_page(self._generation, None, None)
+
+    def _load(
+        self,
+        generation: int,
+        filters: EntryFilter,
+        after: tuple[date, int] | None,
+    ) -> None:
+        """Query one page; runs on the executor thread."""
+        try:
+            entries = self._storage.page_entries(after, self._page_size, filters)
+            rows = [
+                _Row(e.entry_date, e.id, e.vehicle_id, e.liters, e.amount_spent)
+                for e in entries
+                if e.id is not None
+            ]
+            names = None
+            if after is None:
+                names = {
+                    v.id: v.name
+                    for v in self._storage.list_vehicles()
+                    if v.id is not None
+                }
+        except Exception:
+            logger.exception("โหลดรายการเติมน้ำมันไม่สำเร็จ")
+            rows, names = None, None
+        self.page_loaded.emit(generation, rows, names)
+
+    def _append_page(
+        self, generation: int, rows: list[_Row] | None, names: dict | None
+    ) -> None:
+        if generation != self._generation:
+            return
+        self._loading = False
+        if names is not None:
+            self._names = names
+        if rows is None or len(rows) < self._page_size:
+            # A failed page stops paging until the next refresh instead of
+            # letting the view retry it on every scroll.
+            self._exhausted = True
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    # ------------------------------------------------------------------
+    # QAbstractTableModel
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent: _Index = _ROOT) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: _Index = _ROOT) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index: _Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.ItemDataRole.UserRole:
+            return row.id
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        column = index.column()
+        if column == 0:
+            return row.entry_date.isoformat()
+        if column == 1:
+            return self._names.get(row.vehicle_id, str(row.vehicle_id))
+        if column == 2:
+            return "-" if row.liters is None else f"{row.liters:,.2f} L"
+        if column == 3:
+            if not row.liters or row.amount_spent is None:
+                return "-"
+            return f"{row.amount_spent / row.liters:,.2f}"
+        if column == 4:
+            return "-" if row.amount_spent is None else f"{row.amount_spent:,.2f}"
+        return None
@@ -2,7 +2,7 @@
 
 import sys
 from PySide6.QtWidgets import (QMainWindow, QGraphicsDropShadowEffect, QSizeGrip, 
-                               QButtonGroup, QApplication, QMessageBox, QTableWidgetItem)
+                               QButtonGroup, QApplication, QMessageBox)
 from PySide6.QtCore import Qt, QPoint, QEvent
 from PySide6.QtGui import QColor, QMouseEvent
 
@@ -95,19 +95,7 @@ class MainWindow(QMainWindow):
         self.ui.lblLitersVal.setText("125.50 L")
         self.ui.lblAvgVal.setText("฿ 35.85")
 
-        # อัปเดตตาราง
-        data = [
-            ("2023-10-01", "Toyota Camry", "40.5 L", "35.50", "1,437.75"),
-            ("2023-10-08", "Honda Civic", "35.0 L", "36.00", "1,260.00"),
-            ("2023-10-15", "Toyota Camry", "50.0 L", "35.20", "1,760.00"),
-        ]
-        self.ui.fuelTable.setRowCount(len(data))
-        for row, (d, v, l, p, t) in enumerate(data):
-            self.ui.fuelTable.setItem(row, 0, QTableWidgetItem(d))
-            self.ui.fuelTable.setItem(row, 1, QTableWidgetItem(v))
-            self.ui.fuelTable.setItem(row, 2, QTableWidgetItem(l))
-            self.ui.fuelTable.setItem(row, 3, QTableWidgetItem(p))
-            self.ui.fuelTable.setItem(row, 4, QTableWidgetItem(t))
+        # ตาราง fuelTable ใช้ EntryTableModel ที่ MainController ตั้งให้
 
     # --- Window State Management ---
     def changeEvent(self, event):
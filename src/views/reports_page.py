@@ -90,7 +90,9 @@ class WeeklyReportTab(QWidget):
 class _Worker(QThread):
     """Background worker to build figures and tables."""
 
-    data_ready = Signal(object, object, object, object, object, object, object, object)
+    data_ready = Signal(
+        object, object, object, object, object, object, object, object, object
+    )
 
     def __init__(
         self,
@@ -143,13 +145,23 @@ class _Worker(QThread):
         if not pie.empty:
             ax3.pie(pie, labels=pie.index.tolist())
 
+        budget = self._budget_remaining(today)
+
         self.data_ready.emit(
-            fig1, fig2, fig3, month_fig, week_fig, table, weekly, today
+            fig1, fig2, fig3, month_fig, week_fig, table, weekly, today, budget
         )
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    def _budget_remaining(self, month: date) -> float | None:
+        """Return the month's remaining budget of the vehicle or the fleet."""
+        vid = self._vehicle_id
+        status = self._service.storage.budget_status(
+            month.year, month.month, None if vid is None else [vid]
+        )
+        return status[-1].remaining
+
     @staticmethod
     def _weekly(df: pd.DataFrame) -> pd.DataFrame:
         if df.empty:
@@ -177,27 +189,19 @@ class _Worker(QThread):
         ax.set_ylabel("ลิตร")
         ax2 = ax.twinx()
         if vehicle_id is None:
-            vehicles = self._service.storage.list_vehicles()
-            for v in vehicles:
-                entries = self._service.storage.get_entries_by_vehicle(v.id)
-                data = []
-                for e in entries:
-                    if e.odo_after is None or e.liters is None:
-                        continue
-                    m = e.entry_date.strftime("%Y-%m")
-                    data.append(
-                        {
-                            "month": m,
-                            "dist": e.odo_after - e.odo_before,
-                            "liters": e.liters,
-                        }
-                    )
-                if not data:
+            storage = self._service.storage
+            # One full-history frame for every vehicle instead of a query each.
+            frame = storage.to_frame()
+            full = frame[frame["odo_after"].notna() & frame["liters"].notna()]
+            monthly = full.groupby(
+                [full["vehicle_id"], full["date"].dt.to_period("M").rename("month")]
+            )[["distance", "liters"]].sum()
+            for v in storage.list_vehicles():
+                if v.id not in monthly.index.get_level_values(0):
                     continue
-                vdf = pd.DataFrame(data)
-                summ = vdf.groupby("month")[["dist", "liters"]].sum()
-                summ["kml"] = summ["dist"] / summ["liters"]
-                ax2.plot(summ.index.astype(str), summ["kml"], marker="o", label=v.name)
+                summ = monthly.loc[cast(int, v.id)]
+                kml = summ["distance"] / summ["liters"]
+                ax2.plot(summ.index.astype(str), kml, marker="o", label=v.name)
         else:
             if not df.empty:
                 ax2.plot(
@@ -228,7 +232,7 @@ class ReportsPage(QWidget):
         self._service = service
         self._worker: _Worker | None = None
         self._current_vid: int | None = None
-        self._last_ts = getattr(self._service.storage, "last_modified", None)
+        self._last_ts = getattr(self._service.storage, "data_version", None)
 
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
         left = QWidget()
@@ -282,7 +286,7 @@ class ReportsPage(QWidget):
         self._timer.start()
 
     def _check_updates(self) -> None:
-        ts = getattr(self._service.storage, "last_modified", None)
+        ts = getattr(self._service.storage, "data_version", None)
         if ts != self._last_ts:
             self._last_ts = ts
             self.refresh()
@@ -311,6 +315,7 @@ class ReportsPage(QWidget):
         table: pd.DataFrame,
         weekly: pd.DataFrame,
         month: date,
+        budget_remain: float | None,
     ) -> None:
         for i in reversed(range(self.charts_layout.count())):
             item = self.charts_layout.takeAt(i)
@@ -331,7 +336,6 @@ class ReportsPage(QWidget):
         self._set_table(table)
         distance = float(table["distance"].fillna(0).sum()) if not table.empty else 0.0
         fills = len(table)
-        budget_remain = self._budget_remaining(month, self._current_vid)
         self.cards["distance"].set_value(f"{distance:.0f} km")
         self.cards["fills"].set_value(str(fills))
         if budget_remain is None:
@@ -350,26 +354,3 @@ class ReportsPage(QWidget):
             for c in range(df.shape[1]):
                 model.setItem(r, c, QStandardItem(str(df.iat[r, c])))
         self.table_view.setModel(model)
-
-    def _budget_remaining(self, month: date, vid: int | None) -> float | None:
-        if vid is None:
-            total_budget = 0.0
-            has_budget = False
-            for v in self._service.storage.list_vehicles():
-                b = self._service.storage.get_budget(v.id)
-                if b is not None:
-                    total_budget += b
-                    has_budget = True
-            if not has_budget:
-                return None
-            spent = 0.0
-            for v in self._service.storage.list_vehicles():
-                spent += self._service.storage.get_total_spent(
-                    v.id, month.year, month.month
-                )
-            return total_budget - spent
-        budget = self._service.storage.get_budget(vid)
-        if budget is None:
-            return None
-        spent = self._service.storage.get_total_spent(vid, month.year, month.month)
-        return budget - spent
@@ -4,7 +4,7 @@ from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QCursor, QFont, QIcon
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QFrame, QStackedWidget, QSpacerItem, 
-                               QSizePolicy, QTableWidget, QHeaderView, QAbstractItemView)
+                               QSizePolicy, QTableView, QHeaderView, QAbstractItemView)
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -274,9 +274,8 @@ class Ui_MainWindow(object):
         self.homeLayout.addWidget(self.tableHeaderFrame)
 
         # Fuel Table
-        self.fuelTable = QTableWidget(self.pageHome)
-        self.fuelTable.setColumnCount(5)
-        self.fuelTable.setHorizontalHeaderLabels(["วันที่", "ยานพาหนะ", "จำนวนลิตร", "ราคา/ลิตร", "ราคารวม"])
+        # QTableView: MainController attaches the paged EntryTableModel
+        self.fuelTable = QTableView(self.pageHome)
         self.fuelTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.fuelTable.verticalHeader().setVisible(False)
         self.fuelTable.setAlternatingRowColors(True)
@@ -284,7 +283,7 @@ class Ui_MainWindow(object):
         self.fuelTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.fuelTable.setShowGrid(False) 
         self.fuelTable.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #0b1220;
                 border-radius: 12px;
                 color: #e2e8f0;
@@ -302,8 +301,8 @@ class Ui_MainWindow(object):
                 font-size: 12px;
                 letter-spacing: 0.5px;
             }
-            QTableWidget::item { padding: 10px; border-bottom: 1px solid #1f2937; }
-            QTableWidget::item:selected { background-color: #2563eb; color: white; }
+            QTableView::item { padding: 10px; border-bottom: 1px solid #1f2937; }
+            QTableView::item:selected { background-color: #2563eb; color: white; }
             QScrollBar:vertical { background: #0f172a; width: 10px; margin: 0px; border-radius: 5px; }
             QScrollBar::handle:vertical { background: #334155; border-radius: 5px; min-height: 20px; }
         """)
@@ -9,12 +9,14 @@ import pytest
 import warnings
 from sqlmodel import SQLModel, Session, create_engine
 from contextlib import contextmanager
+from sqlalchemy import event
 from sqlalchemy.pool import StaticPool
 from alembic.config import Config
 from alembic import command
 
 try:
     from PySide6 import QtWidgets, QtGui
+    from PySide6.QtCore import QEvent, QThreadPool
     from PySide6.QtWidgets import QApplication
 
     # Import an extra Qt class to ensure the real Qt libraries are present
@@ -99,7 +101,7 @@ sys.path.insert(0, str(ROOT / "src"))
 
 # Disable global hotkey backend for the entire test session **before** any
 # application modules that might load the ``keyboard`` package are imported.
-import src.hotkey as _hotkey  # noqa: E402
+import src.hotkey as _hotkey
 
 _hotkey.keyboard = None
 
@@ -123,9 +125,10 @@ def pytest_configure(config):
     _ = ue.collect_unraisable  # avoid vulture false positive
 
 
-from src.services import StorageService  # noqa: E402
+from src.models import FuelEntry, Vehicle
+from src.services import StorageService
 try:
-    from src.controllers.main_controller import MainController  # noqa: E402
+    from src.controllers.main_controller import MainController
 except Exception:
     MainController = None
 
@@ -142,6 +145,86 @@ def in_memory_storage():
     return storage
 
 
+@pytest.fixture
+def add_vehicle():
+    """Return a helper adding a vehicle to a storage and returning its id."""
+
+    def add(
+        storage: StorageService,
+        name: str = "v",
+        vehicle_type: str = "car",
+        license_plate: str | None = None,
+    ) -> int:
+        vehicle = Vehicle(
+            name=name,
+            vehicle_type=vehicle_type,
+            license_plate=name if license_plate is None else license_plate,
+            tank_capacity_liters=1,
+        )
+        storage.add_vehicle(vehicle)
+        assert vehicle.id is not None
+        return vehicle.id
+
+    return add
+
+
+@pytest.fixture
+def seed(add_vehicle):
+    """Return a helper adding vehicles, then one fuel entry per dict.
+
+    ``vehicles`` holds names or ``(name, vehicle_type)`` pairs; ``defaults``
+    fill the entry fields a dict leaves out.
+    """
+
+    def seed(storage: StorageService, vehicles=("v",), entries=(), **defaults):
+        for vehicle in vehicles:
+            add_vehicle(storage, *((vehicle,) if isinstance(vehicle, str) else vehicle))
+        for entry in entries:
+            storage.add_entry(FuelEntry(**{**defaults, **entry}))
+
+    return seed
+
+
+@pytest.fixture
+def query_plans():
+    """Return a helper mapping each query a call runs to its SQLite plan."""
+
+    def plans(storage: StorageService, call) -> dict[str, str]:
+        captured: list[tuple[str, tuple]] = []
+
+        def capture(_conn, _cursor, statement, parameters, _context, _many) -> None:
+            if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "WITH")):
+                captured.append((statement, parameters))
+
+        event.listen(storage.engine, "before_cursor_execute", capture)
+        try:
+            call()
+        finally:
+            event.remove(storage.engine, "before_cursor_execute", capture)
+        result = {}
+        with storage.engine.connect() as conn:
+            for statement, parameters in captured:
+                rows = conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+                result[statement] = " | ".join(row[-1] for row in rows)
+        return result
+
+    return plans
+
+
+@pytest.fixture
+def plan_for():
+    """Return a helper picking the plan of the query containing ``fragments``."""
+
+    def pick(plans: dict[str, str], *fragments: str) -> str:
+        matches = [p for sql, p in plans.items() if all(f in sql for f in fragments)]
+        assert matches, f"no query containing {fragments} in {list(plans)}"
+        return matches[0]
+
+    return pick
+
+
 @pytest.fixture(scope="session")
 def migrated_db_session(worker_id: str):
     """Return a context manager yielding sessions on a migrated in-memory database."""
@@ -209,3 +292,10 @@ def main_controller(qapp, migrated_db_session, monkeypatch):
     # ADDED: Ensure the window is closed after each test to trigger proper cleanup
     ctrl.window.close()
     ctrl.cleanup()
+    # Delete the controller on this thread once its jobs are done; a job
+    # dropping the last reference would destroy it on a worker thread.
+    QThreadPool.globalInstance().waitForDone()
+    ctrl.executor.shutdown(wait=True)
+    ctrl.window.deleteLater()
+    ctrl.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
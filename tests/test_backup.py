@@ -4,16 +4,18 @@ from pathlib import Path
 from typing import Any
 import gzip
 import sqlite3
+import threading
 import time
 
 import pytest
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import QEvent, QThreadPool, QTimer
+from PySide6.QtWidgets import QApplication
 from sqlmodel import SQLModel, create_engine
 from sqlalchemy.pool import StaticPool
 
 from src.services import StorageService
 from src.controllers.main_controller import MainController
-from src.services.storage_service import _SQLCIPHER_AVAILABLE
+from src.services.storage_service import _SQLCIPHER_AVAILABLE, BackupCancelled
 from src.models import Vehicle
 
 
@@ -133,8 +135,9 @@ def test_auto_backup_removes_old_files_when_over_quota(tmp_path):
         max_backups=max_backups,
     )
 
+    # ``fuel.db-wal``/``fuel.db-shm`` belong to the live database.
     backups = sorted(
-        p.name for p in tmp_path.glob("*.db*") if p.name != db.name
+        p.name for p in tmp_path.glob("*.db*") if not p.name.startswith(db.name)
     )
     assert len(backups) == max_backups
     assert "24-01-01_0000.db" not in backups
@@ -142,6 +145,17 @@ def test_auto_backup_removes_old_files_when_over_quota(tmp_path):
     assert "24-01-01_0002.db" not in backups
 
 
+def _dispose(ctrl: MainController) -> None:
+    """Stop a controller's jobs and delete it before the next test."""
+    ctrl.window.close()
+    ctrl.cleanup()
+    QThreadPool.globalInstance().waitForDone()
+    ctrl.executor.shutdown(wait=True)
+    ctrl.window.deleteLater()
+    ctrl.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+
 def test_daily_backup_timer(qapp, tmp_path, monkeypatch):
     engine = create_engine(
         "sqlite:///:memory:",
@@ -166,20 +180,24 @@ def test_daily_backup_timer(qapp, tmp_path, monkeypatch):
 
     count = {"n": 0}
 
-    def fake_backup() -> Path:
+    def fake_backup(**_kwargs: Any) -> Path:
         count["n"] += 1
         return tmp_path / f"b{count['n']}.db"
 
     monkeypatch.setattr(storage, "auto_backup", fake_backup)
 
-    MainController()
+    ctrl = MainController()
+    # The backup runs on the thread pool.
+    QThreadPool.globalInstance().waitForDone()
 
     assert count["n"] == 1
     assert calls["ms"] == 86_400_000
 
     # simulate timer trigger
     calls["cb"]()
+    QThreadPool.globalInstance().waitForDone()
     assert count["n"] == 2
+    _dispose(ctrl)
 
 
 def test_daily_backup_handles_error(qapp, monkeypatch):
@@ -204,18 +222,182 @@ def test_daily_backup_handles_error(qapp, monkeypatch):
 
     monkeypatch.setattr(QTimer, "singleShot", fake_single_shot)
 
-    def fail_backup() -> Path:
+    def fail_backup(**_kwargs: Any) -> Path:
         raise sqlite3.DatabaseError("fail")
 
     monkeypatch.setattr(storage, "auto_backup", fail_backup)
     sync_calls: list[tuple[Path, Path]] = []
     monkeypatch.setattr(storage, "sync_to_cloud", lambda *a: sync_calls.append(a))
 
-    MainController()
+    ctrl = MainController()
+    QThreadPool.globalInstance().waitForDone()
 
     assert calls["ms"] == 86_400_000
     assert not sync_calls
 
     # simulate timer trigger; should not raise
     calls["cb"]()
+    QThreadPool.globalInstance().waitForDone()
+    assert not sync_calls
+    _dispose(ctrl)
+
+
+def _filled_storage(db: Path) -> StorageService:
+    storage = StorageService(db_path=db)
+    for i in range(200):
+        storage.add_vehicle(
+            Vehicle(
+                name="v" * 200,
+                vehicle_type="t",
+                license_plate=str(i),
+                tank_capacity_liters=1,
+            )
+        )
+    return storage
+
+
+def test_backup_copies_in_steps_with_progress(tmp_path):
+    storage = _filled_storage(tmp_path / "fuel.db")
+    steps: list[tuple[int, int]] = []
+
+    backup = storage.auto_backup(
+        backup_dir=tmp_path, pages=2, pause=0, progress=lambda *a: steps.append(a)
+    )
+
+    total = steps[-1][1]
+    assert len(steps) == -(-total // 2) > 1
+    assert steps[-1] == (total, total)
+    assert [c for c, _ in steps] == sorted(c for c, _ in steps)
+    with sqlite3.connect(backup) as conn:
+        assert conn.execute("SELECT count(*) FROM vehicle").fetchone() == (200,)
+
+
+def test_cancelled_backup_leaves_no_file(tmp_path):
+    storage = _filled_storage(tmp_path / "fuel.db")
+    cancel = threading.Event()
+
+    with pytest.raises(BackupCancelled):
+        storage.auto_backup(
+            now=datetime(2024, 1, 1, 0, 0),
+            backup_dir=tmp_path,
+            pages=1,
+            # A long pause: cancelling must not wait for it.
+            pause=60,
+            progress=lambda *_: cancel.set(),
+            cancel=cancel,
+        )
+    assert not (tmp_path / "24-01-01_0000.db").exists()
+
+
+def test_cancelled_backup_keeps_earlier_backup_of_same_minute(tmp_path):
+    storage = _filled_storage(tmp_path / "fuel.db")
+    now = datetime(2024, 1, 1, 0, 0)
+    good = storage.auto_backup(now=now, backup_dir=tmp_path, pages=-1)
+    cancel = threading.Event()
+
+    with pytest.raises(BackupCancelled):
+        storage.auto_backup(
+            now=now,
+            backup_dir=tmp_path,
+            pages=1,
+            pause=60,
+            progress=lambda *_: cancel.set(),
+            cancel=cancel,
+        )
+    with sqlite3.connect(good) as conn:
+        assert conn.execute("SELECT count(*) FROM vehicle").fetchone() == (200,)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_cleanup_cancels_running_backup(main_controller, monkeypatch, tmp_path):
+    ctrl = main_controller
+    started = threading.Event()
+    calls: list[bool] = []
+
+    def backup(progress, cancel, **_kwargs: Any) -> Path:
+        calls.append(started.is_set())
+        if started.is_set():
+            # The backup made at quit.
+            return tmp_path / "quit.db"
+        progress(1, 10)
+        started.set()
+        cancel.wait(60)
+        raise BackupCancelled("b.db")
+
+    QThreadPool.globalInstance().waitForDone()
+    monkeypatch.setattr(ctrl.storage, "auto_backup", backup)
+    ctrl._schedule_daily_backup()
+    assert started.wait(5)
+
+    begin = time.monotonic()
+    ctrl.cleanup()
+    assert time.monotonic() - begin < 5
+    assert ctrl._backup_done.is_set()
+    # The cancelled copy never completed, so quitting backs up once more.
+    assert calls == [False, True]
+
+
+@pytest.mark.parametrize("changed", [True, False])
+def test_cleanup_backs_up_changes_and_syncs(
+    main_controller, monkeypatch, tmp_path, changed
+):
+    ctrl = main_controller
+    QThreadPool.globalInstance().waitForDone()
+    calls: list[Path] = []
+    monkeypatch.setattr(
+        ctrl.storage, "auto_backup", lambda **_kw: tmp_path / "backups" / "b.db"
+    )
+    monkeypatch.setattr(ctrl.storage, "sync_to_cloud", lambda *a: calls.extend(a))
+    ctrl.sync_enabled, ctrl.cloud_path = True, tmp_path / "cloud"
+    ctrl._backup_version = ctrl.storage.data_version
+    if changed:
+        ctrl.storage.add_vehicle(
+            Vehicle(
+                name="v", vehicle_type="t", license_plate="q", tank_capacity_liters=1
+            )
+        )
+
+    ctrl.cleanup()
+
+    assert calls == ([tmp_path / "backups", tmp_path / "cloud"] if changed else [])
+
+
+def test_cleanup_runs_once(main_controller, monkeypatch, tmp_path):
+    ctrl = main_controller
+    QThreadPool.globalInstance().waitForDone()
+    backups: list[Path] = []
+    closes: list[bool] = []
+    monkeypatch.setattr(
+        ctrl.storage, "auto_backup", lambda **_kw: backups.append(tmp_path) or tmp_path
+    )
+    monkeypatch.setattr(ctrl.storage, "close", lambda: closes.append(True))
+    ctrl._backup_version = None
+
+    ctrl.cleanup()
+    # ``__del__`` calls it again after ``aboutToQuit``.
+    ctrl.cleanup()
+
+    assert len(backups) == 1
+    assert closes == [True]
+
+
+def test_backup_at_quit_is_cancelled_after_the_time_limit(main_controller, monkeypatch):
+    ctrl = main_controller
+    QThreadPool.globalInstance().waitForDone()
+    monkeypatch.setattr("src.controllers.main_controller.BACKUP_QUIT_SECONDS", 0)
+    cancelled: list[bool] = []
+
+    def backup(progress, cancel, **_kwargs: Any) -> Path:
+        progress(1, 10)
+        cancelled.append(cancel.is_set())
+        raise BackupCancelled("b.db")
+
+    monkeypatch.setattr(ctrl.storage, "auto_backup", backup)
+    sync_calls: list[tuple] = []
+    monkeypatch.setattr(ctrl.storage, "sync_to_cloud", lambda *a: sync_calls.append(a))
+    ctrl.sync_enabled, ctrl.cloud_path = True, Path("cloud")
+
+    ctrl.cleanup()
+
+    assert cancelled == [True]
     assert not sync_calls
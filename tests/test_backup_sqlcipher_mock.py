@@ -37,15 +37,22 @@ def test_auto_backup_with_mocked_sqlcipher(tmp_path, monkeypatch):
     from src.services import storage_service as ss
 
     importlib.reload(ss)
-
-    assert ss._SQLCIPHER_AVAILABLE is True
-
-    storage = ss.StorageService(db_path=tmp_path / "fuel.db", password="secret")
-    storage.add_vehicle(
-        Vehicle(name="v", vehicle_type="t", license_plate="x", tank_capacity_liters=1)
-    )
-
-    backup = storage.auto_backup(backup_dir=tmp_path, encrypted=True)
+    try:
+        assert ss._SQLCIPHER_AVAILABLE is True
+
+        storage = ss.StorageService(db_path=tmp_path / "fuel.db", password="secret")
+        storage.add_vehicle(
+            Vehicle(
+                name="v", vehicle_type="t", license_plate="x", tank_capacity_liters=1
+            )
+        )
+
+        backup = storage.auto_backup(backup_dir=tmp_path, encrypted=True)
+        storage.engine.dispose()
+    finally:
+        # Later tests must not keep using the fake driver.
+        monkeypatch.undo()
+        importlib.reload(ss)
 
     assert backup.exists()
     with open(backup, "rb") as fh:
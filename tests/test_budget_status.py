@@ -0,0 +1,84 @@
+from dataclasses import astuple
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def storage(in_memory_storage, seed):
+    seed(
+        in_memory_storage,
+        ("a", "b", "c"),
+        [
+            {"entry_date": date(2024, 5, 1), "vehicle_id": 1, "amount_spent": 300.0},
+            {"entry_date": date(2024, 5, 20), "vehicle_id": 1, "amount_spent": 450.0},
+            {"entry_date": date(2024, 5, 3), "vehicle_id": 2, "amount_spent": 250.0},
+            {"entry_date": date(2024, 5, 4), "vehicle_id": 3, "amount_spent": 80.0},
+            {"entry_date": date(2024, 6, 1), "vehicle_id": 1, "amount_spent": 999.0},
+        ],
+        odo_before=0,
+        liters=10,
+    )
+    in_memory_storage.set_budget(1, 1000.0)
+    in_memory_storage.set_budget(2, 200.0)
+    return in_memory_storage
+
+
+def test_rows_per_vehicle_and_fleet_total(storage) -> None:
+    # Compared as tuples: another test reloads storage_service, which
+    # replaces the BudgetStatus class the rows are built from.
+    rows = [astuple(r) for r in storage.budget_status(2024, 5)]
+    assert rows[:3] == [
+        (1, 1000.0, 750.0, 250.0, pytest.approx(75.0)),
+        (2, 200.0, 250.0, -50.0, pytest.approx(125.0)),
+        (3, None, 80.0, None, None),
+    ]
+    # Budgets that are set are summed; spending counts every vehicle.
+    assert rows[3] == (None, 1200.0, 1080.0, 120.0, pytest.approx(90.0))
+
+    only = storage.budget_status(2024, 5, [2])
+    assert [r.vehicle_id for r in only] == [2, None]
+    assert only[1].remaining == -50.0
+    assert storage.budget_status(2024, 5, [3])[-1].budget is None
+    assert storage.budget_status(2023, 1)[0].spent == 0.0
+    assert [astuple(r) for r in storage.budget_status(2024, 5, [])] == [
+        (None, None, 0.0, None, None)
+    ]
+
+
+def test_one_query_on_the_monthly_totals(storage, query_plans, plan_for) -> None:
+    plans = query_plans(storage, lambda: storage.budget_status(2024, 5))
+    assert len(plans) == 1
+    plan = plan_for(plans, "monthly_agg")
+    assert "sqlite_autoindex_monthly_agg_1 (vehicle_id=? AND month=?)" in plan
+    assert "ix_budget_vehicle_id (vehicle_id=?)" in plan
+    # Summed per vehicle before the budget join, not grouped after it.
+    assert "CORRELATED SCALAR SUBQUERY" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_fuel_types_of_one_month_add_up(in_memory_storage, seed) -> None:
+    storage = in_memory_storage
+    seed(
+        storage,
+        ("a", "b"),
+        [
+            {"fuel_type": "e20", "amount_spent": 300.0},
+            {"fuel_type": "diesel", "amount_spent": 200.0},
+            {"fuel_type": "e20", "amount_spent": 50.0},
+            {"fuel_type": None, "amount_spent": 25.0},
+        ],
+        entry_date=date(2024, 5, 1),
+        vehicle_id=1,
+        odo_before=0,
+        liters=10,
+    )
+    storage.set_budget(1, 1000.0)
+    storage.set_budget(2, 100.0)
+
+    rows = [astuple(r) for r in storage.budget_status(2024, 5)]
+    assert rows == [
+        (1, 1000.0, 575.0, 425.0, pytest.approx(57.5)),
+        (2, 100.0, 0.0, 100.0, 0.0),
+        (None, 1100.0, 575.0, 525.0, pytest.approx(575 / 11)),
+    ]
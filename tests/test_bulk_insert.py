@@ -0,0 +1,178 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.models import FuelEntry, FuelPrice, Vehicle
+from src.services import StorageService
+
+
+def _new_storage() -> StorageService:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    storage = StorageService(engine=engine)
+    for name in ("a", "b"):
+        storage.add_vehicle(
+            Vehicle(
+                name=name, vehicle_type="t", license_plate=name, tank_capacity_liters=1
+            )
+        )
+    with Session(engine) as s:
+        s.add(
+            FuelPrice(
+                date=date(2024, 1, 1),
+                station="ptt",
+                fuel_type="e20",
+                name_th="E20",
+                price=Decimal(40),
+            )
+        )
+        s.commit()
+    return storage
+
+
+def _rows() -> list[dict]:
+    return [
+        {
+            "entry_date": date(2024, 1, 3),
+            "vehicle_id": 1,
+            "odo_before": 100,
+            "amount_spent": 80,
+        },
+        {
+            "entry_date": date(2024, 1, 1),
+            "vehicle_id": 1,
+            "odo_before": 0,
+            "amount_spent": 40,
+        },
+        {
+            "entry_date": date(2024, 1, 2),
+            "vehicle_id": 2,
+            "odo_before": 50,
+            "odo_after": 90,
+        },
+        {
+            "entry_date": date(2024, 1, 5),
+            "vehicle_id": 1,
+            "odo_before": 250,
+            "liters": 5,
+            "amount_spent": 200,
+        },
+        {"entry_date": date(2024, 1, 4), "vehicle_id": 2, "odo_before": 90},
+    ]
+
+
+def _dump(storage: StorageService) -> list[tuple]:
+    return sorted(
+        (
+            e.vehicle_id,
+            e.entry_date,
+            e.odo_before,
+            e.odo_after,
+            e.liters,
+            e.amount_spent,
+        )
+        for e in storage.list_entries()
+    )
+
+
+def test_bulk_matches_sequential_add_entry() -> None:
+    seq = _new_storage()
+    seq.add_entry(
+        FuelEntry(
+            entry_date=date(2023, 12, 30), vehicle_id=1, odo_before=-50, amount_spent=40
+        )
+    )
+    for row in sorted(_rows(), key=lambda r: r["entry_date"]):
+        seq.add_entry(FuelEntry(**row))
+
+    bulk = _new_storage()
+    bulk.add_entry(
+        FuelEntry(
+            entry_date=date(2023, 12, 30), vehicle_id=1, odo_before=-50, amount_spent=40
+        )
+    )
+    entries = [FuelEntry(**row) for row in _rows()]
+    assert bulk.add_entries_bulk(entries) == []
+
+    assert _dump(bulk) == _dump(seq)
+    assert all(e.id is not None for e in entries)
+    first = bulk.get_entry(entries[1].id)
+    assert first.odo_after == 100
+    assert first.liters == pytest.approx(1.0)
+
+
+def test_bulk_keeps_open_entry_before_a_closed_one() -> None:
+    history = [
+        {
+            "entry_date": date(2024, 1, 1),
+            "vehicle_id": 1,
+            "odo_before": 0,
+            "amount_spent": 40,
+        },
+        {
+            "entry_date": date(2024, 1, 5),
+            "vehicle_id": 1,
+            "odo_before": 100,
+            "odo_after": 250,
+        },
+    ]
+    new = {"entry_date": date(2024, 1, 10), "vehicle_id": 1, "odo_before": 300}
+    seq, bulk = _new_storage(), _new_storage()
+    for storage in (seq, bulk):
+        for row in history:
+            storage.add_entry(FuelEntry(**row))
+        # The Jan 1 entry stays open: another day took the readings after it.
+        with storage.engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE fuelentry SET odo_after = NULL WHERE id = 1")
+    seq.add_entry(FuelEntry(**new))
+    assert bulk.add_entries_bulk([FuelEntry(**new)]) == []
+
+    assert _dump(bulk) == _dump(seq)
+    assert bulk.get_entry(1).odo_after is None
+    assert bulk.get_entry(2).odo_after == 300
+
+
+def test_bulk_reports_invalid_rows_and_inserts_the_rest() -> None:
+    storage = _new_storage()
+    entries = [
+        FuelEntry(
+            entry_date=date(2024, 1, 1),
+            vehicle_id=1,
+            odo_before=0,
+            odo_after=100,
+            amount_spent=10,
+        ),
+        FuelEntry(
+            entry_date=date(2024, 1, 2), vehicle_id=1, odo_before=100, odo_after=50
+        ),
+        FuelEntry(
+            entry_date=date(2024, 1, 3), vehicle_id=1, odo_before=100, liters=5.0
+        ),
+    ]
+    errors = storage.add_entries_bulk(entries)
+    assert [idx for idx, _ in errors] == [1, 2]
+    assert len(storage.list_entries()) == 1
+    assert entries[1].id is None
+
+
+def test_bulk_uses_one_commit() -> None:
+    storage = _new_storage()
+    commits = []
+
+    def count_commit(session):
+        commits.append(session)
+
+    event.listen(Session, "after_commit", count_commit)
+    try:
+        storage.add_entries_bulk(FuelEntry(**row) for row in _rows())
+    finally:
+        event.remove(Session, "after_commit", count_commit)
+    assert len(commits) == 1
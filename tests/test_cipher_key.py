@@ -0,0 +1,85 @@
+import hashlib
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy.pool import QueuePool
+from sqlmodel import Session, select
+
+from src.models import Vehicle
+from src.services import cipher_key
+from src.services.storage_service import StorageService
+
+
+@pytest.fixture(autouse=True)
+def _fast_kdf(monkeypatch):
+    monkeypatch.setattr(cipher_key, "KDF_ITERATIONS", 1000)
+    cipher_key.clear_cache()
+    yield
+    cipher_key.clear_cache()
+
+
+def test_derive_key_runs_kdf_once_per_salt() -> None:
+    salt = bytes(range(16))
+    before = cipher_key.kdf_stats()["kdf_runs"]
+
+    first = cipher_key.derive_key("secret", salt)
+    assert cipher_key.derive_key("secret", salt) == first
+    assert cipher_key.derive_key("other", salt) != first
+
+    assert cipher_key.kdf_stats()["kdf_runs"] == before + 2
+    expected = hashlib.pbkdf2_hmac("sha512", b"secret", salt, 1000, 32).hex()
+    assert first == expected
+
+
+def test_key_pragma_uses_raw_key_and_salt() -> None:
+    salt = b"s" * 16
+    pragma = cipher_key.key_pragma("secret", salt)
+    raw = pragma.split("x'")[1].split("'")[0]
+
+    assert len(raw) == 96
+    assert raw.endswith(salt.hex())
+    assert cipher_key.key_pragma("secret") != cipher_key.key_pragma("secret")
+
+
+def test_read_salt(tmp_path) -> None:
+    plain = tmp_path / "plain.db"
+    sqlite3.connect(plain).execute("CREATE TABLE t (x)").connection.close()
+    encrypted = tmp_path / "enc.db"
+    encrypted.write_bytes(b"0123456789abcdef" + bytes(100))
+
+    assert cipher_key.read_salt(tmp_path / "missing.db") is None
+    assert cipher_key.read_salt(plain) is None
+    assert cipher_key.read_salt(encrypted) == b"0123456789abcdef"
+
+
+def test_pool_reuses_connections(tmp_path) -> None:
+    storage = StorageService(db_path=tmp_path / "fuel.db", password="", pool_size=3)
+    assert isinstance(storage.engine.pool, QueuePool)
+    for i in range(5):
+        storage.add_vehicle(
+            Vehicle(
+                name=f"v{i}",
+                vehicle_type="car",
+                license_plate=str(i),
+                tank_capacity_liters=1,
+            )
+        )
+
+    def read() -> None:
+        for _ in range(10):
+            with Session(storage.engine) as s:
+                s.exec(select(Vehicle)).all()
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = storage.pool_stats()
+    assert stats["checkouts"] > 30
+    assert 1 <= stats["connects"] <= 3
+    assert stats["size"] == 3
+    assert {"kdf_runs", "kdf_seconds", "connect_seconds"} <= set(stats)
+    storage.engine.dispose()
@@ -0,0 +1,82 @@
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import columnar
+
+
+@pytest.fixture
+def storage(in_memory_storage, seed):
+    seed(
+        in_memory_storage,
+        [("กระบะ", "pickup"), "Civic"],
+        [
+            {"entry_date": day, "vehicle_id": vid, "fuel_type": fuel, "odo_before": odo}
+            for day, vid, fuel, odo in [
+                (date(2024, 1, 31), 1, "diesel", 100),
+                (date(2024, 2, 1), 2, "e20", 500),
+                (date(2024, 2, 3), 1, None, 200),
+                (date(2024, 2, 10), 1, "diesel", 300),
+            ]
+        ],
+        amount_spent=350,
+        liters=10,
+    )
+    return in_memory_storage
+
+
+def test_frame_columns_types_and_labels(storage) -> None:
+    df = storage.to_frame()
+    assert list(df.columns) == list(columnar.FRAME_COLUMNS)
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert df["id"].dtype == np.int64 and df["liters"].dtype == np.float64
+    assert list(df["date"].dt.date) == [
+        date(2024, 1, 31),
+        date(2024, 2, 1),
+        date(2024, 2, 3),
+        date(2024, 2, 10),
+    ]
+    assert list(df["vehicle"]) == ["กระบะ", "Civic", "กระบะ", "กระบะ"]
+    assert list(df["vehicle_type"]) == ["pickup", "car", "pickup", "pickup"]
+    # Known codes get their Thai label, unknown ones are kept, missing is "".
+    assert list(df["fuel_name"]) == ["ดีเซล B7", "e20", "", "ดีเซล B7"]
+    assert list(df["distance"].iloc[[0, 2]]) == [100.0, 100.0]
+    assert df["odo_after"].isna().tolist() == [False, True, False, True]
+    assert df["distance"].isna().tolist() == [False, True, False, True]
+
+
+def test_filters_batches_and_missing_vehicles(storage) -> None:
+    feb = storage.to_frame(date(2024, 2, 1), date(2024, 3, 1), [1])
+    assert list(feb["id"]) == [3, 4]
+    assert storage.to_frame(end=date(2024, 2, 1))["id"].tolist() == [1]
+    empty = storage.to_frame(vehicle_ids=[])
+    assert empty.empty and list(empty.columns) == list(columnar.FRAME_COLUMNS)
+    assert empty["date"].dtype == storage.to_frame()["date"].dtype
+
+    with storage.engine.connect() as conn:
+        small = columnar.to_frame(conn, batch_size=3)
+    pd.testing.assert_frame_equal(small, storage.to_frame())
+
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM vehicle WHERE id = 2")
+    assert storage.to_frame()["vehicle"].tolist() == ["กระบะ", "", "กระบะ", "กระบะ"]
+
+
+def test_to_arrow(storage) -> None:
+    pa = pytest.importorskip("pyarrow")
+
+    table = storage.to_arrow()
+    assert table.column_names == list(columnar.FRAME_COLUMNS)
+    assert table.schema.field("date").type == pa.date32()
+    assert table.column("date")[0].as_py() == date(2024, 1, 31)
+    assert table.column("odo_after").null_count == 2
+    assert table.column("fuel_name").to_pylist()[1] == "e20"
+
+
+def test_to_arrow_without_pyarrow(in_memory_storage, monkeypatch) -> None:
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ModuleNotFoundError, match="fueltracker\\[arrow\\]"):
+        in_memory_storage.to_arrow()
@@ -0,0 +1,117 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from src.models import Maintenance
+from src.services.dashboard import DashboardService, MaintenanceItem
+
+
+def _statements(storage, call) -> list[str]:
+    seen: list[str] = []
+
+    def capture(_conn, _cursor, statement, *_args) -> None:
+        seen.append(statement)
+
+    event.listen(storage.engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(storage.engine, "before_cursor_execute", capture)
+    return seen
+
+
+@pytest.fixture
+def fill(seed):
+    """Return a helper seeding two vehicles, three fills and two services."""
+
+    def fill(storage):
+        seed(
+            storage,
+            ("a", "b"),
+            [
+                {
+                    "entry_date": date(2024, 5, day),
+                    "odo_before": odo,
+                    "odo_after": after,
+                }
+                for day, odo, after in [(1, 0, 100), (2, 100, 250), (3, 250, None)]
+            ],
+            vehicle_id=1,
+            amount_spent=100.0,
+            liters=10.0,
+        )
+        storage.add_maintenance(Maintenance(vehicle_id=1, name="Oil", due_odo=200))
+        storage.add_maintenance(
+            Maintenance(vehicle_id=1, name="Tyres", due_date=date(2030, 1, 1))
+        )
+        return storage
+
+    return fill
+
+
+@pytest.fixture
+def storage(in_memory_storage, fill):
+    return fill(in_memory_storage)
+
+
+def test_snapshot_contents(storage) -> None:
+    dashboard = DashboardService(storage)
+
+    snap = dashboard.snapshot(1)
+    assert (snap.distance, snap.liters, snap.price) == (250.0, 20.0, 200.0)
+    assert snap.km_per_liter == 12.5 and snap.cost_per_km == 0.8
+    # The open latest entry has no distance yet.
+    assert snap.tooltip == "2024-05-03 - ฿100"
+    assert snap.current_odo is None
+    assert snap.maintenances == (
+        MaintenanceItem(1, "Oil", 200, None, False),
+        MaintenanceItem(2, "Tyres", None, date(2030, 1, 1), False),
+    )
+    assert snap.is_due(snap.maintenances[1], date(2030, 1, 1))
+
+    empty = dashboard.snapshot(2)
+    assert (empty.km_per_liter, empty.cost_per_km, empty.tooltip) == (0.0, 0.0, "")
+    assert empty.maintenances == ()
+
+
+def test_one_query_cached_by_data_version(storage) -> None:
+    dashboard = DashboardService(storage)
+
+    (sql,) = _statements(storage, lambda: dashboard.snapshot(1))
+    with storage.engine.connect() as conn:
+        plan = " | ".join(
+            row[-1]
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", (1, 1, 1))
+        )
+    assert "ix_maintenance_vehicle_id (vehicle_id=?)" in plan
+    assert "SCAN fuelentry" not in plan and "SCAN monthly_agg" not in plan
+    first = dashboard.snapshot(1)
+    assert _statements(storage, lambda: dashboard.snapshot(1)) == []
+
+    entry = storage.get_last_entry(1)
+    entry.odo_after = 400
+    storage.update_entry(entry)
+    snap = dashboard.snapshot(1)
+    assert snap is not first
+    assert snap.current_odo == 400.0 and snap.tooltip == "2024-05-03 - 150 km - ฿100"
+    assert snap.is_due(snap.maintenances[0], date(2024, 5, 3))
+
+
+def test_controller_binds_widgets_off_thread(main_controller, qtbot, fill) -> None:
+    ctrl = main_controller
+    fill(ctrl.storage)
+    ctrl._selected_vehicle_id = 1
+
+    ctrl.entry_changed.emit()
+    qtbot.waitUntil(lambda: ctrl.maint_dock.list_widget.count() == 2)
+    assert ctrl.stats_dock.kml_label.text() == "กม./ลิตร: 12.50"
+    assert ctrl.stats_dock.cost_label.text() == "บาท/กม.: 0.80"
+
+    # A result for an earlier selection is dropped.
+    ctrl._selected_vehicle_id = None
+    stale = ctrl._dashboard_generation
+    ctrl._refresh_dashboard()
+    ctrl._apply_dashboard(stale, ctrl.dashboard.snapshot(1))
+    assert ctrl.maint_dock.list_widget.count() == 0
+    assert ctrl.stats_dock.kml_label.text() == "กม./ลิตร: -"
@@ -0,0 +1,201 @@
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from src.models import FuelEntry, FuelPrice, Vehicle
+from src.services import ReportService, StorageService, odometer_chain
+from src.services.importer import Importer
+
+
+def _entry(**kw) -> FuelEntry:
+    data = {
+        "entry_date": date(2024, 1, 1),
+        "vehicle_id": 1,
+        "odo_before": 0.0,
+        "odo_after": 100.0,
+        "amount_spent": 20.0,
+        "liters": 10.0,
+    }
+    data.update(kw)
+    return FuelEntry(**data)
+
+
+def test_write_paths_bump_table_versions(
+    in_memory_storage: StorageService, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    start = storage.table_versions()
+
+    add_vehicle(storage)
+    assert storage.table_version("vehicle") == start["vehicle"] + 1
+    assert storage.table_version("fuelentry") == start["fuelentry"]
+
+    entry = _entry()
+    storage.add_entry(entry)
+    v = storage.table_version("fuelentry")
+    assert v > start["fuelentry"]
+    entry.amount_spent = 30.0
+    storage.update_entry(entry)
+    assert storage.table_version("fuelentry") == v + 1
+    storage.delete_entry(entry.id)
+    assert storage.table_version("fuelentry") == v + 2
+
+    storage.set_budget(1, 100.0)
+    assert storage.table_version("budget") == start["budget"] + 1
+
+
+def test_reads_do_not_change_version(
+    in_memory_storage: StorageService, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    storage.add_entry(_entry())
+    before = storage.data_version
+    storage.list_entries()
+    storage.get_vehicle_stats(1)
+    storage.monthly_totals()
+    assert storage.data_version == before
+    assert storage.last_modified == before
+
+
+def test_raw_session_and_importer_writes_are_tracked(
+    in_memory_storage: StorageService, tmp_path, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    before = storage.table_version("fuelprice")
+    with Session(storage.engine) as s:
+        s.add(
+            FuelPrice(
+                date=date(2024, 1, 1),
+                station="ptt",
+                fuel_type="e20",
+                name_th="E20",
+                price=Decimal(30),
+            )
+        )
+        s.commit()
+    assert storage.table_version("fuelprice") == before + 1
+
+    csv_path = tmp_path / "d.csv"
+    csv_path.write_text(
+        "date,fuel_type,odo_before,odo_after,liters,amount_spent\n"
+        "2024-01-02,e20,0,100,10,30\n",
+        encoding="utf-8",
+    )
+    before = storage.table_version("fuelentry")
+    Importer(storage).import_csv(csv_path, 1)
+    assert storage.table_version("fuelentry") > before
+
+
+def test_rolled_back_writes_are_not_counted(in_memory_storage: StorageService) -> None:
+    storage = in_memory_storage
+    before = storage.data_version
+    with Session(storage.engine) as s:
+        s.add(
+            Vehicle(
+                name="v", vehicle_type="car", license_plate="v", tank_capacity_liters=1
+            )
+        )
+        s.flush()
+        s.rollback()
+    assert storage.data_version == before
+
+
+def test_version_moves_only_after_the_commit(
+    in_memory_storage: StorageService,
+    add_vehicle,
+) -> None:
+    storage = in_memory_storage
+    before = storage.table_version("vehicle")
+    seen: list[int] = []
+
+    def record(_conn) -> None:
+        # Runs right before SQLite commits; a reader caching now would store
+        # the old rows under whatever version it sees.
+        seen.append(storage.table_version("vehicle"))
+
+    event.listen(storage.engine, "commit", record)
+    try:
+        add_vehicle(storage)
+    finally:
+        event.remove(storage.engine, "commit", record)
+    assert seen == [before]
+    assert storage.table_version("vehicle") == before + 1
+
+
+def test_statements_with_cte_are_tracked(
+    in_memory_storage: StorageService, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    storage.add_entry(_entry(odo_after=None))
+    storage.add_entry(_entry(entry_date=date(2024, 1, 2), odo_before=100.0))
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE fuelentry SET odo_after = NULL")
+    before = storage.table_version("fuelentry")
+    with storage.engine.begin() as conn:
+        # ``WITH chain AS (...) UPDATE fuelentry ...``
+        assert odometer_chain.rebuild(conn)
+    assert storage.table_version("fuelentry") == before + 1
+
+
+def test_external_writer_detected(tmp_path, add_vehicle) -> None:
+    db = tmp_path / "fuel.db"
+    storage = StorageService(db_path=db, password="")
+    add_vehicle(storage)
+    before = storage.data_version
+    assert storage.data_version == before
+
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "INSERT INTO vehicle (name, vehicle_type, license_plate, "
+        "tank_capacity_liters) VALUES ('ext', 't', 'y', 1)"
+    )
+    conn.commit()
+    conn.close()
+
+    assert storage.data_version > before
+    after = storage.data_version
+    assert storage.data_version == after
+
+
+def test_external_commit_right_after_a_local_one(tmp_path, add_vehicle) -> None:
+    db = tmp_path / "fuel.db"
+    storage = StorageService(db_path=db, password="")
+    add_vehicle(storage)
+    before = storage.table_version("fuelentry")
+
+    add_vehicle(storage, "w")
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "INSERT INTO fuelentry (entry_date, vehicle_id, odo_before) "
+        "VALUES ('2024-01-01', 1, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    # Only the external commit touched fuelentry.
+    assert storage.table_version("fuelentry") > before
+    storage.close()
+    assert storage._versions._watch_conn is None
+
+
+def test_monthly_cache_invalidated_on_write(
+    in_memory_storage: StorageService, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    storage.add_entry(_entry())
+    service = ReportService(storage)
+    other = date(2024, 2, 1)
+    assert len(service._monthly_df(date(2024, 1, 1), None)) == 1
+    assert service._monthly_df(other, None).empty
+
+    storage.add_entry(_entry(entry_date=other, odo_before=100.0, odo_after=200.0))
+
+    assert len(service._monthly_df(date(2024, 1, 1), None)) == 1
+    assert len(service._monthly_df(other, None)) == 1
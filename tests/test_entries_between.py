@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+
+from src.services import date_ranges
+
+
+@pytest.fixture
+def storage(in_memory_storage, seed):
+    days = [date(2023, 9, 30), date(2023, 10, 1), date(2024, 2, 29), date(2024, 3, 1)]
+    seed(
+        in_memory_storage,
+        ("a", "b"),
+        [
+            {"entry_date": day, "vehicle_id": vid, "odo_before": i * 100}
+            for i, day in enumerate(days)
+            for vid in (1, 2)
+        ],
+    )
+    return in_memory_storage
+
+
+def test_range_is_half_open(storage) -> None:
+    feb = storage.entries_between(*date_ranges.month_range(2024, 2))
+    assert [(e.entry_date, e.vehicle_id) for e in feb] == [
+        (date(2024, 2, 29), 1),
+        (date(2024, 2, 29), 2),
+    ]
+    fiscal = storage.entries_between(
+        *date_ranges.fiscal_year_range(2024), vehicle_ids=[2]
+    )
+    assert [e.entry_date for e in fiscal] == [
+        date(2023, 10, 1),
+        date(2024, 2, 29),
+        date(2024, 3, 1),
+    ]
+    both = storage.entries_between(date(2023, 1, 1), date(2025, 1, 1), [2, 1])
+    assert len(both) == 8
+    assert storage.entries_between(date(2024, 3, 1), date(2024, 3, 1)) == []
+
+
+def test_columns_projection(storage) -> None:
+    rows = storage.entries_between(
+        *date_ranges.quarter_range(2024, 1), [1], columns=["entry_date", "odo_before"]
+    )
+    assert [tuple(r) for r in rows] == [
+        (date(2024, 2, 29), 200.0),
+        (date(2024, 3, 1), 300.0),
+    ]
+    with pytest.raises(ValueError, match="price"):
+        storage.entries_between(date(2024, 1, 1), date(2025, 1, 1), columns=["price"])
+
+
+def test_month_helper_delegates(storage) -> None:
+    assert [e.vehicle_id for e in storage.list_entries_for_month(2023, 9, 2)] == [2]
+    assert len(storage.list_entries_for_month(2024, 3)) == 2
+
+
+def test_period_helpers() -> None:
+    assert date_ranges.month_range(2024, 12) == (date(2024, 12, 1), date(2025, 1, 1))
+    assert date_ranges.quarter_range(2024, 4) == (date(2024, 10, 1), date(2025, 1, 1))
+    assert date_ranges.year_range(2024) == (date(2024, 1, 1), date(2025, 1, 1))
+    assert date_ranges.fiscal_year_range(2024) == (date(2023, 10, 1), date(2024, 10, 1))
+    assert date_ranges.fiscal_year_range(2024, start_month=1) == (
+        date(2024, 1, 1),
+        date(2025, 1, 1),
+    )
+    assert date_ranges.rolling_days(90, today=date(2024, 3, 31)) == (
+        date(2024, 1, 2),
+        date(2024, 4, 1),
+    )
+    with pytest.raises(ValueError):
+        date_ranges.quarter_range(2024, 5)
@@ -20,7 +20,7 @@ def test_backup_command(monkeypatch, capsys):
         def __init__(self):
             pass
 
-        def auto_backup(self):
+        def auto_backup(self, **_kwargs):
             return Path("my_backup.db")
 
     import src.services as services
@@ -42,7 +42,7 @@ def test_filter_entries(main_controller, monkeypatch):
     ctrl.window.searchLineEdit.setText("Car B")
     ctrl.window.startDateEdit.setDate(QDate.currentDate())
 
-    entries = ctrl.filter_entries()
+    entries = storage.page_entries(filters=ctrl.filter_entries())
     assert len(entries) == 1
     assert entries[0].vehicle_id == 2
 
@@ -113,10 +113,9 @@ def test_last_entry_tooltip_and_maintenance(main_controller, monkeypatch):
     ctrl._selected_vehicle_id = 1
     tip = {}
     monkeypatch.setattr(ctrl.tray_icon, "setToolTip", lambda t: tip.setdefault("v", t))
-    ctrl._update_tray_tooltip()
+    ctrl._show_dashboard(ctrl.dashboard.snapshot(1))
     assert str(date.today()) in tip.get("v", "")
 
-    ctrl._refresh_maintenance_panel()
     lw = ctrl.maint_dock.list_widget
     assert lw.count() == 1
     assert "Oil" in lw.item(0).text()
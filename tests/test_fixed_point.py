@@ -0,0 +1,215 @@
+import sqlite3
+from contextlib import closing
+from dataclasses import astuple
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import sqlalchemy
+from alembic.config import Config
+from sqlmodel import Session
+
+from alembic import command
+from fueltracker.main import ALEMBIC_INI  # type: ignore
+from src.models import FuelEntry, FuelPrice
+from src.models.fixed_point import liters_cl
+from src.services import StorageService
+from src.services.dashboard import DashboardService
+from src.services.oil_service import update_missing_liters
+
+#: Amounts and liters whose float sums drift, e.g. 0.1 + 0.2.
+AMOUNTS = (0.1, 0.2, 0.7, 33.33, 1234.56)
+LITERS = (0.01, 0.1, 0.29, 7.77, 40.03)
+
+
+def _price(session: Session, day: date, price: str) -> None:
+    session.add(
+        FuelPrice(
+            date=day,
+            station="ptt",
+            fuel_type="e20",
+            name_th="E20",
+            price=Decimal(price),
+        )
+    )
+
+
+def test_values_are_stored_as_hundredths(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    with Session(storage.engine) as s:
+        _price(s, date(2024, 1, 1), "37.35")
+        s.commit()
+    entry = FuelEntry(
+        entry_date=date(2024, 1, 1), vehicle_id=1, odo_before=0, amount_spent=100.1
+    )
+    storage.add_entry(entry)
+
+    # 100.10 / 37.35 = 2.68005... liters
+    assert entry.liters == 2.68 and entry.amount_spent == 100.1
+    with storage.engine.connect() as conn:
+        assert conn.exec_driver_sql(
+            "SELECT amount_satang, liters_cl FROM fuelentry"
+        ).all() == [(10010, 268)]
+        assert conn.exec_driver_sql("SELECT price_satang FROM fuelprice").all() == [
+            (3735,)
+        ]
+    with Session(storage.engine) as s:
+        assert s.get(FuelPrice, 1).price == Decimal("37.35")
+
+
+def test_aggregates_are_exact(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    storage.set_budget(1, 1000.0)
+    rows = [
+        FuelEntry(
+            entry_date=date(2024, 5, 1 + i * 28 // 1001),
+            vehicle_id=1,
+            fuel_type="e20",
+            odo_before=i * 10.0,
+            amount_spent=AMOUNTS[i % len(AMOUNTS)],
+            liters=LITERS[i % len(LITERS)],
+        )
+        for i in range(1001)
+    ]
+    assert storage.add_entries_bulk(rows) == []
+    # The last entry has no ``odo_after``, so it is open.
+    closed = rows[:-1]
+    amount = float(sum(Decimal(str(e.amount_spent)) for e in rows))
+    liters = float(sum(Decimal(str(e.liters)) for e in rows))
+    closed_amount = float(sum(Decimal(str(e.amount_spent)) for e in closed))
+    closed_liters = float(sum(Decimal(str(e.liters)) for e in closed))
+    assert sum(e.amount_spent for e in rows) != amount
+
+    assert storage.get_vehicle_stats(1) == (10000.0, closed_liters, closed_amount)
+    assert storage.get_overall_totals() == (10000.0, closed_liters, amount)
+    assert storage.vehicle_monthly_stats(1, 2024, 5) == (10000.0, liters, amount)
+    assert storage.monthly_totals() == [
+        ("2024-05", 10000.0, closed_liters, closed_amount)
+    ]
+    assert storage.get_total_spent(1, 2024, 5) == amount
+    assert storage.liters_by_fuel_type() == {"e20": liters}
+    assert astuple(storage.budget_status(2024, 5)[0])[:3] == (1, 1000.0, amount)
+    snap = DashboardService(storage).snapshot(1)
+    assert (snap.liters, snap.price) == (closed_liters, closed_amount)
+
+
+def test_sql_and_python_liters_agree(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    day = date(2024, 1, 1)
+    # Halves are rounded up: 0.01 / 2.00 = 0.005 liters.
+    cases = [(0.01, "2.00"), (100.1, "37.35"), (999.99, "29.99"), (50.0, "40")]
+    for pos, (amount, price) in enumerate(cases):
+        storage.add_entry(
+            FuelEntry(
+                entry_date=day.replace(day=pos + 1),
+                vehicle_id=1,
+                fuel_type="e20",
+                odo_before=pos * 100.0,
+                amount_spent=amount,
+            )
+        )
+    with Session(storage.engine) as s:
+        for pos, (_, price) in enumerate(cases):
+            _price(s, day.replace(day=pos + 1), price)
+        s.commit()
+        assert update_missing_liters(s, fallback_days=0) == len(cases)
+
+    expected = [
+        liters_cl(round(amount * 100), round(Decimal(price) * 100)) / 100
+        for amount, price in cases
+    ]
+    assert expected[0] == 0.01
+    stored = [e.liters for e in storage.entries_between(day, date(2024, 2, 1))]
+    assert stored == expected
+
+    # ``add_entry`` derives the same liters from the stored prices.
+    for pos, (amount, _) in enumerate(cases):
+        entry = FuelEntry(
+            entry_date=day.replace(day=pos + 1),
+            vehicle_id=1,
+            fuel_type="e20",
+            odo_before=1000.0 + pos,
+            amount_spent=amount,
+        )
+        storage.add_entry(entry)
+        assert entry.liters == expected[pos]
+
+
+def test_old_database_is_converted_on_open(tmp_path: Path) -> None:
+    db = tmp_path / "old.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    command.upgrade(cfg, "0013")
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO fuelentry (entry_date, vehicle_id, odo_before, odo_after, "
+            "amount_spent, liters) VALUES ('2024-01-05', 1, 0, 120, 300.3, 7.5), "
+            "('2024-01-06', 1, 120, NULL, 10.1, NULL)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO fuelprice (date, station, fuel_type, name_th, price) "
+            "VALUES ('2024-01-06', 'ptt', 'e20', 'E20', 35.55)"
+        )
+
+    storage = StorageService(engine=engine)
+    insp = sqlalchemy.inspect(engine)
+    columns = {c["name"] for c in insp.get_columns("fuelentry")}
+    assert {"amount_satang", "liters_cl"} <= columns
+    assert not {"amount_spent", "liters"} & columns
+    # The file was backed up with its old columns before the conversion.
+    (backup,) = (tmp_path / "backups").glob("*-pre-fixed-point.db")
+    with closing(sqlite3.connect(backup)) as conn:
+        assert conn.execute(
+            "SELECT amount_spent, liters FROM fuelentry ORDER BY id"
+        ).fetchall() == [(300.3, 7.5), (10.1, None)]
+    assert "ix_fuelentry_missing_liters" in {
+        i["name"] for i in insp.get_indexes("fuelentry")
+    }
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql(
+            "SELECT amount_satang, liters_cl FROM fuelentry ORDER BY id"
+        ).all() == [(30030, 750), (1010, None)]
+    assert storage.monthly_totals() == [("2024-01", 120.0, 7.5, 300.3)]
+    assert storage.get_total_spent(1, 2024, 1) == 310.4
+
+    # Reopening neither converts nor backs up again, and the migration
+    # leaves a converted file alone.
+    StorageService(engine=engine)
+    assert len(list((tmp_path / "backups").glob("*.db"))) == 1
+    command.upgrade(cfg, "head")
+    with Session(engine) as s:
+        assert update_missing_liters(s, fallback_days=0) == 1
+    assert storage.get_entry(2).liters == 0.28
+    engine.dispose()
+
+
+def test_regular_backups_keep_the_pre_conversion_copy(tmp_path: Path) -> None:
+    db = tmp_path / "old.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    command.upgrade(cfg, "0013")
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO fuelentry (entry_date, vehicle_id, odo_before, "
+            "amount_spent, liters) VALUES ('2024-01-05', 1, 0, 300.3, 7.5)"
+        )
+
+    storage = StorageService(engine=engine)
+    backups = tmp_path / "backups"
+    (pre,) = backups.glob("*-pre-fixed-point.db")
+    # The startup backup runs in the same minute, and pruning down to one
+    # file leaves the pre-conversion copy alone.
+    storage.auto_backup(pages=-1)
+    storage.auto_backup(pages=-1, max_backups=1)
+    assert pre.exists()
+    assert len(list(backups.glob("*.db"))) == 2
+    with closing(sqlite3.connect(pre)) as conn:
+        assert conn.execute("SELECT amount_spent, liters FROM fuelentry").fetchall() == [
+            (300.3, 7.5)
+        ]
+    engine.dispose()
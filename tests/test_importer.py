@@ -2,6 +2,7 @@ from datetime import date
 from decimal import Decimal
 from pathlib import Path
 import csv
+import threading
 from sqlalchemy import event
 from sqlmodel import SQLModel, create_engine, Session
 from sqlalchemy.pool import StaticPool
@@ -10,6 +11,7 @@ from src.models import FuelEntry, Vehicle, FuelPrice
 from src.services import StorageService, Exporter
 from src.services.importer import Importer
 from src.views import load_add_entry_dialog
+from PySide6.QtCore import QThreadPool
 from PySide6.QtWidgets import QDialog
 import pytest
 
@@ -154,7 +156,7 @@ def test_import_many_single_transaction(make_importer, make_csv):
 
     saved = storage.list_entries()
     assert len(saved) == 2
-    assert commit_count - start == 2
+    assert commit_count - start == 1
     assert saved[0].fuel_type == "gasoline_95"
 
 
@@ -196,6 +198,81 @@ def test_prefill_odometer(main_controller, monkeypatch):
     ctrl.open_add_entry_dialog()
 
 
+def _import_results(ctrl) -> list:
+    """Collect ``import_finished`` results.
+
+    The slot stays connected: disconnecting while the worker thread may
+    still be inside ``emit`` can crash PySide.
+    """
+    results: list = []
+    ctrl.import_finished.connect(results.append)
+    return results
+
+
+def test_controller_imports_csv_on_the_thread_pool(
+    main_controller, make_csv, monkeypatch, qtbot
+):
+    ctrl = main_controller
+    # Let the startup backup finish first.
+    QThreadPool.globalInstance().waitForDone()
+    ctrl.storage.add_vehicle(
+        Vehicle(
+            name="Car", vehicle_type="sedan", license_plate="A", tank_capacity_liters=40
+        )
+    )
+    csv_path = make_csv(
+        [
+            ["2024-06-01", "e20", "0", "", "", "50"],
+            ["2024-06-02", "e20", "100", "", "", "50"],
+        ]
+    )
+    threads: list[threading.Thread] = []
+    import_chunked = ctrl.importer.import_csv_chunked
+
+    def record_thread(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return import_chunked(*args, **kwargs)
+
+    monkeypatch.setattr(ctrl.importer, "import_csv_chunked", record_thread)
+
+    # The in-memory database has one connection for all threads; hold the
+    # executor so page and dashboard loads cannot roll the import back.
+    started, release = threading.Event(), threading.Event()
+    ctrl.executor.submit(lambda: started.set() or release.wait(5))
+    assert started.wait(5)
+    finished = _import_results(ctrl)
+
+    ctrl._start_import(csv_path, 1)
+    qtbot.waitUntil(lambda: bool(finished) and ctrl._import_done.is_set())
+    release.set()
+
+    assert finished == [(2, [])]
+    assert threads and threads[0] is not threading.main_thread()
+    assert len(ctrl.storage.list_entries()) == 2
+    assert ctrl._import_progress is None
+
+
+def test_controller_reports_a_missing_csv(
+    main_controller, tmp_path, monkeypatch, qtbot
+):
+    ctrl = main_controller
+    QThreadPool.globalInstance().waitForDone()
+    errors: list[str] = []
+    monkeypatch.setattr(
+        "src.controllers.main_controller.QMessageBox.critical",
+        lambda _parent, _title, text: errors.append(text),
+    )
+
+    finished = _import_results(ctrl)
+
+    ctrl._start_import(tmp_path / "gone.csv", 1)
+    qtbot.waitUntil(lambda: bool(finished) and ctrl._import_done.is_set())
+
+    assert isinstance(finished[0], str)
+    assert errors == finished
+    assert ctrl._import_progress is None
+
+
 def test_import_csv_fills_liters_when_prices_exist(make_importer, make_csv) -> None:
     importer, storage = make_importer()
 
@@ -206,7 +283,7 @@ def test_import_csv_fills_liters_when_prices_exist(make_importer, make_csv) -> N
                 station="ptt",
                 fuel_type="e20",
                 name_th="E20",
-                price=Decimal("40"),
+                price=Decimal(40),
             )
         )
         s.commit()
@@ -228,7 +305,7 @@ def test_import_csv_uses_default_station(make_importer, make_csv) -> None:
                 station="bcp",
                 fuel_type="e20",
                 name_th="E20",
-                price=Decimal("50"),
+                price=Decimal(50),
             )
         )
         s.commit()
@@ -238,3 +315,155 @@ def test_import_csv_uses_default_station(make_importer, make_csv) -> None:
 
     saved = storage.list_entries()
     assert saved[0].liters == pytest.approx(1.6)
+
+
+def test_iter_csv_yields_chunks_with_progress(make_importer, make_csv) -> None:
+    importer, _ = make_importer(add_vehicle=False)
+    rows = [
+        [f"2024-06-{d:02d}", "e20", str(d * 100), "", "", "50"] for d in range(1, 8)
+    ]
+    rows.insert(3, ["bad-date", "e20", "0", "", "", ""])
+    csv_path = make_csv(rows)
+
+    calls: list[tuple[int, int]] = []
+    chunks = list(
+        importer.iter_csv(
+            csv_path, chunk_size=3, progress=lambda r, b: calls.append((r, b))
+        )
+    )
+
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    assert chunks[0][0].odo_before == 100.0
+    assert chunks[0][0].amount_spent == 50.0
+    assert chunks[0][0].liters is None
+    assert calls[-1] == (8, csv_path.stat().st_size)
+    assert [r for r, _ in calls] == sorted(r for r, _ in calls)
+
+
+def test_import_csv_chunked_chains_across_chunks(make_importer, make_csv) -> None:
+    importer, storage = make_importer()
+    csv_path = make_csv(
+        [
+            ["2024-06-01", "e20", "0", "", "", "50"],
+            ["2024-06-02", "e20", "100", "", "", "50"],
+            ["2024-06-03", "e20", "200", "150", "", "50"],
+            ["2024-06-04", "e20", "300", "", "", "50"],
+        ]
+    )
+
+    count, errors = importer.import_csv_chunked(csv_path, 1, chunk_size=2)
+
+    assert count == 3
+    # The header is line 1.
+    assert [line for line, _ in errors] == [4]
+    saved = sorted(storage.list_entries(), key=lambda e: e.entry_date)
+    assert [e.odo_after for e in saved] == [100.0, 300.0, None]
+
+
+def test_columnar_import_matches_row_import(make_importer, make_csv) -> None:
+    rows = [
+        ["2024-06-03", "e20", "200", "", "", "90"],
+        ["2024-06-01", "e20", "0", "", "", "50"],
+        ["bad-date", "e20", "0", "", "", ""],
+        ["2024-06-02", "", "100", "", "20", ""],
+        ["2024-06-04", "e20", "300", "250", "", "50"],
+        ["2024-06-05", "gasohol95", "", "", "x", "60"],
+    ]
+    csv_path = make_csv(rows)
+
+    row_importer, row_storage = make_importer()
+    col_importer, col_storage = make_importer()
+    for storage in (row_storage, col_storage):
+        with Session(storage.engine) as s:
+            s.add(
+                FuelPrice(
+                    date=date(2024, 6, 1),
+                    station="ptt",
+                    fuel_type="e20",
+                    name_th="E20",
+                    price=Decimal(25),
+                )
+            )
+            s.commit()
+
+    row_importer.import_csv(csv_path, 1)
+    count, rejected = col_importer.import_csv_columnar(csv_path, 1)
+
+    def _rows(storage):
+        return sorted(
+            (e.entry_date, e.fuel_type, e.odo_before, e.odo_after, e.liters)
+            for e in storage.list_entries()
+        )
+
+    assert count == 3
+    assert _rows(col_storage) == _rows(row_storage)
+    assert list(rejected["line"]) == [4, 5, 6]
+    assert rejected["error"].iloc[0] == "วันที่ไม่ถูกต้อง"
+    assert rejected["date"].iloc[0] == "bad-date"
+
+
+def test_read_frame_sorts_and_coerces(make_importer, make_csv) -> None:
+    importer, _ = make_importer(add_vehicle=False)
+    csv_path = make_csv(
+        [
+            ["2024-06-02", "e20", "100", "", "", "50"],
+            ["2024-06-01", "", "", "abc", "", ""],
+        ]
+    )
+
+    clean, rejected = importer.read_frame(csv_path)
+
+    assert rejected.empty
+    assert list(clean["entry_date"]) == [date(2024, 6, 1), date(2024, 6, 2)]
+    assert clean["odo_before"].tolist() == [0.0, 100.0]
+    assert clean["fuel_type"].iloc[0] is None
+    assert clean["odo_after"].isna().all()
+
+
+def test_skipped_rows_are_reported_with_file_lines(
+    make_importer, make_csv, caplog
+) -> None:
+    importer, _storage = make_importer()
+    csv_path = make_csv(
+        [
+            ["2024-06-01", "e20", "0", "", "", "50"],
+            ["bad-date", "e20", "50", "", "", "50"],
+            ["2024-06-02", "e20", "100", "", "", "50"],
+            ["2024-06-03", "e20", "x", "", "", "50"],
+            ["2024-06-04", "e20", "300", "250", "", "50"],
+        ]
+    )
+
+    count, errors = importer.import_csv_chunked(csv_path, 1, chunk_size=2)
+
+    assert count == 2
+    assert errors == [
+        (3, "วันที่ไม่ถูกต้อง"),
+        (5, "เลขไมล์ก่อนเติมไม่ถูกต้อง"),
+        (6, "ค่าเลขไมล์หลังเติมต้องมากกว่าหรือเท่ากับก่อนเติม"),
+    ]
+    caplog.clear()
+    importer2, _ = make_importer()
+    assert len(importer2.import_csv(csv_path, 1)) == 2
+    assert "ข้าม 3 แถว" in caplog.text
+    assert "ข้ามบรรทัดที่ 3 " in caplog.text
+
+
+def test_both_import_paths_report_the_same_lines(make_importer, tmp_path) -> None:
+    csv_path = tmp_path / "bad.csv"
+    csv_path.write_text(
+        "date,fuel_type,odo_before,odo_after,liters,amount_spent\n"
+        "2024-06-01,e20,0,,,50\n"
+        "bad-date,e20,50,,,50\n"
+        "\n"
+        "2024-06-03,e20,x,,,50\n"
+        "2024-06-04,e20,300,250,,50\n",
+        encoding="utf-8",
+    )
+    importer, _ = make_importer()
+
+    _count, errors = importer.import_csv_chunked(csv_path, 1)
+    _clean, rejected = importer.read_frame(csv_path)
+
+    assert [line for line, _ in errors] == [3, 4, 5, 6]
+    assert list(zip(rejected["line"], rejected["error"])) == errors
@@ -23,7 +23,7 @@ def test_migrate_command(monkeypatch, tmp_path):
 def test_backup_command(monkeypatch, tmp_path, capsys):
     called = {}
 
-    def fake_backup(self: StorageService):
+    def fake_backup(self: StorageService, **_kwargs):
         called['called'] = True
         return tmp_path / 'backup.db'
 
@@ -52,3 +52,19 @@ def test_sync_command(monkeypatch, tmp_path):
 
     expected = (tmp_path / '.fueltracker' / 'backups', tmp_path / 'cloud')
     assert called.get('args') == expected
+
+
+def test_backup_command_reports_progress(monkeypatch, tmp_path, capsys):
+    def fake_backup(self: StorageService, progress=None, **_kwargs):
+        for copied in (1, 2, 4):
+            progress(copied, 4)
+        return tmp_path / 'backup.db'
+
+    monkeypatch.setenv('DB_PATH', str(tmp_path / 'db.sqlite'))
+    monkeypatch.setattr(StorageService, 'auto_backup', fake_backup)
+
+    main.run(['backup'])
+
+    captured = capsys.readouterr()
+    assert captured.err.split('\r')[1:] == ['backup 25%', 'backup 50%', 'backup 100%\n']
+    assert captured.out.strip().endswith('backup.db')
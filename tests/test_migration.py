@@ -32,3 +32,74 @@ def test_indexes_created(engine: Engine) -> None:
     assert "ix_maintenance_vehicle_id" in maint_indexes
     assert "ix_budget_vehicle_id" in budget_indexes
     assert "ix_fuelprice_date_station_fuel_type" in price_indexes
+
+
+def test_fuelprice_duplicates_removed_by_unique_migration(tmp_path: Path) -> None:
+    db = tmp_path / "dup.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    command.upgrade(cfg, "0008")
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        for price in (40, 41):
+            conn.exec_driver_sql(
+                "INSERT INTO fuelprice (date, station, fuel_type, name_th, price) "
+                f"VALUES ('2024-01-01', 'ptt', 'e20', 'E20', {price})"
+            )
+
+    command.upgrade(cfg, "head")
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT price_satang FROM fuelprice").all()
+    assert [r[0] for r in rows] == [4000]
+    insp = sqlalchemy.inspect(engine)
+    index = next(
+        i
+        for i in insp.get_indexes("fuelprice")
+        if i["name"] == "ix_fuelprice_date_station_fuel_type"
+    )
+    assert index["unique"]
+
+
+def test_legacy_price_index_made_unique_on_open(tmp_path: Path) -> None:
+    from datetime import date
+
+    from sqlmodel import Session
+
+    from src.services import StorageService
+    from src.services.oil_service import backfill_prices
+
+    db = tmp_path / "legacy.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    # A file created before 0009 and later stamped to head keeps the
+    # non-unique index and any duplicate prices.
+    command.upgrade(cfg, "0008")
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        for price in (40, 41):
+            conn.exec_driver_sql(
+                "INSERT INTO fuelprice (date, station, fuel_type, name_th, price) "
+                f"VALUES ('2024-01-01', 'ptt', 'e20', 'E20', {price})"
+            )
+
+    storage = StorageService(engine=engine)
+    payload = {"ptt": {"e20": {"name": "E20", "price": "42"}}}
+    with Session(storage.engine) as session:
+        inserted = backfill_prices(
+            session, {date(2024, 1, 1): payload, date(2024, 1, 2): payload}
+        )
+
+    assert inserted == 1
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT date, price_satang FROM fuelprice ORDER BY date"
+        ).all()
+    assert rows == [("2024-01-01", 4000), ("2024-01-02", 4200)]
+    index = next(
+        i
+        for i in sqlalchemy.inspect(engine).get_indexes("fuelprice")
+        if i["name"] == "ix_fuelprice_date_station_fuel_type"
+    )
+    assert index["unique"]
+    engine.dispose()
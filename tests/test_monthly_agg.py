@@ -0,0 +1,198 @@
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import sqlalchemy
+from alembic.config import Config
+from sqlmodel import Session, select
+
+from alembic import command
+from fueltracker import main
+from fueltracker.main import ALEMBIC_INI  # type: ignore
+from src.models import FuelEntry, FuelPrice, MonthlyAgg
+from src.services import StorageService
+from src.services.oil_service import update_missing_liters
+
+
+def _rows(storage: StorageService) -> list[tuple]:
+    with Session(storage.engine) as s:
+        rows = s.exec(
+            select(MonthlyAgg).order_by(
+                MonthlyAgg.vehicle_id, MonthlyAgg.month, MonthlyAgg.fuel_type
+            )
+        ).all()
+        columns = MonthlyAgg.__table__.columns.keys()  # type: ignore[attr-defined]
+        return [tuple(getattr(r, c) for c in columns) for r in rows]
+
+
+def _assert_matches_rebuild(storage: StorageService) -> None:
+    incremental = _rows(storage)
+    storage.rebuild_monthly_agg()
+    assert incremental == _rows(storage)
+
+
+def test_add_entry_backfill_updates_previous_month(
+    in_memory_storage, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    vid = add_vehicle(storage)
+    storage.add_entry(
+        FuelEntry(
+            entry_date=date(2024, 1, 30),
+            vehicle_id=vid,
+            fuel_type="e20",
+            odo_before=1000,
+            amount_spent=500,
+            liters=12.5,
+        )
+    )
+    assert storage.monthly_totals() == []
+    assert storage.get_vehicle_stats(vid) == (0.0, 0.0, 0.0)
+
+    storage.add_entry(
+        FuelEntry(
+            entry_date=date(2024, 2, 2),
+            vehicle_id=vid,
+            fuel_type="e20",
+            odo_before=1300,
+            amount_spent=600,
+            liters=15,
+        )
+    )
+
+    assert storage.monthly_totals() == [("2024-01", 300.0, 12.5, 500.0)]
+    assert storage.vehicle_monthly_stats(vid, 2024, 2) == (0.0, 15.0, 600.0)
+    assert storage.get_total_spent(vid, 2024, 1) == 500.0
+    assert storage.get_overall_totals() == (300.0, 12.5, 1100.0)
+    _assert_matches_rebuild(storage)
+
+
+def test_update_and_delete_keep_totals(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    vid = add_vehicle(storage)
+    for i, fuel in enumerate(("e20", None, "e20")):
+        storage.add_entry(
+            FuelEntry(
+                entry_date=date(2024, 3, 1 + i),
+                vehicle_id=vid,
+                fuel_type=fuel,
+                odo_before=100 * i,
+                odo_after=100 * i + 90,
+                amount_spent=100.1,
+                liters=3.3,
+            )
+        )
+    entries = storage.list_entries()
+    entries[0].entry_date = date(2024, 4, 1)
+    entries[0].fuel_type = "diesel"
+    storage.update_entry(entries[0])
+    storage.delete_entry(entries[1].id)
+    _assert_matches_rebuild(storage)
+    assert [r[:3] for r in _rows(storage)] == [
+        (vid, "2024-03", "e20"),
+        (vid, "2024-04", "diesel"),
+    ]
+    assert storage.get_total_spent(vid, 2024, 3) == 100.1
+
+    storage.delete_entry(entries[0].id)
+    storage.delete_entry(entries[2].id)
+    assert _rows(storage) == []
+
+
+def test_bulk_and_set_based_updates_are_counted(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    vid = add_vehicle(storage)
+    day = date(2024, 6, 1)
+    with Session(storage.engine) as s:
+        s.add(
+            FuelPrice(
+                date=day,
+                station="ptt",
+                fuel_type="e20",
+                name_th="E20",
+                price=Decimal(40),
+            )
+        )
+        s.commit()
+    storage.add_entries_bulk(
+        FuelEntry(
+            entry_date=day,
+            vehicle_id=vid,
+            fuel_type="e20",
+            odo_before=100 * i,
+            amount_spent=80,
+        )
+        for i in range(3)
+    )
+    with Session(storage.engine) as s:
+        for entry in s.exec(select(FuelEntry)):
+            entry.liters = None
+            s.add(entry)
+        s.commit()
+        assert update_missing_liters(s) == 3
+
+    assert storage.monthly_totals() == [("2024-06", 200.0, 4.0, 160.0)]
+    _assert_matches_rebuild(storage)
+
+
+def test_install_fills_table_for_existing_database(tmp_path: Path, add_vehicle) -> None:
+    db = tmp_path / "old.db"
+    storage = StorageService(db_path=db, password="")
+    vid = add_vehicle(storage)
+    storage.add_entry(
+        FuelEntry(
+            entry_date=date(2024, 5, 5),
+            vehicle_id=vid,
+            odo_before=0,
+            odo_after=50,
+            amount_spent=200,
+            liters=5,
+        )
+    )
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TRIGGER trg_monthly_agg_insert")
+        conn.exec_driver_sql("DROP TABLE monthly_agg")
+    storage.engine.dispose()
+
+    reopened = StorageService(db_path=db, password="")
+    assert reopened.monthly_totals() == [("2024-05", 50.0, 5.0, 200.0)]
+    reopened.engine.dispose()
+
+
+def test_migration_backfills_existing_entries(tmp_path: Path) -> None:
+    db = tmp_path / "m.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    command.upgrade(cfg, "0009")
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO fuelentry (entry_date, vehicle_id, odo_before, odo_after, "
+            "amount_spent, liters) VALUES ('2024-01-05', 1, 0, 120, 300, 7.5)"
+        )
+
+    command.upgrade(cfg, "head")
+
+    storage = StorageService(engine=engine)
+    assert storage.monthly_totals() == [("2024-01", 120.0, 7.5, 300.0)]
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO fuelentry (entry_date, vehicle_id, odo_before, "
+            "amount_satang) VALUES ('2024-01-20', 1, 120, 10000)"
+        )
+    assert storage.get_total_spent(1, 2024, 1) == 400.0
+    command.downgrade(cfg, "0009")
+    assert "monthly_agg" not in sqlalchemy.inspect(engine).get_table_names()
+    engine.dispose()
+
+
+def test_rebuild_agg_command(monkeypatch, tmp_path) -> None:
+    called = []
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "db.sqlite"))
+    monkeypatch.setattr(
+        StorageService, "rebuild_monthly_agg", lambda self: called.append(self)
+    )
+
+    main.run(["rebuild-agg"])
+
+    assert len(called) == 1
@@ -0,0 +1,124 @@
+from datetime import date
+
+from src.models import FuelEntry
+
+
+def _entry(day: int, odo: float, vehicle_id: int = 1) -> FuelEntry:
+    return FuelEntry(
+        entry_date=date(2024, 1, day),
+        vehicle_id=vehicle_id,
+        odo_before=odo,
+        amount_spent=100.0,
+        liters=10.0,
+    )
+
+
+def _chain(storage, vehicle_id: int = 1) -> list[tuple[int, float, float | None]]:
+    return [
+        (e.entry_date.day, e.odo_before, e.odo_after)
+        for e in sorted(
+            storage.get_entries_by_vehicle(vehicle_id),
+            key=lambda e: (e.entry_date, e.id),
+        )
+    ]
+
+
+def test_back_dated_insert_and_edits(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    for day, odo in [(1, 0), (10, 300)]:
+        storage.add_entry(_entry(day, odo))
+    late = _entry(5, 150)
+    storage.add_entry(late)
+    assert late.odo_after == 300.0
+    assert _chain(storage) == [(1, 0, 150), (5, 150, 300), (10, 300, None)]
+
+    late.entry_date = date(2024, 1, 12)
+    late.odo_before = 400
+    storage.update_entry(late)
+    assert _chain(storage) == [(1, 0, 300), (10, 300, 400), (12, 400, None)]
+
+    # Deleting the latest entry reopens the one it closed.
+    storage.delete_entry(late.id)
+    assert _chain(storage) == [(1, 0, 300), (10, 300, None)]
+    # Distances in the monthly totals follow the chain.
+    assert storage.get_vehicle_stats(1) == (300.0, 10.0, 100.0)
+
+
+def test_update_moves_entry_between_vehicles(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    add_vehicle(storage)
+    for day, odo in [(1, 0), (2, 100), (3, 200)]:
+        storage.add_entry(_entry(day, odo))
+    storage.add_entry(_entry(1, 50, vehicle_id=2))
+
+    moved = storage.get_entries_by_vehicle(1)[1]
+    moved.vehicle_id = 2
+    storage.update_entry(moved)
+    assert _chain(storage, 1) == [(1, 0, 200), (3, 200, None)]
+    assert _chain(storage, 2) == [(1, 50, 100), (2, 100, None)]
+
+
+def test_rebuild_repairs_only_the_suffix(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    for day, odo in [(1, 0), (2, 100), (3, 200), (4, 300)]:
+        storage.add_entry(_entry(day, odo))
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE fuelentry SET odo_after = 999")
+        # Left by an entry that no longer follows the latest one.
+        conn.exec_driver_sql("UPDATE fuelentry SET odo_after = 10 WHERE id = 4")
+
+    assert storage.rebuild_odometer_chain(1, since=date(2024, 1, 3)) == 3
+    assert _chain(storage) == [
+        (1, 0, 999),
+        (2, 100, 200),
+        (3, 200, 300),
+        (4, 300, None),
+    ]
+    assert storage.rebuild_odometer_chain() == 1
+    assert storage.rebuild_odometer_chain() == 0
+    assert storage.get_vehicle_stats(1) == (300.0, 30.0, 300.0)
+
+
+def test_hand_entered_reading_on_latest_entry_is_kept(
+    in_memory_storage, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    storage.add_entry(_entry(1, 0))
+    last = _entry(2, 100)
+    last.odo_after = 180
+    storage.add_entry(last)
+    assert storage.rebuild_odometer_chain() == 0
+    assert _chain(storage) == [(1, 0, 100), (2, 100, 180)]
+
+
+def test_bulk_insert_chains_back_dated_rows(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    for day, odo in [(1, 0), (10, 300)]:
+        storage.add_entry(_entry(day, odo))
+    rows = [_entry(5, 150), _entry(12, 400)]
+    assert storage.add_entries_bulk(rows) == []
+    assert [r.odo_after for r in rows] == [300.0, None]
+    assert _chain(storage) == [
+        (1, 0, 150),
+        (5, 150, 300),
+        (10, 300, 400),
+        (12, 400, None),
+    ]
+
+
+def test_changes_inside_a_transaction_reach_loaded_entries(
+    in_memory_storage, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    with storage.transaction():
+        first = _entry(1, 0)
+        storage.add_entry(first)
+        storage.add_entry(_entry(2, 100))
+        assert first.odo_after == 100.0
+    assert first.odo_after == 100.0
@@ -5,6 +5,7 @@ import requests
 from PySide6.QtWidgets import QDialog
 from PySide6.QtCore import QTimer
 import pytest
+from sqlalchemy import event
 from sqlmodel import Session, select
 
 from src.services import oil_service
@@ -89,7 +90,7 @@ def test_autofill_liters(main_controller, monkeypatch):
         "src.controllers.main_controller.load_add_entry_dialog", fake_load
     )
     monkeypatch.setattr(
-        "src.controllers.main_controller.get_price", lambda *a, **k: Decimal("50")
+        "src.controllers.main_controller.get_price", lambda *a, **k: Decimal(50)
     )
 
     def fake_exec():
@@ -117,7 +118,7 @@ def test_amount_edit_triggers_autofill(main_controller, monkeypatch):
         "src.controllers.main_controller.load_add_entry_dialog", fake_load
     )
     monkeypatch.setattr(
-        "src.controllers.main_controller.get_price", lambda *a, **k: Decimal("50")
+        "src.controllers.main_controller.get_price", lambda *a, **k: Decimal(50)
     )
 
     def fake_exec():
@@ -147,7 +148,7 @@ def test_autofill_toggle_enables_edit(main_controller, monkeypatch):
         "src.controllers.main_controller.load_add_entry_dialog", fake_load
     )
     monkeypatch.setattr(
-        "src.controllers.main_controller.get_price", lambda *a, **k: Decimal("50")
+        "src.controllers.main_controller.get_price", lambda *a, **k: Decimal(50)
     )
 
     def fake_exec():
@@ -223,7 +224,7 @@ def test_purge_old_prices(in_memory_storage):
                 station="ptt",
                 fuel_type="e20",
                 name_th="E20",
-                price=Decimal("40"),
+                price=Decimal(40),
             )
         )
         s.add(
@@ -232,7 +233,7 @@ def test_purge_old_prices(in_memory_storage):
                 station="ptt",
                 fuel_type="e20",
                 name_th="E20",
-                price=Decimal("41"),
+                price=Decimal(41),
             )
         )
         s.commit()
@@ -292,16 +293,16 @@ def test_get_price_fallback(in_memory_storage):
                 station="ptt",
                 fuel_type="e20",
                 name_th="E20",
-                price=Decimal("40"),
+                price=Decimal(40),
             )
         )
         s.commit()
 
         price = oil_service.get_price(s, "e20", "ptt", day2)
-        assert price == Decimal("40")
+        assert price == Decimal(40)
 
 
-def test_update_missing_liters_caches_prices(monkeypatch, in_memory_storage):
+def test_update_missing_liters_single_update(monkeypatch, in_memory_storage):
     day = date(2024, 6, 1)
     with Session(in_memory_storage.engine) as s:
         s.add(
@@ -315,7 +316,7 @@ def test_update_missing_liters_caches_prices(monkeypatch, in_memory_storage):
                 station="ptt",
                 fuel_type="e20",
                 name_th="E20",
-                price=Decimal("40"),
+                price=Decimal(40),
             )
         )
         s.commit()
@@ -349,10 +350,98 @@ def test_update_missing_liters_caches_prices(monkeypatch, in_memory_storage):
 
         monkeypatch.setattr(oil_service, "get_price", fake_get_price)
 
-        oil_service.update_missing_liters(s, station="ptt")
+        filled = oil_service.update_missing_liters(s, station="ptt")
 
-        assert len(calls) == 1
+        assert filled == 2
+        assert calls == []
         updated1 = s.get(FuelEntry, e1.id)
         updated2 = s.get(FuelEntry, e2.id)
         assert updated1.liters == pytest.approx(2.0)
         assert updated2.liters == pytest.approx(1.0)
+
+
+def test_update_missing_liters_uses_fallback_window(in_memory_storage):
+    with Session(in_memory_storage.engine) as s:
+        for day, price in ((date(2024, 6, 1), "40"), (date(2024, 6, 3), "50")):
+            s.add(
+                FuelPrice(
+                    date=day,
+                    station="ptt",
+                    fuel_type="e20",
+                    name_th="E20",
+                    price=Decimal(price),
+                )
+            )
+        days = [date(2024, 6, 2), date(2024, 6, 5), date(2024, 6, 20), date(2024, 5, 1)]
+        entries = [
+            FuelEntry(
+                entry_date=day,
+                vehicle_id=1,
+                odo_before=float(i),
+                amount_spent=100.0,
+            )
+            for i, day in enumerate(days)
+        ]
+        s.add_all(entries)
+        s.commit()
+
+        filled = oil_service.update_missing_liters(s, station="ptt")
+
+        assert filled == 2
+        liters = [s.get(FuelEntry, e.id).liters for e in entries]
+        expected = [oil_service.get_price(s, "e20", "ptt", day) for day in days]
+        assert liters == [2.5, 2.0, None, None]
+        assert expected[:2] == [Decimal(40), Decimal(50)]
+        assert expected[2:] == [None, None]
+
+
+def test_price_index_reloads_after_price_writes(in_memory_storage):
+    index = in_memory_storage.price_index
+    day = date(2024, 6, 1)
+    assert index.lookup("e20", "ptt", day) is None
+
+    with Session(in_memory_storage.engine) as s:
+        oil_service._parse_prices(
+            {"ptt": {"e20": {"name_th": "E20", "price": 44}}}, day, s
+        )
+        assert index.lookup("e20", "ptt", day) == Decimal(44)
+        assert index.lookup("e20", "ptt", day + timedelta(days=7)) == Decimal(44)
+        assert index.lookup("e20", "ptt", day + timedelta(days=8)) is None
+        assert index.lookup("e20", "ptt", day + timedelta(days=1), 0) is None
+
+        oil_service._parse_prices(
+            {"ptt": {"e20": {"name_th": "E20", "price": 46}}},
+            day + timedelta(days=40),
+            s,
+        )
+        oil_service.purge_old_prices(s, days=30)
+        assert index.lookup("e20", "ptt", day) is None
+
+
+def test_get_price_cached_between_writes(in_memory_storage):
+    day = date(2024, 6, 1)
+    with Session(in_memory_storage.engine) as s:
+        s.add(
+            FuelPrice(
+                date=day,
+                station="ptt",
+                fuel_type="e20",
+                name_th="E20",
+                price=Decimal(40),
+            )
+        )
+        s.commit()
+        assert oil_service.get_price(s, "e20", "ptt", day) == Decimal(40)
+
+        statements: list[str] = []
+
+        def _count(*args):
+            statements.append(args[2])
+
+        event.listen(in_memory_storage.engine, "before_cursor_execute", _count)
+        try:
+            for offset in range(5):
+                oil_service.get_price(s, "e20", "ptt", day + timedelta(days=offset))
+        finally:
+            event.remove(in_memory_storage.engine, "before_cursor_execute", _count)
+        assert not [q for q in statements if "fuelprice" in q]
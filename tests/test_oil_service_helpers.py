@@ -1,4 +1,8 @@
 from datetime import date
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
 from src.services import oil_service
@@ -29,3 +33,46 @@ def test_parse_prices_dedup(in_memory_storage):
         oil_service._parse_prices(data, day, s)
         rows_again = s.exec(select(FuelPrice)).all()
         assert len(rows_again) == 3
+
+
+def test_backfill_prices_single_transaction(in_memory_storage):
+    payloads = {
+        date(2024, 1, d): {
+            "ptt": {"e20": {"name_th": "E20", "price": 40 + d}},
+            "bcp": {"e20": {"name_th": "E20", "price": 41 + d}},
+        }
+        for d in range(1, 11)
+    }
+    commits: list[int] = []
+    event.listen(in_memory_storage.engine, "commit", lambda _c: commits.append(1))
+    with Session(in_memory_storage.engine) as s:
+        oil_service._parse_prices(payloads[date(2024, 1, 1)], date(2024, 1, 1), s)
+        commits.clear()
+
+        inserted = oil_service.backfill_prices(s, payloads)
+
+        assert inserted == 18
+        assert len(commits) == 1
+        assert len(s.exec(select(FuelPrice)).all()) == 20
+        first = s.exec(
+            select(FuelPrice).where(
+                FuelPrice.date == date(2024, 1, 1), FuelPrice.station == "ptt"
+            )
+        ).one()
+        assert first.price == 41
+
+
+def test_fuelprice_day_is_unique(in_memory_storage):
+    row = {
+        "date": date(2024, 1, 1),
+        "station": "ptt",
+        "fuel_type": "e20",
+        "name_th": "E20",
+        "price": 1,
+    }
+    with Session(in_memory_storage.engine) as s:
+        s.add(FuelPrice(**row))
+        s.commit()
+        s.add(FuelPrice(**row))
+        with pytest.raises(IntegrityError):
+            s.commit()
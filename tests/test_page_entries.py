@@ -0,0 +1,137 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+from src.models import FuelEntry
+from src.services import StorageService
+from src.services.storage_service import EntryFilter
+from src.views.entry_table_model import EntryTableModel
+
+START = date(2024, 1, 1)
+
+
+@pytest.fixture
+def storage(in_memory_storage, seed):
+    seed(
+        in_memory_storage,
+        ("Toyota Camry", "Honda Civic"),
+        [
+            {
+                "entry_date": START + timedelta(days=day),
+                "vehicle_id": vehicle_id,
+                "odo_before": day * 100,
+            }
+            for day in range(10)
+            for vehicle_id in (1, 2)
+        ],
+        amount_spent=400.0,
+        liters=10.0,
+    )
+    return in_memory_storage
+
+
+def _walk(storage: StorageService, limit: int, filters=None) -> list[FuelEntry]:
+    seen: list[FuelEntry] = []
+    key = None
+    while True:
+        page = storage.page_entries(key, limit, filters)
+        seen.extend(page)
+        if len(page) < limit:
+            return seen
+        key = (page[-1].entry_date, page[-1].id)
+
+
+def test_pages_cover_all_entries_newest_first(storage) -> None:
+    seen = _walk(storage, 3)
+
+    assert len(seen) == 20
+    keys = [(e.entry_date, e.id) for e in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 20
+
+
+def test_page_is_stable_when_newer_entries_arrive(storage) -> None:
+    first = storage.page_entries(limit=4)
+    key = (first[-1].entry_date, first[-1].id)
+    expected = storage.page_entries(key, 4)
+
+    storage.add_entry(
+        FuelEntry(entry_date=START + timedelta(days=30), vehicle_id=1, odo_before=1)
+    )
+
+    assert [e.id for e in storage.page_entries(key, 4)] == [e.id for e in expected]
+
+
+def test_filters(storage) -> None:
+    by_name = _walk(storage, 4, EntryFilter(text="civic"))
+    assert len(by_name) == 10
+    assert {e.vehicle_id for e in by_name} == {2}
+
+    since = _walk(storage, 4, EntryFilter(start=START + timedelta(days=8)))
+    assert len(since) == 4
+
+    assert _walk(storage, 4, EntryFilter(text="car", vehicle_id=1))
+    assert storage.page_entries(filters=EntryFilter(text="camry", vehicle_id=2)) == []
+    assert storage.page_entries(filters=EntryFilter(text="truck")) == []
+
+
+def test_pages_seek_through_indexes(storage, query_plans, plan_for) -> None:
+    key = (START + timedelta(days=5), 11)
+
+    plan = plan_for(query_plans(storage, lambda: storage.page_entries(key, 5)), "LIMIT")
+    assert "ix_fuelentry_entry_date (entry_date<?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+    plans = query_plans(
+        storage, lambda: storage.page_entries(key, 5, EntryFilter(text="Camry"))
+    )
+    plan = plan_for(plans, "LIMIT")
+    assert "ix_fuelentry_vehicle_date_id (vehicle_id=? AND entry_date<?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def _wait_for(qapp, condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the model"
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def test_model_fetches_pages_on_demand(qapp, storage) -> None:
+    model = EntryTableModel(storage, page_size=6)
+
+    assert model.rowCount() == 0
+    assert model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 6
+    assert model.data(model.index(0, 0)) == "2024-01-10"
+    assert model.data(model.index(0, 1)) in {"Toyota Camry", "Honda Civic"}
+    assert model.data(model.index(0, 2)) == "10.00 L"
+    assert model.data(model.index(0, 3)) == "40.00"
+    assert model.data(model.index(0, 4)) == "400.00"
+
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 20
+
+    model.set_filter(EntryFilter(text="Camry"))
+    assert model.rowCount() == 6
+    assert {model.data(model.index(r, 1)) for r in range(6)} == {"Toyota Camry"}
+
+
+def test_model_loads_off_thread_and_drops_stale_pages(qapp, storage) -> None:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        model = EntryTableModel(storage, executor, page_size=50)
+        model.set_filter(EntryFilter(text="Camry"))
+        model.set_filter(EntryFilter(text="Civic"))
+        assert model.rowCount() == 0
+
+        _wait_for(qapp, lambda: not model.loading)
+        qapp.processEvents()
+
+    assert model.rowCount() == 10
+    assert {model.data(model.index(r, 1)) for r in range(10)} == {"Honda Civic"}
+    assert not model.canFetchMore()
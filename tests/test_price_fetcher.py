@@ -0,0 +1,232 @@
+import asyncio
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from sqlmodel import Session, select
+
+from src.models import FuelPrice
+from src.services import oil_service
+from src.services.price_fetcher import CircuitBreaker, CircuitOpenError, PriceFetcher
+
+
+def _payload(thai_date: str, price: float) -> dict:
+    return {
+        "status": "success",
+        "response": {
+            "date": thai_date,
+            "stations": {"ptt": {"e20": {"name_th": "E20", "price": price}}},
+        },
+    }
+
+
+class _Stub:
+    """Tiny API server: ``routes`` maps a path to a payload."""
+
+    def __init__(self) -> None:
+        self.routes: dict[str, dict] = {}
+        self.fail_next = 0
+        self.status = 503
+        self.requests: list[tuple[str, str | None]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                stub.requests.append((self.path, self.headers.get("If-None-Match")))
+                if stub.fail_next:
+                    stub.fail_next -= 1
+                    self.send_response(stub.status)
+                    self.end_headers()
+                    return
+                payload = stub.routes.get(self.path)
+                if payload is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = json.dumps(payload).encode()
+                etag = f'"{hash(body)}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+
+@pytest.fixture
+def stub():
+    server = _Stub()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _fetcher(stub: _Stub, **kw) -> PriceFetcher:
+    kw.setdefault("backoff", 0)
+    return PriceFetcher(stub.base, session=requests.Session(), **kw)
+
+
+def test_conditional_get_returns_none_when_unchanged(stub) -> None:
+    stub.routes["/latest"] = _payload("1 มิถุนายน 2567", 40)
+    fetcher = _fetcher(stub)
+
+    assert fetcher.fetch_sync()["response"]["date"] == "1 มิถุนายน 2567"
+    fetcher.confirm(["latest"])
+    assert fetcher.fetch_sync() is None
+    assert stub.requests[0][1] is None
+    assert stub.requests[1][1] is not None
+
+    stub.routes["/latest"] = _payload("2 มิถุนายน 2567", 41)
+    assert fetcher.fetch_sync() is not None
+
+
+def test_unconfirmed_payload_is_downloaded_again(stub) -> None:
+    stub.routes["/latest"] = _payload("1 มิถุนายน 2567", 40)
+    fetcher = _fetcher(stub)
+
+    assert fetcher.fetch_sync() is not None
+    # Never stored, e.g. its transaction rolled back.
+    assert fetcher.fetch_sync() is not None
+    assert [etag for _, etag in stub.requests] == [None, None]
+
+
+def test_default_session_is_not_shared() -> None:
+    fetcher = PriceFetcher("http://example.invalid", max_connections=7)
+
+    assert fetcher.session is not oil_service._HTTP_SESSION
+    assert fetcher.session.get_adapter("https://x")._pool_maxsize == 7
+    assert oil_service._HTTP_SESSION.get_adapter("https://x")._pool_maxsize != 7
+
+
+def test_retries_transient_errors(stub) -> None:
+    stub.routes["/latest"] = _payload("1 มิถุนายน 2567", 40)
+    stub.fail_next = 2
+
+    assert _fetcher(stub, retries=2).fetch_sync() is not None
+    assert len(stub.requests) == 3
+
+
+def test_client_errors_are_not_retried(stub) -> None:
+    with pytest.raises(requests.HTTPError):
+        _fetcher(stub, retries=3).fetch_sync("missing")
+    assert len(stub.requests) == 1
+
+
+def test_circuit_breaker_opens_and_recovers(stub) -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_after=60, clock=lambda: now[0])
+    fetcher = _fetcher(stub, retries=0, breaker=breaker)
+    stub.routes["/latest"] = _payload("1 มิถุนายน 2567", 40)
+    stub.fail_next = 2
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            fetcher.fetch_sync()
+    with pytest.raises(CircuitOpenError):
+        fetcher.fetch_sync()
+    assert len(stub.requests) == 2
+
+    now[0] = 61
+    assert fetcher.fetch_sync() is not None
+    assert not breaker.is_open
+
+
+def test_cancelled_trial_call_releases_the_circuit(stub) -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_after=60, clock=lambda: now[0])
+    fetcher = _fetcher(stub, retries=0, breaker=breaker)
+    stub.routes["/latest"] = _payload("1 มิถุนายน 2567", 40)
+    stub.fail_next = 1
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch_sync()
+    now[0] = 61
+
+    def cancelled_get(_url: str):
+        raise asyncio.CancelledError
+
+    fetcher._get = cancelled_get
+    with pytest.raises(asyncio.CancelledError):
+        fetcher.fetch_sync()
+    del fetcher._get
+
+    assert fetcher.fetch_sync() is not None
+    assert not breaker.is_open
+
+
+def test_fetch_history_runs_concurrently(stub) -> None:
+    days = [date(2024, 6, d) for d in range(1, 6)]
+    for day in days:
+        stub.routes[f"/history/{day:%Y-%m-%d}"] = _payload(
+            f"{day.day} มิถุนายน 2567", 40 + day.day
+        )
+    fetcher = _fetcher(stub, max_connections=3)
+
+    payloads = asyncio.run(fetcher.fetch_history([*days, date(2024, 7, 1)]))
+
+    assert sorted(payloads) == days
+    assert len(stub.requests) == 6
+
+
+def test_fetch_latest_skips_unchanged_payload(
+    stub, in_memory_storage, monkeypatch
+) -> None:
+    stub.routes["/latest"] = _payload("1 มิถุนายน 2567", 40)
+    fetcher = _fetcher(stub)
+    calls: list[date] = []
+    orig = oil_service._parse_prices
+
+    def spy(data, day, session):
+        calls.append(day)
+        orig(data, day, session)
+
+    monkeypatch.setattr(oil_service, "_parse_prices", spy)
+    with Session(in_memory_storage.engine) as s:
+        oil_service.fetch_latest(s, fetcher=fetcher)
+        oil_service.fetch_latest(s, fetcher=fetcher)
+        assert calls == [date(2024, 6, 1)]
+        assert len(s.exec(select(FuelPrice)).all()) == 1
+
+
+def test_backfill_from_api(stub, in_memory_storage) -> None:
+    days = [date(2024, 6, d) for d in range(1, 4)]
+    for day in days:
+        stub.routes[f"/history/{day:%Y-%m-%d}"] = _payload(
+            f"{day.day} มิถุนายน 2567", 40 + day.day
+        )
+    with Session(in_memory_storage.engine) as s:
+        inserted = oil_service.backfill_from_api(s, days, _fetcher(stub))
+        assert inserted == 3
+        prices = {p.date: p.price for p in s.exec(select(FuelPrice))}
+    assert prices == {day: 40 + day.day for day in days}
+
+
+def test_fetch_latest_confirms_validators_after_commit(stub, in_memory_storage) -> None:
+    stub.routes["/latest"] = _payload("1 มิถุนายน 2567", 40)
+    fetcher = _fetcher(stub)
+    storage = in_memory_storage
+
+    with pytest.raises(RuntimeError), storage.transaction() as s:
+        oil_service.fetch_latest(s, fetcher=fetcher)
+        raise RuntimeError("rolled back")
+    with storage.transaction() as s:
+        oil_service.fetch_latest(s, fetcher=fetcher)
+        assert stub.requests[-1][1] is None
+    with Session(storage.engine) as s:
+        oil_service.fetch_latest(s, fetcher=fetcher)
+        assert len(s.exec(select(FuelPrice)).all()) == 1
+    assert stub.requests[-1][1] is not None
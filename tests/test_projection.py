@@ -0,0 +1,89 @@
+from datetime import date
+
+import pytest
+
+from src.services import ReportService, date_ranges
+from src.services.export_service import ExportService
+
+
+@pytest.fixture
+def storage(in_memory_storage, seed):
+    seed(
+        in_memory_storage,
+        ("a", ("b", "van")),
+        [
+            {"entry_date": date(2024, 1, 31), "vehicle_id": 1, "odo_before": 100},
+            {"entry_date": date(2024, 2, 1), "vehicle_id": 2, "odo_before": 500},
+            {"entry_date": date(2024, 2, 3), "vehicle_id": 1, "odo_before": 200},
+            {"entry_date": date(2024, 2, 10), "vehicle_id": 1, "odo_before": 300},
+        ],
+        fuel_type="e20",
+        amount_spent=350,
+        liters=10,
+    )
+    return in_memory_storage
+
+
+def test_tuples_follow_columns_and_ranges(storage) -> None:
+    rows = storage.project_entries(
+        ("odo_before", "entry_date"), *date_ranges.month_range(2024, 2)
+    )
+    assert rows == [
+        (500.0, date(2024, 2, 1)),
+        (200.0, date(2024, 2, 3)),
+        (300.0, date(2024, 2, 10)),
+    ]
+    assert all(type(r) is tuple for r in rows)
+    # Open bounds and a vehicle filter; the earlier entry got its odo_after.
+    assert storage.project_entries(("id", "odo_after"), vehicle_ids=[1]) == [
+        (1, 200.0),
+        (3, 300.0),
+        (4, None),
+    ]
+    assert storage.project_entries(("id",), end=date(2024, 2, 1)) == [(1,)]
+    assert storage.project_entries(("id",), vehicle_ids=[]) == []
+    with pytest.raises(ValueError, match="price"):
+        storage.project_entries(("id", "price"))
+    with pytest.raises(ValueError):
+        storage.project_entries(())
+
+
+def test_projection_uses_the_date_indexes(storage, query_plans, plan_for) -> None:
+    plans = query_plans(
+        storage,
+        lambda: storage.project_entries(
+            ("entry_date", "liters"), *date_ranges.month_range(2024, 2), [1]
+        ),
+    )
+    plan = plan_for(plans, "entry_date >=")
+    assert "ix_fuelentry_vehicle_date_id (vehicle_id=? AND entry_date>? AND" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_report_and_export_frames(storage) -> None:
+    df = ReportService(storage)._monthly_df(date(2024, 2, 1), None)
+    assert list(df["vehicle"]) == ["b", "a", "a"]
+    assert df["distance"].iloc[1] == 100.0
+    assert df["distance"].isna().iloc[2]
+    assert df["km_per_l"].iloc[1] == pytest.approx(10.0)
+    assert list(df["weekday"]) == ["Thu", "Sat", "Sat"]
+    assert (
+        ReportService(storage).get_monthly_stats(date(2024, 2, 1), 1)["fills_count"]
+        == 2
+    )
+
+    export = ExportService(storage)._month_df(2024, 2, 1)
+    assert list(export.columns) == [
+        "date",
+        "vehicle_id",
+        "fuel_type",
+        "odo_before",
+        "odo_after",
+        "distance",
+        "liters",
+        "amount_spent",
+    ]
+    assert export["distance"].iloc[0] == 100.0
+    assert export["distance"].isna().iloc[1]
+    empty = ExportService(storage)._month_df(2023, 1)
+    assert empty.empty and "distance" in empty.columns
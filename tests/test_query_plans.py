@@ -0,0 +1,166 @@
+"""``EXPLAIN QUERY PLAN`` checks for the hot queries.
+
+Each test records the SQL a storage call sends and asserts SQLite plans it
+with the intended index, so a changed query or a dropped index fails here
+instead of silently turning into a table scan.
+"""
+
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import sqlalchemy
+from alembic.config import Config
+from sqlmodel import Session
+
+from alembic import command
+from fueltracker.main import ALEMBIC_INI  # type: ignore
+from src.models import FuelEntry, FuelPrice
+from src.services import StorageService
+from src.services.oil_service import get_price, update_missing_liters
+
+NEW_INDEXES = {
+    "fuelentry": {
+        "ix_fuelentry_vehicle_date_id",
+        "ix_fuelentry_missing_liters",
+        "ix_fuelentry_fuel_type_liters",
+    },
+    "fuelprice": {"ix_fuelprice_station_fuel_type_date"},
+}
+
+
+@pytest.fixture
+def storage(in_memory_storage, seed):
+    seed(
+        in_memory_storage,
+        entries=[
+            {"entry_date": date(2024, 1, day), "odo_before": day * 100}
+            for day in range(1, 6)
+        ],
+        vehicle_id=1,
+        fuel_type="e20",
+        amount_spent=500,
+        liters=12.5,
+    )
+    return in_memory_storage
+
+
+def test_bulk_insert_rechains_only_the_tail(storage, query_plans, plan_for) -> None:
+    plans = query_plans(
+        storage,
+        lambda: storage.add_entries_bulk(
+            [FuelEntry(entry_date=date(2024, 1, 9), vehicle_id=1, odo_before=900)]
+        ),
+    )
+    plan = plan_for(plans, "LEAD(")
+    assert "ix_fuelentry_vehicle_date_id (vehicle_id=? AND entry_date>?)" in plan
+    assert "SCAN f" not in plan
+
+
+def test_add_entry_rechains_only_the_tail(storage, query_plans, plan_for) -> None:
+    plans = query_plans(
+        storage,
+        lambda: storage.add_entry(
+            FuelEntry(entry_date=date(2024, 1, 9), vehicle_id=1, odo_before=900)
+        ),
+    )
+    plan = plan_for(plans, "LEAD(")
+    assert "ix_fuelentry_vehicle_date_id (vehicle_id=? AND entry_date>?)" in plan
+    assert "ix_fuelentry_vehicle_date_id (vehicle_id=? AND entry_date<?)" in plan
+    assert "SCAN f" not in plan
+
+
+def test_last_entry_and_month_use_composite_index(
+    storage, query_plans, plan_for
+) -> None:
+    plan = plan_for(query_plans(storage, lambda: storage.get_last_entry(1)), "ORDER BY")
+    assert "ix_fuelentry_vehicle_date_id (vehicle_id=?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+    plans = query_plans(storage, lambda: storage.list_entries_for_month(2024, 1, 1))
+    plan = plan_for(plans, "entry_date >=")
+    assert "ix_fuelentry_vehicle_date_id (vehicle_id=? AND entry_date>? AND" in plan
+    assert "TEMP B-TREE" not in plan
+
+    plans = query_plans(
+        storage, lambda: storage.entries_between(date(2024, 1, 1), date(2024, 4, 1))
+    )
+    plan = plan_for(plans, "entry_date >=")
+    assert "ix_fuelentry_entry_date (entry_date>? AND entry_date<?)" in plan
+
+
+def test_aggregates_use_covering_and_primary_key_indexes(
+    storage, query_plans, plan_for
+) -> None:
+    plans = query_plans(storage, storage.liters_by_fuel_type)
+    assert "COVERING INDEX ix_fuelentry_fuel_type_liters" in plan_for(plans, "GROUP BY")
+
+    plans = query_plans(storage, lambda: storage.get_total_spent(1, 2024, 1))
+    plan = plan_for(plans, "monthly_agg")
+    assert "sqlite_autoindex_monthly_agg_1 (vehicle_id=? AND month=?)" in plan
+
+
+def test_price_lookups_use_covering_index(storage, query_plans, plan_for) -> None:
+    with storage.transaction() as session:
+        session.add(
+            FuelPrice(
+                date=date(2024, 1, 1),
+                station="ptt",
+                fuel_type="e20",
+                name_th="E20",
+                price=Decimal(40),
+            )
+        )
+        session.flush()
+        plans = query_plans(
+            storage, lambda: get_price(session, "e20", "ptt", date(2024, 1, 3))
+        )
+    plan = plan_for(plans, "FROM fuelprice", "LIMIT")
+    assert (
+        "COVERING INDEX ix_fuelprice_station_fuel_type_date "
+        "(station=? AND fuel_type=? AND date>? AND date<?)"
+    ) in plan
+
+    with Session(storage.engine) as session:
+        plans = query_plans(storage, lambda: update_missing_liters(session))
+    plan = plan_for(plans, "UPDATE fuelentry")
+    assert "SCAN fuelentry USING INDEX ix_fuelentry_missing_liters" in plan
+    assert "COVERING INDEX ix_fuelprice_station_fuel_type_date" in plan
+
+
+def test_migration_adds_indexes(tmp_path: Path) -> None:
+    db = tmp_path / "m.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    command.upgrade(cfg, "head")
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+
+    def names(table: str) -> set[str]:
+        return {i["name"] for i in sqlalchemy.inspect(engine).get_indexes(table)}
+
+    for table, expected in NEW_INDEXES.items():
+        assert expected <= names(table)
+    command.downgrade(cfg, "0011")
+    for table, expected in NEW_INDEXES.items():
+        assert not expected & names(table)
+    engine.dispose()
+
+
+def test_storage_installs_missing_indexes(tmp_path: Path) -> None:
+    db = tmp_path / "old.db"
+    StorageService(db_path=db, password="").close()
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        for names in NEW_INDEXES.values():
+            for name in names:
+                conn.exec_driver_sql(f"DROP INDEX {name}")
+    engine.dispose()
+
+    StorageService(db_path=db, password="").close()
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    insp = sqlalchemy.inspect(engine)
+    for table, expected in NEW_INDEXES.items():
+        assert expected <= {i["name"] for i in insp.get_indexes(table)}
+    engine.dispose()
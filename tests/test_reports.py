@@ -238,7 +238,7 @@ def test_calc_overall_stats_large(in_memory_storage):
             FuelEntry(
                 entry_date=day + timedelta(days=100 + i),
                 vehicle_id=1,
-                odo_before=0,
+                odo_before=500.0,
                 odo_after=None,
                 amount_spent=30.0,
                 liters=3.0,
@@ -249,7 +249,7 @@ def test_calc_overall_stats_large(in_memory_storage):
     service = ReportService(storage)
     stats = service.calc_overall_stats()
     assert stats["total_distance"] == total_distance
-    # all but the last distance-only entry have odo_after filled to 0 by
+    # all but the last distance-only entry have odo_after filled to 500 by
     # add_entry(), so their liters count toward the total
     total_liters += 9 * 3.0
     assert stats["total_liters"] == total_liters
@@ -266,8 +266,8 @@ def test_monthly_summary_large(in_memory_storage):
             e = FuelEntry(
                 entry_date=d,
                 vehicle_id=1,
-                odo_before=i * 100 + (m - 1) * 1000,
-                odo_after=i * 100 + (m - 1) * 1000 + 100,
+                odo_before=(i + (m - 1) * 3) * 100,
+                odo_after=(i + (m - 1) * 3) * 100 + 100,
                 liters=10.0,
                 amount_spent=25.0,
             )
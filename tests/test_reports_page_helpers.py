@@ -1,7 +1,7 @@
 from datetime import date
 import pandas as pd
 from PySide6.QtWidgets import QApplication
-from src.views.reports_page import _Worker, ReportsPage
+from src.views.reports_page import _Worker
 from src.services.report_service import ReportService
 from src.models import Vehicle, FuelEntry
 
@@ -18,8 +18,17 @@ class DummyStorage:
     def get_total_spent(self, vid, year, month):
         return self.spent.get((vid, year, month), 0.0)
 
-    def get_entries_by_vehicle(self, vid):
-        return self.entries.get(vid, [])
+    def to_frame(self, start=None, end=None, vehicle_ids=None):
+        rows = [e for entries in self.entries.values() for e in entries]
+        return pd.DataFrame(
+            {
+                "date": pd.to_datetime([e.entry_date for e in rows]),
+                "vehicle_id": [e.vehicle_id for e in rows],
+                "odo_after": [e.odo_after for e in rows],
+                "distance": [e.odo_after - e.odo_before for e in rows],
+                "liters": [e.liters for e in rows],
+            }
+        )
 
 class DummyService(ReportService):
     def __init__(self):
@@ -46,29 +55,25 @@ def test_weekly_empty():
     assert list(result.columns) == ['Mon','Tue','Wed','Thu','Fri','Sat','Sun']
 
 
-def test_budget_remaining_specific(qtbot):
-    service = DummyService()
-    service.storage.vehicles = [Vehicle(id=1, name='v1', vehicle_type='t', license_plate='x', tank_capacity_liters=1)]
-    service.storage.budgets[1] = 100.0
-    service.storage.spent[(1,2024,5)] = 60.0
-    page = ReportsPage(service)
-    qtbot.addWidget(page)
-    remain = page._budget_remaining(date(2024,5,1), 1)
-    assert remain == 40.0
+def _budget_storage(storage):
+    for plate in ('x', 'y'):
+        storage.add_vehicle(Vehicle(name=plate, vehicle_type='t', license_plate=plate, tank_capacity_liters=1))
+    storage.set_budget(1, 100.0)
+    storage.set_budget(2, 200.0)
+    for vid, amount in [(1, 80.0), (2, 20.0)]:
+        storage.add_entry(FuelEntry(entry_date=date(2024, 5, 3), vehicle_id=vid, odo_before=0, amount_spent=amount, liters=1))
+    return ReportService(storage)
 
 
-def test_budget_remaining_all(qtbot):
-    service = DummyService()
-    service.storage.vehicles = [
-        Vehicle(id=1, name='v1', vehicle_type='t', license_plate='x', tank_capacity_liters=1),
-        Vehicle(id=2, name='v2', vehicle_type='t', license_plate='y', tank_capacity_liters=1)
-    ]
-    service.storage.budgets = {1:100.0, 2:200.0}
-    service.storage.spent = {(1,2024,5):80.0, (2,2024,5):20.0}
-    page = ReportsPage(service)
-    qtbot.addWidget(page)
-    remain = page._budget_remaining(date(2024,5,1), None)
-    assert remain == 200.0
+def test_budget_remaining_specific(in_memory_storage):
+    worker = _Worker(_budget_storage(in_memory_storage), 1)
+    assert worker._budget_remaining(date(2024, 5, 1)) == 20.0
+
+
+def test_budget_remaining_all(in_memory_storage):
+    worker = _Worker(_budget_storage(in_memory_storage), None)
+    assert worker._budget_remaining(date(2024, 5, 1)) == 200.0
+    assert worker._budget_remaining(date(2024, 6, 1)) == 300.0
 
 
 def test_monthly_chart_specific(qtbot):
@@ -0,0 +1,107 @@
+from datetime import date
+
+from sqlmodel import Session, select
+
+from src.models import FuelPrice
+from src.services import oil_service
+from src.services.response_cache import ResponseCache
+
+URL = "http://test/api/latest"
+
+
+def _payload(thai_date: str, price: float, pad: str = "") -> dict:
+    return {
+        "status": "success",
+        "pad": pad,
+        "response": {
+            "date": thai_date,
+            "stations": {"ptt": {"e20": {"name_th": "E20", "price": price}}},
+        },
+    }
+
+
+def test_get_respects_ttl(tmp_path) -> None:
+    now = [1000.0]
+    cache = ResponseCache(tmp_path, ttl=60, clock=lambda: now[0])
+    day = date(2024, 6, 1)
+    cache.put(URL, _payload("1 มิถุนายน 2567", 40), day=day)
+
+    assert cache.get(URL, day=day)["response"]["date"] == "1 มิถุนายน 2567"
+    assert cache.get(URL, day=date(2024, 6, 2)) is None
+    now[0] += 61
+    assert cache.get(URL, day=day) is None
+    assert cache.get(URL, day=day, max_age=float("inf")) is not None
+
+
+def test_identical_payloads_share_one_object(tmp_path) -> None:
+    cache = ResponseCache(tmp_path)
+    payload = _payload("1 มิถุนายน 2567", 40)
+    first = cache.put(URL, payload, day=date(2024, 6, 1))
+    second = cache.put(URL, dict(payload), day=date(2024, 6, 2))
+
+    assert first == second
+    assert len(list((tmp_path / "objects").glob("*.json"))) == 1
+
+
+def test_oldest_entries_evicted_over_size(tmp_path) -> None:
+    now = [0.0]
+    cache = ResponseCache(tmp_path, max_bytes=2500, clock=lambda: now[0])
+    for d in range(1, 6):
+        now[0] += 1
+        cache.put(
+            URL, _payload(f"{d} มิถุนายน 2567", 40 + d, "x" * 1000), date(2024, 6, d)
+        )
+
+    objects = list((tmp_path / "objects").glob("*.json"))
+    assert len(objects) == 2
+    assert sum(p.stat().st_size for p in objects) <= 2500
+    assert cache.get(URL, date(2024, 6, 1), max_age=float("inf")) is None
+    assert cache.get(URL, date(2024, 6, 5)) is not None
+
+
+def test_fetch_latest_serves_fresh_cache(tmp_path, monkeypatch, in_memory_storage):
+    calls: list[str] = []
+
+    def fake_get(url, **_kw):
+        calls.append(url)
+
+        class R:
+            def raise_for_status(self) -> None:
+                pass
+
+            def json(self):
+                return _payload("1 มิถุนายน 2567", 40)
+
+        return R()
+
+    monkeypatch.setattr(oil_service._HTTP_SESSION, "get", fake_get)
+    cache = ResponseCache(tmp_path)
+    with Session(in_memory_storage.engine) as s:
+        oil_service.fetch_latest(s, api_base="http://test/api", cache=cache)
+        oil_service.fetch_latest(s, api_base="http://test/api", cache=cache)
+        assert len(s.exec(select(FuelPrice)).all()) == 1
+    assert calls == [URL]
+
+
+def test_replay_rebuilds_prices_offline(tmp_path, in_memory_storage) -> None:
+    now = [0.0]
+    cache = ResponseCache(tmp_path, clock=lambda: now[0])
+    for d, price in ((1, 40), (2, 41), (2, 42)):
+        now[0] += 1
+        cache.put(URL, _payload(f"{d} มิถุนายน 2567", price), date(2024, 6, d))
+
+    with Session(in_memory_storage.engine) as s:
+        s.add(
+            FuelPrice(
+                date=date(2024, 5, 1),
+                station="ptt",
+                fuel_type="e20",
+                name_th="E20",
+                price=30,
+            )
+        )
+        s.commit()
+
+        assert oil_service.replay_cached_prices(s, cache, clear=True) == 2
+        prices = {p.date: p.price for p in s.exec(select(FuelPrice))}
+    assert prices == {date(2024, 6, 1): 40, date(2024, 6, 2): 42}
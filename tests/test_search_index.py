@@ -0,0 +1,151 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+import sqlalchemy
+from alembic.config import Config
+
+from alembic import command
+from fueltracker.main import ALEMBIC_INI  # type: ignore
+from src.models import FuelEntry, Maintenance
+from src.services import StorageService
+from src.services.storage_service import EntryFilter
+
+
+@pytest.fixture
+def fleet(add_vehicle):
+    """Return a helper adding three vehicles and two maintenances in Thai."""
+
+    def fleet(storage: StorageService) -> tuple[int, int, int]:
+        pickup = add_vehicle(storage, "รถกระบะโตโยต้า", "pickup", "กข 1234")
+        camry = add_vehicle(storage, "Toyota Camry", license_plate="1กก 5678")
+        wave = add_vehicle(storage, "Honda Wave", "motorcycle", "ขค 9012")
+        storage.add_maintenance(
+            Maintenance(vehicle_id=pickup, name="เปลี่ยนน้ำมันเครื่อง", note="ใช้ 5W-30")
+        )
+        storage.add_maintenance(
+            Maintenance(vehicle_id=camry, name="Brake pads", note="โตโยต้าศูนย์บางนา")
+        )
+        return pickup, camry, wave
+
+    return fleet
+
+
+def _hits(storage: StorageService, query: str) -> list[tuple[str, int]]:
+    return [(h.kind, h.id) for h in storage.search(query)]
+
+
+def test_thai_prefix_and_substring(in_memory_storage, fleet) -> None:
+    storage = in_memory_storage
+    pickup, camry, _wave = fleet(storage)
+
+    assert _hits(storage, "รถกระ") == [("vehicle", pickup)]
+    # Thai has no spaces; any run inside the name matches.
+    assert _hits(storage, "โตโยต้า") == [("vehicle", pickup), ("maintenance", 2)]
+    assert _hits(storage, "น้ำมัน") == [("maintenance", 1)]
+    assert storage.search("น้ำมัน")[0].vehicle_id == pickup
+    assert _hits(storage, "toyo") == [("vehicle", camry)]
+
+
+def test_plates_short_terms_and_ranking(in_memory_storage, add_vehicle, fleet) -> None:
+    storage = in_memory_storage
+    pickup, camry, wave = fleet(storage)
+
+    assert _hits(storage, "กข 1234") == [("vehicle", pickup)]
+    assert _hits(storage, "5678") == [("vehicle", camry)]
+    assert _hits(storage, "ขค") == [("vehicle", wave)]
+    assert _hits(storage, "motor") == [("vehicle", wave)]
+    assert _hits(storage, "5w-30") == [("maintenance", 1)]
+    assert _hits(storage, "") == []
+    assert _hits(storage, 'x" OR "') == []
+
+    other = add_vehicle(storage, "Old Honda", license_plate="zz")
+    # Names starting with the first term come first.
+    assert _hits(storage, "honda") == [("vehicle", wave), ("vehicle", other)]
+
+
+def test_triggers_follow_writes(in_memory_storage, fleet) -> None:
+    storage = in_memory_storage
+    pickup, camry, _wave = fleet(storage)
+
+    vehicle = storage.get_vehicle(camry)
+    vehicle.name = "Toyota Yaris"
+    storage.update_vehicle(vehicle)
+    assert _hits(storage, "camry") == []
+    assert _hits(storage, "yaris") == [("vehicle", camry)]
+
+    storage.delete_vehicle(pickup)
+    assert _hits(storage, "รถกระ") == []
+
+    task = storage.get_maintenance(2)
+    task.note = None
+    storage.update_maintenance(task)
+    assert _hits(storage, "บางนา") == []
+
+
+def test_entry_filters_use_the_index(
+    in_memory_storage, fleet, query_plans, plan_for
+) -> None:
+    storage = in_memory_storage
+    pickup, camry, _wave = fleet(storage)
+    for vid in (pickup, camry):
+        storage.add_entry(
+            FuelEntry(entry_date=date(2024, 1, 1), vehicle_id=vid, odo_before=1)
+        )
+
+    assert [e.vehicle_id for e in storage.list_entries_filtered("1234")] == [pickup]
+    page = storage.page_entries(filters=EntryFilter(text="กระบะ"))
+    assert [e.vehicle_id for e in page] == [pickup]
+
+    plans = query_plans(storage, lambda: storage.search("โตโยต้า"))
+    plan = plan_for(plans, "vehicle_fts MATCH")
+    assert "VIRTUAL TABLE INDEX" in plan
+
+
+def test_rebuild_and_like_fallback(tmp_path: Path, add_vehicle, fleet) -> None:
+    db = tmp_path / "fuel.db"
+    storage = StorageService(db_path=db, password="")
+    fleet(storage)
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TRIGGER trg_vehicle_fts_insert")
+        conn.exec_driver_sql("DELETE FROM vehicle_fts")
+    add_vehicle(storage, "Isuzu D-Max", license_plate="x")
+    assert _hits(storage, "isuzu") == []
+
+    storage.rebuild_search_index()
+    assert _hits(storage, "isuzu") == [("vehicle", 4)]
+
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE vehicle_fts")
+        conn.exec_driver_sql("DROP TABLE maintenance_fts")
+    # Without the FTS tables the same queries still work through LIKE.
+    assert _hits(storage, "isuzu") == [("vehicle", 4)]
+    assert _hits(storage, "น้ำมัน") == [("maintenance", 1)]
+    storage.close()
+
+    reopened = StorageService(db_path=db, password="")
+    assert _hits(reopened, "โตโยต้า") == [("vehicle", 1), ("maintenance", 2)]
+    reopened.close()
+
+
+def test_migration_adds_search_tables(tmp_path: Path) -> None:
+    db = tmp_path / "m.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    command.upgrade(cfg, "0012")
+    engine = sqlalchemy.create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO vehicle (name, vehicle_type, license_plate, "
+            "tank_capacity_liters) VALUES ('Nissan Almera', 'car', 'x', 1)"
+        )
+    command.upgrade(cfg, "head")
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT rowid FROM vehicle_fts WHERE vehicle_fts MATCH 'almera'"
+        ).all()
+    assert rows == [(1,)]
+    command.downgrade(cfg, "0012")
+    assert "vehicle_fts" not in sqlalchemy.inspect(engine).get_table_names()
+    engine.dispose()
@@ -0,0 +1,95 @@
+import sqlite3
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+from src.models import FuelEntry
+from src.services import StorageService
+from src.services.sqlite_profile import PROFILES, get_profile
+
+
+def _pragma(storage: StorageService, name: str):
+    with storage.engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def _entry(day: int) -> FuelEntry:
+    return FuelEntry(entry_date=date(2024, 1, day), vehicle_id=1, odo_before=day * 10)
+
+
+def test_default_profile_is_applied_to_connections(tmp_path) -> None:
+    storage = StorageService(db_path=tmp_path / "fuel.db", password="")
+    assert storage.profile is PROFILES["balanced"]
+    assert _pragma(storage, "journal_mode") == "wal"
+    assert _pragma(storage, "synchronous") == 1
+    assert _pragma(storage, "cache_size") == -16_384
+    assert _pragma(storage, "temp_store") == 2
+    assert _pragma(storage, "busy_timeout") == 5000
+    storage.close()
+
+
+def test_profile_from_environment(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("FT_DB_PROFILE", "legacy")
+    storage = StorageService(db_path=tmp_path / "fuel.db", password="")
+    assert _pragma(storage, "journal_mode") == "delete"
+    assert _pragma(storage, "synchronous") == 2
+    storage.close()
+
+
+def test_unknown_profile() -> None:
+    with pytest.raises(ValueError, match="legacy, balanced, durable"):
+        get_profile("turbo")
+
+
+def test_reader_does_not_block_writer(tmp_path, add_vehicle) -> None:
+    db = tmp_path / "fuel.db"
+    storage = StorageService(db_path=db, password="")
+    add_vehicle(storage)
+    storage.add_entry(_entry(1))
+    reader = sqlite3.connect(db)
+    reader.execute("BEGIN")
+    reader.execute("SELECT count(*) FROM fuelentry").fetchone()
+
+    storage.add_entry(_entry(2))
+
+    # The open read transaction still sees its snapshot.
+    assert reader.execute("SELECT count(*) FROM fuelentry").fetchone() == (1,)
+    reader.rollback()
+    reader.close()
+    storage.close()
+
+
+def test_periodic_checkpoint_and_close(tmp_path, add_vehicle) -> None:
+    db = tmp_path / "fuel.db"
+    profile = replace(PROFILES["balanced"], checkpoint_seconds=1e-9)
+    storage = StorageService(db_path=db, password="", profile=profile)
+    add_vehicle(storage)
+    storage.add_entry(_entry(1))
+    assert storage.pool_stats()["checkpoints"] >= 1
+
+    storage.add_entry(_entry(2))
+    storage.close()
+
+    wal = db.with_name("fuel.db-wal")
+    assert not wal.exists() or wal.stat().st_size == 0
+    reopened = StorageService(db_path=db, password="", profile="legacy")
+    assert len(reopened.list_entries()) == 2
+    reopened.close()
+
+
+def test_second_close_does_nothing(tmp_path, add_vehicle) -> None:
+    storage = StorageService(db_path=tmp_path / "fuel.db", password="")
+    add_vehicle(storage)
+    storage.add_entry(_entry(1))
+    storage.close()
+    connects = storage.pool_stats()["connects"]
+
+    storage.close()
+
+    assert storage.pool_stats()["connects"] == connects
+
+
+def test_close_leaves_given_engine_open(in_memory_storage) -> None:
+    in_memory_storage.close()
+    assert in_memory_storage.list_entries() == []
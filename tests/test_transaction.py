@@ -0,0 +1,218 @@
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.models import FuelEntry, FuelPrice, Maintenance
+from src.services import StorageService, oil_service
+from src.services.importer import ImportCancelled, Importer
+from src.services.oil_service import get_price
+from src.services.unit_of_work import transactional
+
+
+@pytest.fixture
+def commits():
+    """Record every ``COMMIT`` sent to the database."""
+    seen: list[Connection] = []
+
+    def count(conn: Connection) -> None:
+        seen.append(conn)
+
+    event.listen(Engine, "commit", count)
+    yield seen
+    event.remove(Engine, "commit", count)
+
+
+def _engine() -> Engine:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _entry(day: int, odo: float, **kw) -> FuelEntry:
+    return FuelEntry(entry_date=date(2024, 1, day), vehicle_id=1, odo_before=odo, **kw)
+
+
+def test_methods_share_one_commit(in_memory_storage, commits, add_vehicle) -> None:
+    storage = in_memory_storage
+    with storage.transaction():
+        vehicle_id = add_vehicle(storage)
+        first = _entry(1, 0, amount_spent=100, liters=2)
+        storage.add_entry(first)
+        storage.add_entry(_entry(2, 150))
+        storage.set_budget(1, 1000)
+        storage.add_maintenance(Maintenance(vehicle_id=1, name="Oil", due_odo=100))
+        # Reads inside the block see the pending writes.
+        assert storage.get_entry(first.id).odo_after == 150
+        assert storage.get_total_spent(1, 2024, 1) == 100
+
+    assert len(commits) == 1
+    assert vehicle_id == 1
+    assert first.odo_after == 150.0
+    assert len(storage.list_entries()) == 2
+    assert storage.get_budget(1) == 1000
+
+
+def test_exception_rolls_back_everything(in_memory_storage, add_vehicle) -> None:
+    storage = in_memory_storage
+    with pytest.raises(RuntimeError), storage.transaction():
+        add_vehicle(storage)
+        storage.add_entry(_entry(1, 0))
+        raise RuntimeError("boom")
+
+    assert storage.list_vehicles() == []
+    assert storage.list_entries() == []
+
+
+def test_nested_transaction_is_a_savepoint(
+    in_memory_storage, commits, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    with storage.transaction():
+        add_vehicle(storage)
+        with pytest.raises(ValueError), storage.transaction():
+            storage.add_entry(_entry(1, 0))
+            raise ValueError("bad row")
+        with storage.transaction():
+            storage.add_entry(_entry(2, 50))
+
+    assert len(commits) == 1
+    assert [e.entry_date.day for e in storage.list_entries()] == [2]
+
+
+def test_transactional_decorator(in_memory_storage, commits, add_vehicle) -> None:
+    storage = in_memory_storage
+
+    class Command:
+        def __init__(self) -> None:
+            self.storage = storage
+
+        @transactional
+        def add_two(self) -> None:
+            add_vehicle(storage)
+            storage.add_entry(_entry(1, 0))
+
+    Command().add_two()
+    assert len(commits) == 1
+    assert len(storage.list_entries()) == 1
+
+
+def test_without_refresh_objects_keep_flushed_state(
+    in_memory_storage, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    entry = _entry(1, 0)
+    with storage.transaction(refresh=False):
+        add_vehicle(storage)
+        storage.add_entry(entry)
+    assert entry.id is not None
+    assert entry.odo_before == 0
+
+
+def test_maintenance_counts_committed_entries(add_vehicle) -> None:
+    storage = StorageService(engine=_engine(), vacuum_threshold=2)
+    storage.incremental_vacuum()
+    with pytest.raises(RuntimeError), storage.transaction():
+        add_vehicle(storage)
+        for day in range(1, 4):
+            storage.add_entry(_entry(day, day * 10))
+        raise RuntimeError("boom")
+    assert not storage.maintenance_due
+
+    with storage.transaction():
+        add_vehicle(storage)
+        for day in range(1, 4):
+            storage.add_entry(_entry(day, day * 10))
+        assert not storage.maintenance_due
+    assert storage.maintenance_due
+
+
+def test_price_updater_and_lookup_join_transaction(
+    in_memory_storage, commits, monkeypatch, add_vehicle
+) -> None:
+    storage = in_memory_storage
+
+    class R:
+        def raise_for_status(self) -> None:
+            pass
+
+        def json(self):
+            return {
+                "response": {
+                    "date": "1 มกราคม 2567",
+                    "stations": {"ptt": {"e20": {"name_th": "E20", "price": 40}}},
+                }
+            }
+
+    monkeypatch.setattr(oil_service._HTTP_SESSION, "get", lambda *_a, **_k: R())
+    with storage.transaction() as session:
+        add_vehicle(storage)
+        storage.add_entry(_entry(1, 0, fuel_type="e20", amount_spent=80))
+        oil_service.fetch_latest(session, api_base="http://test/api")
+        # The uncommitted price is visible to lookups in the same session.
+        assert get_price(session, "e20", "ptt", date(2024, 1, 1)) == Decimal(40)
+
+    assert len(commits) == 1
+    assert storage.list_entries()[0].liters == 2.0
+    with Session(storage.engine) as s:
+        assert len(s.exec(select(FuelPrice)).all()) == 1
+
+
+def test_chunked_import_commits_once(
+    in_memory_storage, commits, tmp_path, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    commits.clear()
+    csv_path = tmp_path / "in.csv"
+    lines = ["date,fuel_type,odo_before,odo_after,liters,amount_spent"]
+    lines += [f"2024-01-{d:02d},e20,{d * 10},,2,100" for d in range(1, 11)]
+    csv_path.write_text("\n".join(lines))
+
+    inserted, errors = Importer(storage).import_csv_chunked(csv_path, 1, chunk_size=3)
+
+    assert (inserted, errors) == (10, [])
+    assert len(commits) == 1
+
+
+def test_cancelled_chunked_import_keeps_nothing(
+    in_memory_storage, tmp_path, add_vehicle
+) -> None:
+    storage = in_memory_storage
+    add_vehicle(storage)
+    csv_path = tmp_path / "in.csv"
+    lines = ["date,fuel_type,odo_before,odo_after,liters,amount_spent"]
+    lines += [f"2024-01-{d:02d},e20,{d * 10},,2,100" for d in range(1, 11)]
+    csv_path.write_text("\n".join(lines))
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(ImportCancelled):
+        Importer(storage).import_csv_chunked(csv_path, 1, chunk_size=3, cancel=cancel)
+
+    assert storage.list_entries() == []
+
+
+def test_after_commit_waits_for_the_outer_commit(in_memory_storage) -> None:
+    storage = in_memory_storage
+    calls: list[str] = []
+    storage.after_commit(lambda: calls.append("now"))
+    with storage.transaction():
+        storage.after_commit(lambda: calls.append("outer"))
+        with pytest.raises(ValueError), storage.transaction():
+            storage.after_commit(lambda: calls.append("rolled back"))
+            raise ValueError
+        assert calls == ["now"]
+    assert calls == ["now", "outer"]
+
+    with pytest.raises(ValueError), storage.transaction():
+        storage.after_commit(lambda: calls.append("rolled back"))
+        raise ValueError
+    assert calls == ["now", "outer"]
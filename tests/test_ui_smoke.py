@@ -58,7 +58,7 @@ def test_tray_tooltip_updates(main_controller, monkeypatch):
     ctrl._selected_vehicle_id = 1
     tip = {}
     monkeypatch.setattr(ctrl.tray_icon, "setToolTip", lambda t: tip.setdefault("v", t))
-    ctrl._update_tray_tooltip()
+    ctrl._show_dashboard(ctrl.dashboard.snapshot(1))
     assert tip.get("v")
 
 
@@ -87,7 +87,7 @@ def test_cleanup_unregisters_hotkey(main_controller):
 def test_cleanup_handles_missing_db(main_controller, monkeypatch):
     ctrl = main_controller
 
-    def fail_backup() -> Path:
+    def fail_backup(**_kwargs) -> Path:
         raise sqlite3.DatabaseError("fail")
 
     monkeypatch.setattr(ctrl.storage, "auto_backup", fail_backup)
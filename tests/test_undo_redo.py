@@ -1,3 +1,4 @@
+import sqlite3
 from datetime import date
 from PySide6.QtGui import QUndoStack
 from PySide6.QtCore import QObject, Signal
@@ -54,3 +55,29 @@ def test_delete_and_undo_redo(in_memory_storage: StorageService):
     assert storage.list_entries() == []
     stack.undo()
     assert len(storage.list_entries()) == 1
+
+
+def test_signal_sees_committed_rows(tmp_path):
+    db = tmp_path / "fuel.db"
+    storage = StorageService(db_path=db, password="")
+    storage.add_vehicle(
+        Vehicle(name="v", vehicle_type="t", license_plate="x", tank_capacity_liters=1)
+    )
+    entry = FuelEntry(entry_date=date.today(), vehicle_id=1, odo_before=0.0)
+    dummy = Dummy()
+    seen: list[int] = []
+
+    def count_on_other_connection() -> None:
+        with sqlite3.connect(db) as conn:
+            seen.append(conn.execute("SELECT count(*) FROM fuelentry").fetchone()[0])
+
+    dummy.sig.connect(count_on_other_connection)
+    stack = QUndoStack()
+    stack.push(AddEntryCommand(storage, entry, dummy.sig))
+    stack.undo()
+    # Inside an outer transaction the signal waits for its commit.
+    with storage.transaction():
+        stack.redo()
+        assert seen == [1, 0]
+    assert seen == [1, 0, 1]
+    storage.close()
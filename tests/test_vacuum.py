@@ -1,4 +1,12 @@
+import sqlite3
+from contextlib import closing
 from datetime import date
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from fueltracker.main import ALEMBIC_INI  # type: ignore
+from PySide6.QtCore import QTimer
 from sqlmodel import SQLModel, create_engine
 from sqlalchemy.pool import StaticPool
 
@@ -35,9 +43,11 @@ def _add_entry(storage: StorageService, odo_before: float, odo_after: float) ->
     )
 
 
-def test_vacuum_called_after_threshold(monkeypatch) -> None:
+def test_threshold_flags_maintenance_instead_of_vacuum(monkeypatch) -> None:
     storage = _new_storage(2)
     _add_vehicle(storage)
+    storage.incremental_vacuum()
+    assert not storage.maintenance_due
 
     calls = {"n": 0}
 
@@ -47,9 +57,10 @@ def test_vacuum_called_after_threshold(monkeypatch) -> None:
     monkeypatch.setattr(storage, "vacuum", fake_vacuum)
 
     _add_entry(storage, 0, 100)
-    assert calls["n"] == 0
+    assert not storage.maintenance_due
     _add_entry(storage, 100, 200)
-    assert calls["n"] == 1
+    assert storage.maintenance_due
+    assert calls["n"] == 0
 
 
 def test_vacuum_executes_sql(monkeypatch) -> None:
@@ -72,6 +83,129 @@ def test_vacuum_executes_sql(monkeypatch) -> None:
 
     monkeypatch.setattr(storage.engine, "connect", connect)
 
-    _add_entry(storage, 0, 100)
+    storage.vacuum()
 
     assert any(sql.strip().upper().startswith("VACUUM") for sql in executed)
+
+
+def _filled_file_storage(tmp_path: Path) -> StorageService:
+    storage = StorageService(db_path=tmp_path / "fuel.db", password="")
+    _add_vehicle(storage)
+    storage.add_entry_records(
+        [
+            {
+                "entry_date": date(2024, 1, 1),
+                "vehicle_id": 1,
+                "odo_before": float(i),
+                "odo_after": None,
+                "amount_spent": 50.0,
+                "liters": 5.0,
+                "fuel_type": "x" * 500,
+            }
+            for i in range(2000)
+        ]
+    )
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM fuelentry WHERE id > 100")
+    return storage
+
+
+def test_new_file_uses_incremental_auto_vacuum(tmp_path) -> None:
+    storage = StorageService(db_path=tmp_path / "fuel.db", password="")
+    assert storage.vacuum_stats()["auto_vacuum"] == 2
+    storage.close()
+
+
+def test_incremental_vacuum_runs_bounded_steps(tmp_path) -> None:
+    storage = _filled_file_storage(tmp_path)
+    free = storage.vacuum_stats()["freelist_count"]
+    assert free > 40
+
+    assert storage.incremental_vacuum(pages_per_step=10, max_steps=2) == 20
+    stats = storage.vacuum_stats()
+    assert stats["freelist_count"] == free - 20
+    assert stats["reclaimed_pages"] == 20
+
+    storage.incremental_vacuum(pages_per_step=10_000)
+    stats = storage.vacuum_stats()
+    assert stats["freelist_count"] == 0
+    assert stats["reclaimed_pages"] == free
+    assert stats["incremental_runs"] == 2
+    assert not storage.maintenance_due
+    storage.close()
+
+
+def test_incremental_vacuum_skips_small_freelist(tmp_path) -> None:
+    storage = _filled_file_storage(tmp_path)
+    assert storage.incremental_vacuum(min_free_ratio=1.0) == 0
+    assert storage.vacuum_stats()["freelist_count"] > 0
+    storage.close()
+
+
+def test_old_database_is_left_to_the_migration(tmp_path) -> None:
+    storage = _filled_file_storage(tmp_path)
+    with storage.engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum = NONE")
+        conn.exec_driver_sql("VACUUM")
+    _add_entry(storage, 0, 100)
+    storage.delete_entry(1)
+    assert storage.vacuum_stats()["auto_vacuum"] == 0
+
+    # The idle job never rewrites the whole file.
+    assert storage.incremental_vacuum() == 0
+    assert storage.vacuum_stats()["auto_vacuum"] == 0
+    storage.close()
+
+    # Opening the file does not run a full ``VACUUM`` either.
+    reopened = StorageService(db_path=tmp_path / "fuel.db", password="")
+    assert reopened.vacuum_stats()["auto_vacuum"] == 0
+    reopened.close()
+
+
+def test_migration_enables_incremental_auto_vacuum(tmp_path) -> None:
+    db = tmp_path / "m.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db}")
+    command.upgrade(cfg, "0010")
+    assert _auto_vacuum(db) == 0
+    command.upgrade(cfg, "head")
+    assert _auto_vacuum(db) == 2
+    command.downgrade(cfg, "0010")
+    assert _auto_vacuum(db) == 0
+
+
+def _auto_vacuum(db: Path) -> int:
+    with closing(sqlite3.connect(db)) as conn:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+
+def test_controller_runs_maintenance_when_idle(main_controller, monkeypatch) -> None:
+    ctrl = main_controller
+    submitted: list = []
+    monkeypatch.setattr(ctrl.executor, "submit", submitted.append)
+    monkeypatch.setattr(QTimer, "singleShot", lambda *_a: None)
+
+    # Idle since the check in ``__init__`` and due after start.
+    ctrl._schedule_idle_maintenance()
+    assert submitted == [ctrl.storage.incremental_vacuum]
+
+    ctrl.storage.add_vehicle(
+        Vehicle(name="v", vehicle_type="t", license_plate="x", tank_capacity_liters=1)
+    )
+    ctrl.storage.delete_vehicle(1)
+    ctrl._schedule_idle_maintenance()
+    assert len(submitted) == 1
+    ctrl._schedule_idle_maintenance()
+    assert len(submitted) == 2
+
+
+def test_idle_maintenance_after_executor_shutdown(main_controller, monkeypatch) -> None:
+    ctrl = main_controller
+    scheduled: list = []
+    monkeypatch.setattr(QTimer, "singleShot", lambda *a: scheduled.append(a))
+    ctrl.executor.shutdown(wait=True)
+    ctrl._idle_version = ctrl.storage.data_version
+    ctrl.storage._maintenance_due = True
+
+    ctrl._schedule_idle_maintenance()
+    assert scheduled == []